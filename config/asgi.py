@@ -3,6 +3,12 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Servir con uvicorn (ver docker-compose.yml) para que la agenda en vivo
+(/eventos/turnos/, ver core.eventos) mantenga las conexiones abiertas sin
+ocupar un hilo por escritorio:
+
+    uvicorn config.asgi:application --host 0.0.0.0 --port 8000
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
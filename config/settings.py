@@ -1,6 +1,7 @@
 
 from pathlib import Path
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -13,9 +14,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-e=(2s8)&-&92q^tlmr6502ptrbi2%4!c+%xnfsbv#4pv0$!pkp'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1,[::1]').split(',')
 
 
 # Application definition
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'whitenoise.runserver_nostatic', # Que los estáticos los sirva siempre WhiteNoise
     'django.contrib.staticfiles',
     'core',
     
@@ -34,11 +36,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.registro.RegistroPedidosMiddleware', # Después de WhiteNoise: los estáticos no se registran
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.AuditoriaMiddleware',
+    'core.middleware.EscrituraRecienteMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -70,8 +76,39 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Copia para los reportes pesados (ver core.routers). Con Postgres: una réplica de solo lectura.
+    'reportes': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('REPORTES_DB', BASE_DIR / 'reportes.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_ROUTERS = ['core.routers.RouterReportes']
+# Si la copia tiene más de estos segundos, los reportes leen de la principal
+REPORTES_DESFASE_MAXIMO = 15 * 60
+# Respaldos comprimidos de la base y media (manage.py respaldar / restaurar)
+RESPALDOS_DIR = os.environ.get('RESPALDOS_DIR', BASE_DIR / 'respaldos')
+
+# Caché: versiones de datos, catálogos y fragmentos de plantillas.
+# CACHE_BACKEND = file (compartida entre procesos del mismo equipo), redis o locmem.
+# Tiene que ser compartida: el worker y los comandos (cerrar pendientes, archivar,
+# recordatorios) suben versiones que la web necesita ver para no responder 304 viejos.
+# locmem solo sirve con un único proceso que haga todo (ej: pruebas).
+_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'consultorio'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+_cache_backend, _cache_location = _CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'file')]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('CACHE_LOCATION', _cache_location),
+        'TIMEOUT': 60 * 60 * 24,
     }
 }
+CATALOGOS_CACHE_SEGUNDOS = 60 * 60 * 24 * 7
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -106,14 +143,99 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles') # La imagen de Docker usa /static
+
+# Bootstrap y los íconos vienen incluidos en core/static/vendor (los consultorios muchas
+# veces no tienen internet). En producción `collectstatic` genera nombres con hash y
+# versiones .gz/.br, y WhiteNoise los sirve con caché de un año (ver core.estaticos).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'core.estaticos.EstaticosComprimidos'
+        ),
+    },
+}
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Sin un nginx adelante (docker-compose) Django sirve también MEDIA_ROOT (el logo), aun sin DEBUG
+SERVIR_MEDIA = os.environ.get('SERVIR_MEDIA', '1') == '1'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+# Email (recordatorios de turnos). Sin EMAIL_HOST los mails se muestran en consola.
+EMAIL_BACKEND = os.environ.get(
+    'EMAIL_BACKEND',
+    'django.core.mail.backends.smtp.EmailBackend' if os.environ.get('EMAIL_HOST')
+    else 'django.core.mail.backends.console.EmailBackend'
+)
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1') == '1'
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'mails'))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'turnos@consultorio.local')
+RECORDATORIOS_LOTE = 50
+
+# Tareas en segundo plano (python manage.py procesar_tareas)
+TAREAS_PROCESOS = int(os.environ.get('TAREAS_PROCESOS', 2))
+# Una tarea EN_CURSO sin latido del worker por más de esto se da por abandonada y vuelve a la cola
+TAREAS_ABANDONO_SEGUNDOS = int(os.environ.get('TAREAS_ABANDONO_SEGUNDOS', 300))
+
+# Agenda en vivo (core.eventos): cada cuánto se buscan cambios y cuánto se guardan
+EVENTOS_INTERVALO = 1.0
+EVENTOS_RETENCION_HORAS = 24
+
+# Turnos atendidos y pagados con más de estos días pasan al archivo (manage.py archivar_turnos)
+TURNOS_DIAS_ARCHIVO = int(os.environ.get('TURNOS_DIAS_ARCHIVO', 365))
+
+# Turnos PENDIENTE que quedaron atrás (manage.py cerrar_turnos_pendientes): después de
+# estos días se cierran según si el paciente llegó a pagar algo o no
+CIERRE_PENDIENTES_DIAS = int(os.environ.get('CIERRE_PENDIENTES_DIAS', 2))
+CIERRE_PENDIENTES_REGLAS = {
+    'con_pago': 'FINALIZADO',  # Pagó algo: vino y nadie lo marcó
+    'sin_pago': 'AUSENTE',
+}
+
+# Registro estructurado (core.registro): una línea JSON por pedido y por evento del negocio,
+# escrita por un hilo aparte en LOG_DIR/consultorio.log (rota cada 10 MB, guarda 5)
+LOG_DIR = os.environ.get('LOG_DIR', os.path.join(BASE_DIR, 'logs'))
+REGISTRO_PEDIDO_LENTO_MS = int(os.environ.get('REGISTRO_PEDIDO_LENTO_MS', 1000))
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'archivo': {
+            '()': 'core.registro.ManejadorEnCola',
+            'archivo': os.path.join(LOG_DIR, 'consultorio.log'),
+            'max_bytes': 10 * 1024 * 1024,
+            'copias': 5,
+        },
+    },
+    'loggers': {
+        'consultorio': {'handlers': ['archivo'], 'level': os.environ.get('LOG_LEVEL', 'INFO'), 'propagate': False},
+        # Errores de Django (500, etc.): además de la consola, al archivo
+        'django.request': {'handlers': ['archivo'], 'level': 'WARNING'},
+    },
+}
+
+# Pruebas (python manage.py test): reporte de las más lentas (core/tests/runner.py)
+TEST_RUNNER = 'core.tests.runner.RunnerConTiempos'
+if sys.argv[1:2] == ['test']:
+    # El hash seguro de contraseñas es lento a propósito; en las pruebas no hace falta
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    # Cada proceso de --parallel con su propia caché (un cache.clear() no pisa a los demás)
+    CACHES['default'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pruebas'}
+    # Sin archivos de registro (las pruebas miran los registros con assertLogs)
+    LOGGING['handlers']['archivo'] = {'class': 'logging.NullHandler'}
+
 # Redirecciones de Login y Logout
 LOGIN_REDIRECT_URL = 'lista_turnos'
 LOGOUT_REDIRECT_URL = 'login'
\ No newline at end of file
@@ -1,12 +1,210 @@
 from django.contrib import admin
-from .models import ObraSocial, TipoTratamiento, Arancel, Paciente, Turno, LiquidacionObraSocial, CategoriaGasto, Gasto, Configuracion
-
-admin.site.register(ObraSocial)
-admin.site.register(TipoTratamiento)
-admin.site.register(Arancel)
-admin.site.register(Paciente)
-admin.site.register(Turno)
-admin.site.register(LiquidacionObraSocial)
-admin.site.register(CategoriaGasto)
-admin.site.register(Gasto)
-admin.site.register(Configuracion)
\ No newline at end of file
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+from . import versiones
+from .models import (
+    ObraSocial, TipoTratamiento, Arancel, Paciente, Turno, TurnoArchivado, LiquidacionObraSocial,
+    CategoriaGasto, Gasto, Configuracion, Tarea, RecordatorioTurno, RegistroAuditoria, Profesional
+)
+
+
+# --- PAGINADOR PARA TABLAS GRANDES ---
+def contar_estimado(modelo, using='default'):
+    """Cantidad aproximada de filas sin recorrer la tabla (None si el motor no sabe estimar)"""
+    conexion = connections[using]
+    tabla = modelo._meta.db_table
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [tabla])
+        elif conexion.vendor == 'sqlite':
+            # Estadísticas de ANALYZE: el primer número de cada índice es cuántas filas tiene
+            # (el mayor es el de la tabla entera; los parciales tienen menos)
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [tabla])
+            except DatabaseError:  # Nunca se corrió ANALYZE
+                return None
+            filas = [int(stat.split()[0]) for stat, in cursor.fetchall() if stat]
+            return max(filas) if filas else None
+        elif conexion.vendor == 'mysql':
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [tabla],
+            )
+        else:
+            return None
+        fila = cursor.fetchone()
+    return int(fila[0]) if fila and fila[0] is not None else None
+
+
+# Tablas con versión de caché (ver core.versiones): sin estimación, el COUNT(*) se guarda hasta que cambien
+VERSIONES_CONTEO = {Turno: 'turnos', Paciente: 'pacientes'}
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Sin filtros aplicados, el admin hace COUNT(*) de toda la tabla en cada página.
+    Con cientos de miles de turnos eso es lento: usamos la estimación del motor o,
+    si no hay, el conteo exacto guardado en caché mientras la tabla no cambie.
+    """
+    MINIMO_PARA_ESTIMAR = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        modelo = getattr(queryset, 'model', None)
+        if modelo is None or queryset.query.where != modelo._default_manager.all().query.where:
+            return super().count
+        estimado = contar_estimado(modelo, queryset.db)
+        if estimado is not None and estimado >= self.MINIMO_PARA_ESTIMAR:
+            return estimado
+        if estimado is None and modelo in VERSIONES_CONTEO:
+            clave = f'conteo:{modelo._meta.label_lower}:{versiones.version(VERSIONES_CONTEO[modelo])}'
+            return cache.get_or_set(clave, lambda: super(PaginadorEstimado, self).count, 60 * 60 * 24)
+        return super().count
+
+
+class TablaGrandeAdmin(admin.ModelAdmin):
+    paginator = PaginadorEstimado
+    show_full_result_count = False # Evita el segundo COUNT(*) "x de y resultados"
+    list_per_page = 50
+
+
+# --- CONFIGURACIÓN / CATÁLOGOS ---
+@admin.register(ObraSocial)
+class ObraSocialAdmin(admin.ModelAdmin):
+    search_fields = ['nombre']
+
+
+@admin.register(TipoTratamiento)
+class TipoTratamientoAdmin(admin.ModelAdmin):
+    search_fields = ['nombre']
+
+
+@admin.register(Arancel)
+class ArancelAdmin(admin.ModelAdmin):
+    list_display = ['obra_social', 'tratamiento', 'copago_sugerido', 'monto_obra_social']
+    list_select_related = ['obra_social', 'tratamiento']
+    list_filter = ['obra_social']
+    autocomplete_fields = ['obra_social', 'tratamiento']
+
+
+@admin.register(CategoriaGasto)
+class CategoriaGastoAdmin(admin.ModelAdmin):
+    search_fields = ['nombre']
+
+
+admin.site.register(Configuracion)
+
+
+@admin.register(Profesional)
+class ProfesionalAdmin(admin.ModelAdmin):
+    list_display = ['apellido', 'nombre', 'matricula', 'usuario', 'activo']
+    list_filter = ['activo']
+    search_fields = ['apellido', 'nombre', 'matricula']
+    raw_id_fields = ['usuario']
+
+
+# --- PACIENTES Y TURNOS ---
+@admin.register(Paciente)
+class PacienteAdmin(TablaGrandeAdmin):
+    list_display = ['apellido', 'nombre', 'dni', 'telefono', 'obra_social_default']
+    list_select_related = ['obra_social_default']
+    search_fields = ['apellido', 'nombre', '=dni']
+    autocomplete_fields = ['obra_social_default']
+
+
+class TurnoAdminBase(TablaGrandeAdmin):
+    list_display = ['fecha', 'hora', 'paciente_nombre', 'profesional', 'tratamiento', 'obra_social_aplicada',
+                    'estado', 'monto_paciente', 'monto_pagado', 'pagado']
+    # Sin esto, cada fila haría consultas extra (paciente, profesional, tratamiento, obra social)
+    list_select_related = ['paciente', 'profesional', 'tratamiento', 'obra_social_aplicada']
+    date_hierarchy = 'fecha'
+    list_filter = ['profesional', 'estado', 'pagado']
+    search_fields = ['paciente__apellido', '=paciente__dni']
+
+    @admin.display(description='Paciente', ordering='paciente__apellido')
+    def paciente_nombre(self, turno):
+        # No usamos Paciente.__str__ porque consulta también la obra social
+        return f"{turno.paciente.apellido}, {turno.paciente.nombre}"
+
+
+@admin.register(Turno)
+class TurnoAdmin(TurnoAdminBase):
+    # Buscador en vez de un <select> con todos los pacientes
+    autocomplete_fields = ['paciente', 'profesional', 'tratamiento', 'obra_social_aplicada']
+
+    def delete_model(self, request, turno):
+        # Igual que en la agenda: borrado lógico
+        turno.borrado = True
+        turno.save(update_fields=['borrado'])
+
+    def delete_queryset(self, request, queryset):
+        for turno in queryset:
+            self.delete_model(request, turno)
+
+
+@admin.register(TurnoArchivado)
+class TurnoArchivadoAdmin(TurnoAdminBase):
+    raw_id_fields = ['paciente']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# --- FINANZAS ---
+@admin.register(LiquidacionObraSocial)
+class LiquidacionObraSocialAdmin(admin.ModelAdmin):
+    list_display = ['fecha_ingreso', 'obra_social', 'periodo', 'monto_total', 'profesional']
+    list_select_related = ['obra_social', 'profesional']
+    date_hierarchy = 'fecha_ingreso'
+    list_filter = ['obra_social', 'profesional']
+    autocomplete_fields = ['obra_social']
+
+
+@admin.register(Gasto)
+class GastoAdmin(TablaGrandeAdmin):
+    list_display = ['fecha', 'categoria', 'descripcion', 'monto', 'profesional']
+    list_select_related = ['categoria', 'profesional']
+    date_hierarchy = 'fecha'
+    list_filter = ['categoria', 'profesional']
+
+
+# --- SISTEMA ---
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ['creada', 'tipo', 'estado', 'progreso', 'intentos', 'usuario']
+    list_select_related = ['usuario']
+    list_filter = ['estado', 'tipo']
+    raw_id_fields = ['usuario']
+
+
+@admin.register(RecordatorioTurno)
+class RecordatorioTurnoAdmin(TablaGrandeAdmin):
+    list_display = ['turno', 'turno_archivado', 'estado', 'intentos', 'enviado']
+    list_select_related = ['turno__paciente__obra_social_default', 'turno_archivado__paciente']
+    list_filter = ['estado']
+    raw_id_fields = ['turno', 'turno_archivado']
+
+
+@admin.register(RegistroAuditoria)
+class RegistroAuditoriaAdmin(TablaGrandeAdmin):
+    list_display = ['fecha', 'usuario_nombre', 'accion', 'modelo', 'objeto_id']
+    list_filter = ['accion', 'modelo']
+    date_hierarchy = 'fecha'
+    search_fields = ['=objeto_id', 'usuario_nombre']
+
+    # Solo lectura: la auditoría no se toca
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,113 @@
+"""
+Análisis de gastos: total por categoría y mes, promedio móvil y presupuesto
+contra lo gastado.
+
+Los totales salen de una sola consulta agrupada (índice categoria + fecha) por
+los meses que falten. Los meses cerrados quedan en caché con una versión propia
+de cada mes: cargar un gasto de hoy no invalida los meses anteriores, y corregir
+un gasto viejo invalida solo el mes de ese gasto.
+"""
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from . import versiones
+from .catalogos import obtener
+from .models import Gasto
+
+CENTAVOS = Decimal('0.01')
+
+
+def version_mes(anio, mes):
+    return f'gastos:{anio}-{mes:02d}'
+
+
+def meses_hasta(anio, mes, cantidad):
+    """Los últimos `cantidad` meses (anio, mes) terminando en anio/mes, del más viejo al más nuevo"""
+    indice = anio * 12 + mes - 1
+    return [(i // 12, i % 12 + 1) for i in range(indice - cantidad + 1, indice + 1)]
+
+
+def _consultar(desde, hasta):
+    """{(anio, mes): {categoria_id: total}} entre dos meses inclusive"""
+    anio, mes = hasta
+    fin = datetime.date(anio + mes // 12, mes % 12 + 1, 1)  # Primer día del mes siguiente
+    filas = (
+        Gasto.objects.filter(fecha__gte=datetime.date(*desde, 1), fecha__lt=fin)
+        .annotate(mes=TruncMonth('fecha'))
+        .values('categoria_id', 'mes')
+        .annotate(total=Sum('monto'))
+        .order_by()
+    )
+    resultado = {}
+    for f in filas:
+        resultado.setdefault((f['mes'].year, f['mes'].month), {})[f['categoria_id']] = f['total']
+    return resultado
+
+
+def totales_mensuales(meses):
+    """Totales por categoría de cada mes pedido (lista ordenada de (anio, mes))"""
+    hoy = timezone.localdate()
+    claves = {
+        m: 'analisis_gastos:{}-{}:{}'.format(*m, versiones.version(version_mes(*m)))
+        for m in meses if m < (hoy.year, hoy.month)  # Solo los cerrados
+    }
+    guardados = cache.get_many(claves.values())
+    totales = {m: guardados[c] for m, c in claves.items() if c in guardados}
+
+    faltan = [m for m in meses if m not in totales]
+    if faltan:
+        consultados = _consultar(faltan[0], faltan[-1])
+        nuevos = {}
+        for m in faltan:
+            totales[m] = consultados.get(m, {})
+            if m in claves:
+                nuevos[claves[m]] = totales[m]
+        cache.set_many(nuevos, getattr(settings, 'ANALISIS_GASTOS_CACHE_SEGUNDOS', 60 * 60 * 24 * 30))
+    return totales
+
+
+def analizar(anio, mes, cantidad=12, ventana=3):
+    """
+    Una fila por categoría con el total de cada mes, el promedio móvil de los
+    últimos `ventana` meses y el presupuesto contra lo gastado en el último mes.
+    """
+    # Pedimos `ventana - 1` meses de más para que el primer promedio esté completo
+    periodo = meses_hasta(anio, mes, cantidad + ventana - 1)
+    totales = totales_mensuales(periodo)
+    visibles = periodo[ventana - 1:]
+
+    filas = []
+    for categoria in obtener('categorias'):
+        serie = [totales[m].get(categoria.pk, Decimal('0')) for m in periodo]
+        presupuesto = categoria.presupuesto_mensual
+        if not any(serie) and not presupuesto:
+            continue
+        promedios = [
+            (sum(serie[i - ventana + 1:i + 1]) / ventana).quantize(CENTAVOS)
+            for i in range(ventana - 1, len(serie))
+        ]
+        actual = serie[-1]
+        filas.append({
+            'categoria': categoria,
+            'meses': list(zip(serie[ventana - 1:], promedios)),
+            'actual': actual,
+            'promedio': promedios[-1],
+            'presupuesto': presupuesto,
+            'disponible': max(presupuesto - actual, 0) if presupuesto else None,
+            'excedido': max(actual - presupuesto, 0) if presupuesto else None,
+            'uso': int(actual * 100 / presupuesto) if presupuesto else None,
+        })
+    filas.sort(key=lambda f: f['actual'], reverse=True)
+
+    return {
+        'meses': visibles,
+        'filas': filas,
+        'totales': [sum(totales[m].values(), Decimal('0')) for m in visibles],
+        'total_presupuesto': sum((f['presupuesto'] or 0 for f in filas), Decimal('0')),
+    }
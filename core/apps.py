@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Registramos las señales (invalidación de caché, agenda en vivo, auditoría, etc.)
+        # El orden importa: eventos lee los valores originales que auditoría actualiza.
+        from . import signals, eventos, asistencia, auditoria  # noqa: F401
@@ -0,0 +1,122 @@
+"""
+Archivo de turnos viejos.
+
+Los turnos atendidos y sin saldo hace más de `TURNOS_DIAS_ARCHIVO` días se mueven a
+`TurnoArchivado`. La tabla de turnos queda chica (la agenda y los deudores
+vuelan) y los reportes mensuales suman las dos tablas para no perder ingresos.
+
+- El historial de recordatorios y de cierres de pendientes no se pierde: pasa a
+  apuntar al turno archivado.
+- Los turnos de un cierre que todavía se está revisando no se tocan (se podría
+  querer deshacerlo).
+- Los borrados (borrado lógico) no van al archivo, que es para los reportes: con la
+  misma antigüedad se borran de verdad. Su baja queda en la auditoría.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from . import versiones
+from .asistencia import sin_recalcular
+from .auditoria import sin_auditoria
+from .eventos import sin_eventos
+from .models import CierreTurno, RecordatorioTurno, Turno, TurnoArchivado
+
+CAMPOS_ARCHIVADOS = [
+    'fecha', 'hora', 'paciente_id', 'tratamiento_id', 'obra_social_aplicada_id', 'profesional_id',
+    'monto_paciente', 'monto_pagado', 'monto_obra_social', 'pagado', 'saldo',
+    'metodo_pago', 'estado', 'nota_evolucion',
+]
+
+
+def _limite(dias):
+    dias = settings.TURNOS_DIAS_ARCHIVO if dias is None else dias
+    return timezone.localdate() - datetime.timedelta(days=dias)
+
+
+def _en_cierre_abierto():
+    return CierreTurno.objects.filter(lote__estado='APLICADO', deshecho=False, turno__isnull=False).values('turno_id')
+
+
+def turnos_archivables(dias=None):
+    # Por saldo y no por `pagado`: un turno sin copago (lo cubre la obra social) no se marca pagado
+    return (
+        Turno.objects.filter(estado='FINALIZADO', saldo=0, fecha__lt=_limite(dias))
+        .exclude(pk__in=_en_cierre_abierto())
+    )
+
+
+def borrados_para_purgar(dias=None):
+    return Turno.todos.filter(borrado=True, fecha__lt=_limite(dias)).exclude(pk__in=_en_cierre_abierto())
+
+
+def _conservar_historial(ids):
+    """Recordatorios y cierres de estos turnos pasan al archivado (o quedan sin turno si se purgó)"""
+    archivado = TurnoArchivado.objects.filter(id_original=OuterRef('turno_id')).values('pk')[:1]
+    for modelo in (RecordatorioTurno, CierreTurno):
+        modelo.objects.filter(turno_id__in=ids).update(turno_archivado=Subquery(archivado), turno=None)
+
+
+def archivar_turnos(dias=None, lote=1000):
+    """Mueve los turnos archivables en lotes (cada lote en su propia transacción). Devuelve cuántos movió."""
+    pendientes = turnos_archivables(dias).order_by('fecha', 'id')
+    total = 0
+    while True:
+        with transaction.atomic():
+            filas = list(pendientes.values('id', *CAMPOS_ARCHIVADOS)[:lote])
+            if not filas:
+                break
+            ids = [f.pop('id') for f in filas]
+            TurnoArchivado.objects.bulk_create([
+                TurnoArchivado(id_original=pk, **f) for pk, f in zip(ids, filas)
+            ])
+            _conservar_historial(ids)
+            # No es una baja: el turno sigue existiendo en el archivo
+            with sin_auditoria(), sin_eventos(), sin_recalcular():
+                Turno.todos.filter(pk__in=ids).delete()
+        total += len(ids)
+
+    if total:
+        versiones.incrementar('turnos')
+        _actualizar_estadisticas()
+    return total
+
+
+def purgar_borrados(dias=None, lote=1000):
+    """Borra de verdad los turnos con borrado lógico más viejos que el archivo. Devuelve cuántos."""
+    pendientes = borrados_para_purgar(dias).order_by('fecha', 'id')
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(pendientes.values_list('id', flat=True)[:lote])
+            if not ids:
+                break
+            _conservar_historial(ids)
+            # La agenda ya recibió la baja al borrarlos; la auditoría registra esta
+            with sin_eventos(), sin_recalcular():
+                Turno.todos.filter(pk__in=ids).delete()
+        total += len(ids)
+
+    if total:
+        _actualizar_estadisticas()
+    return total
+
+
+def _actualizar_estadisticas():
+    """
+    SQLite: si ya hay estadísticas de la tabla (ANALYZE), se renuevan. Con las de
+    antes de archivar, el admin estimaría muchos más turnos de los que quedan.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    tabla = Turno._meta.db_table
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = %s", [tabla])
+        except DatabaseError:  # Nunca se corrió ANALYZE: el admin cuenta de verdad
+            return
+        if cursor.fetchone():
+            cursor.execute(f'ANALYZE "{tabla}"')
@@ -0,0 +1,132 @@
+"""
+Riesgo de ausencia por paciente.
+
+Cada vez que cambia un turno se recalcula el `ResumenAsistencia` de ese paciente
+con una consulta agrupada sobre sus turnos (usa el índice de paciente), así la
+agenda muestra el aviso con un select_related y sin consultar el historial.
+
+Lo que cambia solo con el paso del tiempo (un turno PENDIENTE cuya fecha pasó,
+una deuda que supera el plazo de pago) lo actualiza cada noche
+`python manage.py actualizar_asistencia`.
+"""
+import datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import versiones
+from .models import Paciente, ResumenAsistencia, Turno, TurnoArchivado
+
+# Una ausencia pesa más que una cancelación (no avisó y el horario quedó perdido)
+PESO_AUSENCIA = 3
+PESO_IMPAGO = 2
+PESO_CANCELACION = 1
+# Turnos "de cortesía": con pocos turnos, una sola falta no dispara el riesgo alto
+TURNOS_PREVIOS = 2
+
+NIVELES = [(50, 'ALTO'), (25, 'MEDIO'), (0, 'BAJO')]
+
+_pausado = ContextVar('asistencia_pausada', default=False)
+
+
+def _plazo_pago():
+    return getattr(settings, 'ASISTENCIA_PLAZO_PAGO_DIAS', 30)
+
+
+def calcular_riesgo(turnos, cancelados, ausentes, impagos):
+    faltas = PESO_AUSENCIA * ausentes + PESO_CANCELACION * cancelados + PESO_IMPAGO * impagos
+    return min(100, round(100 * faltas / (PESO_AUSENCIA * (turnos + TURNOS_PREVIOS))))
+
+
+def nivel_de_riesgo(riesgo):
+    return next(nivel for minimo, nivel in NIVELES if riesgo >= minimo)
+
+
+def actualizar(paciente_ids):
+    """Recalcula el resumen de los pacientes indicados (una consulta por tabla + un upsert)"""
+    paciente_ids = {pid for pid in paciente_ids if pid}
+    if not paciente_ids:
+        return 0
+    hoy = timezone.localdate()
+    vencido = hoy - datetime.timedelta(days=_plazo_pago())
+    atendido = Q(estado='FINALIZADO')
+
+    resumenes = {pid: dict(turnos=0, atendidos=0, cancelados=0, ausentes=0, impagos=0) for pid in paciente_ids}
+    for f in (
+        Turno.objects.filter(paciente_id__in=paciente_ids, fecha__lt=hoy)
+        .values('paciente_id')
+        .annotate(
+            turnos=Count('id'),
+            atendidos=Count('id', filter=atendido),
+            cancelados=Count('id', filter=Q(estado='CANCELADO')),
+            ausentes=Count('id', filter=Q(estado__in=['PENDIENTE', 'AUSENTE'])),
+            impagos=Count('id', filter=atendido & Q(saldo__gt=0, fecha__lt=vencido)),
+        )
+        .order_by()
+    ):
+        resumenes[f.pop('paciente_id')].update(f)
+    # Lo archivado está atendido y pagado
+    for f in (
+        TurnoArchivado.objects.filter(paciente_id__in=paciente_ids)
+        .values('paciente_id').annotate(cantidad=Count('id')).order_by()
+    ):
+        resumen = resumenes[f['paciente_id']]
+        resumen['turnos'] += f['cantidad']
+        resumen['atendidos'] += f['cantidad']
+
+    # Solo pacientes que existen (el turno puede venir de un paciente recién borrado)
+    existentes = set(Paciente.objects.filter(pk__in=paciente_ids).values_list('pk', flat=True))
+    ResumenAsistencia.objects.bulk_create(
+        [
+            ResumenAsistencia(
+                paciente_id=pid,
+                riesgo=calcular_riesgo(r['turnos'], r['cancelados'], r['ausentes'], r['impagos']),
+                **r,
+            )
+            for pid, r in resumenes.items() if pid in existentes
+        ],
+        update_conflicts=True,
+        unique_fields=['paciente'],
+        update_fields=['turnos', 'atendidos', 'cancelados', 'ausentes', 'impagos', 'riesgo', 'actualizado'],
+    )
+    versiones.incrementar('asistencia')
+    return len(existentes)
+
+
+def pacientes_con_cambios(dias=1):
+    """Pacientes cuyo riesgo pudo cambiar en los últimos `dias` solo por el paso del tiempo"""
+    hoy = timezone.localdate()
+    desde = hoy - datetime.timedelta(days=dias)
+    plazo = datetime.timedelta(days=_plazo_pago())
+    return set(
+        Turno.objects.filter(
+            Q(fecha__gte=desde, fecha__lt=hoy)  # Turnos que pasaron: PENDIENTE = ausente
+            | Q(estado='FINALIZADO', saldo__gt=0, fecha__gte=desde - plazo, fecha__lt=hoy - plazo)
+        ).values_list('paciente_id', flat=True).distinct()
+    )
+
+
+# --- SEÑALES ---
+@contextmanager
+def sin_recalcular():
+    """Para movimientos masivos que no cambian la asistencia (ej: archivar turnos viejos)"""
+    token = _pausado.set(True)
+    try:
+        yield
+    finally:
+        _pausado.reset(token)
+
+
+def turno_cambiado(sender, instance, raw=False, **kwargs):
+    if raw or _pausado.get():
+        return
+    anterior = getattr(instance, '_valores_originales', {}).get('paciente_id')
+    actualizar({instance.paciente_id, anterior})
+
+
+post_save.connect(turno_cambiado, sender=Turno, dispatch_uid='asistencia_turno_guardado')
+post_delete.connect(turno_cambiado, sender=Turno, dispatch_uid='asistencia_turno_borrado')
@@ -0,0 +1,134 @@
+"""
+Auditoría de cambios de plata: turnos, gastos y liquidaciones.
+
+Al guardar se compara contra los valores leídos de la base (ver `AuditableMixin`)
+y la diferencia campo por campo se acumula en memoria. `AuditoriaMiddleware`
+escribe todo junto con un solo INSERT al final del pedido. Fuera de un pedido
+(comandos, shell) o dentro de una transacción se escribe en el momento.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Gasto, LiquidacionObraSocial, RegistroAuditoria, Turno
+
+MODELOS_AUDITADOS = (Turno, Gasto, LiquidacionObraSocial)
+
+# Si el buffer acumula más que esto en un mismo pedido, lo vaciamos antes de terminar
+MAXIMO_BUFFER = 500
+
+_buffer = ContextVar('auditoria_buffer', default=None)
+_usuario = ContextVar('auditoria_usuario', default=None)
+_silenciada = ContextVar('auditoria_silenciada', default=False)
+
+
+def _valores(instancia):
+    return {f.attname: getattr(instancia, f.attname) for f in instancia._meta.concrete_fields}
+
+
+def _diferencias(antes, despues):
+    return {
+        campo: [antes.get(campo), valor]
+        for campo, valor in despues.items()
+        if campo != 'id' and antes.get(campo) != valor
+    }
+
+
+def _entrada(modelo, objeto_id, accion, cambios, usuario):
+    return RegistroAuditoria(
+        fecha=timezone.now(),
+        usuario=usuario,
+        usuario_nombre=usuario.get_username() if usuario else 'sistema',
+        modelo=modelo,
+        objeto_id=objeto_id,
+        accion=accion,
+        cambios=cambios,
+    )
+
+
+def registrar(modelo, objeto_id, accion, cambios):
+    """Agrega una entrada al buffer del pedido (o la guarda ya si no hay pedido en curso)"""
+    if _silenciada.get():
+        return
+    entrada = _entrada(modelo, objeto_id, accion, cambios, _usuario.get())
+    buffer = _buffer.get()
+    # Dentro de un atomic() se guarda ya, en la misma transacción: si se deshace, la
+    # entrada se deshace con ella (del buffer se escribiría igual al final del pedido)
+    if buffer is None or transaction.get_connection().in_atomic_block:
+        RegistroAuditoria.objects.bulk_create([entrada])
+        return
+    buffer.append(entrada)
+    if len(buffer) >= MAXIMO_BUFFER:
+        vaciar()
+
+
+def registrar_varios(modelo, accion, cambios_por_objeto, usuario=None):
+    """Para cambios masivos (QuerySet.update no dispara señales): todo en un INSERT"""
+    if _silenciada.get() or not cambios_por_objeto:
+        return
+    usuario = usuario or _usuario.get()
+    RegistroAuditoria.objects.bulk_create(
+        [_entrada(modelo, objeto_id, accion, cambios, usuario) for objeto_id, cambios in cambios_por_objeto.items()],
+        batch_size=MAXIMO_BUFFER,
+    )
+
+
+def vaciar():
+    buffer = _buffer.get()
+    if buffer:
+        RegistroAuditoria.objects.bulk_create(buffer)
+        buffer.clear()
+
+
+def iniciar(usuario=None):
+    """Empieza a acumular (lo llama el middleware al principio del pedido)"""
+    return _buffer.set([]), _usuario.set(usuario)
+
+
+def terminar(tokens):
+    try:
+        vaciar()
+    finally:
+        _buffer.reset(tokens[0])
+        _usuario.reset(tokens[1])
+
+
+@contextmanager
+def sin_auditoria():
+    """Para movimientos internos que no son cambios de datos (ej: archivar turnos viejos)"""
+    token = _silenciada.set(True)
+    try:
+        yield
+    finally:
+        _silenciada.reset(token)
+
+
+# --- SEÑALES ---
+def auditar_guardado(sender, instance, created, raw=False, **kwargs):
+    if raw:  # loaddata
+        return
+
+    actuales = _valores(instance)
+    if created:
+        registrar(sender._meta.model_name, instance.pk, 'ALTA', _diferencias({}, actuales))
+    else:
+        cambios = _diferencias(getattr(instance, '_valores_originales', {}), actuales)
+        if cambios:
+            registrar(sender._meta.model_name, instance.pk, 'MODIFICACION', cambios)
+
+    # Si se vuelve a guardar en el mismo pedido, comparamos contra lo último guardado
+    instance._valores_originales = actuales
+
+
+def auditar_borrado(sender, instance, **kwargs):
+    registrar(sender._meta.model_name, instance.pk, 'BAJA', {
+        campo: [valor, None] for campo, valor in _valores(instance).items() if campo != 'id'
+    })
+
+
+for _modelo in MODELOS_AUDITADOS:
+    post_save.connect(auditar_guardado, sender=_modelo, dispatch_uid=f'auditoria_guardado_{_modelo._meta.model_name}')
+    post_delete.connect(auditar_borrado, sender=_modelo, dispatch_uid=f'auditoria_borrado_{_modelo._meta.model_name}')
@@ -0,0 +1,46 @@
+"""
+Catálogos que casi no cambian: obras sociales, tratamientos, categorías de gasto,
+aranceles, profesionales y la configuración del consultorio.
+
+Se guardan en la caché con la versión del catálogo en la clave (ver `versiones`).
+Las señales suben la versión cuando se edita algo, así que nunca se ve una lista vieja.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from . import versiones
+from .models import Arancel, CategoriaGasto, Configuracion, ObraSocial, Profesional, TipoTratamiento
+
+# nombre: función que arma la lista
+CATALOGOS = {
+    'obras_sociales': lambda: list(ObraSocial.objects.order_by('nombre')),
+    'tratamientos': lambda: list(TipoTratamiento.objects.order_by('nombre')),
+    'categorias': lambda: list(CategoriaGasto.objects.order_by('nombre')),
+    'aranceles': lambda: list(
+        Arancel.objects.select_related('obra_social', 'tratamiento')
+        .order_by('obra_social__nombre', 'tratamiento__nombre')
+    ),
+    'profesionales': lambda: list(Profesional.objects.filter(activo=True)),
+    'configuracion': lambda: Configuracion.objects.first(),
+}
+
+
+def _duracion():
+    return getattr(settings, 'CATALOGOS_CACHE_SEGUNDOS', 60 * 60 * 24 * 7)
+
+
+def version_catalogos(*nombres):
+    """Una sola cadena con las versiones de varios catálogos (para ETags y {% cache %})"""
+    return '-'.join(str(versiones.version(nombre)) for nombre in nombres)
+
+
+def obtener(nombre):
+    clave = f'catalogo:{nombre}:{versiones.version(nombre)}'
+    datos = cache.get(clave)
+    if datos is None:
+        datos = CATALOGOS[nombre]()
+        # Configuración vacía: guardamos False para no volver a consultar
+        cache.set(clave, datos if datos is not None else False, _duracion())
+    if datos is False:
+        return None
+    return datos
@@ -0,0 +1,117 @@
+"""
+Cierre de turnos PENDIENTE que quedaron atrás.
+
+Si nadie marcó el turno como atendido, queda PENDIENTE para siempre y ensucia la
+agenda, las estadísticas y el riesgo de ausencia. Todas las noches
+`python manage.py cerrar_turnos_pendientes` los busca con una sola consulta
+(índice estado + fecha) y los cierra en bloque según `CIERRE_PENDIENTES_REGLAS`:
+
+- 'con_pago': el paciente pagó algo, así que vino → FINALIZADO.
+- 'sin_pago': no hay pago → AUSENTE.
+
+Cada corrida deja un `LoteCierre` que se revisa en /cierres/: se confirma
+o se deshace (todo o algunos turnos).
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CierreTurno, LoteCierre, Turno
+from .operaciones import actualizar_turnos
+
+REGLAS = {
+    'con_pago': 'FINALIZADO',
+    'sin_pago': 'AUSENTE',
+}
+
+
+def reglas():
+    return getattr(settings, 'CIERRE_PENDIENTES_REGLAS', REGLAS)
+
+
+def _dias():
+    return getattr(settings, 'CIERRE_PENDIENTES_DIAS', 2)
+
+
+def _regla(monto_pagado):
+    return 'con_pago' if monto_pagado > 0 else 'sin_pago'
+
+
+def pendientes_vencidos(dias=None):
+    """Turnos PENDIENTE de hace más de `dias` días"""
+    limite = timezone.localdate() - datetime.timedelta(days=_dias() if dias is None else dias)
+    return Turno.objects.filter(estado='PENDIENTE', fecha__lt=limite)
+
+
+def vista_previa(dias=None):
+    """Cuántos turnos se cerrarían y a qué estado, sin tocar nada"""
+    resumen = {}
+    for monto_pagado in pendientes_vencidos(dias).values_list('monto_pagado', flat=True):
+        estado = reglas().get(_regla(monto_pagado))
+        if estado:
+            resumen[estado] = resumen.get(estado, 0) + 1
+    return resumen
+
+
+def cerrar_pendientes(dias=None, usuario=None, automatico=False):
+    """Cierra los pendientes vencidos en bloque. Devuelve el lote (o None si no había nada)."""
+    por_estado = {}
+    for pk, monto_pagado in pendientes_vencidos(dias).values_list('id', 'monto_pagado'):
+        regla = _regla(monto_pagado)
+        estado = reglas().get(regla)
+        if estado:  # Una regla sin estado deja esos turnos como están
+            por_estado.setdefault((regla, estado), []).append(pk)
+    if not por_estado:
+        return None
+
+    with transaction.atomic():
+        lote = LoteCierre.objects.create(usuario=usuario, automatico=automatico)
+        cierres = []
+        for (regla, estado), ids in por_estado.items():
+            cerrados = actualizar_turnos(
+                ids, {'estado': estado}, filtro=Q(estado='PENDIENTE'), usuario=usuario, tipo_evento='ESTADO'
+            )
+            cierres += [CierreTurno(lote=lote, turno_id=pk, regla=regla, estado_nuevo=estado) for pk in cerrados]
+        CierreTurno.objects.bulk_create(cierres, batch_size=500)
+        lote.cantidad = len(cierres)
+        lote.save(update_fields=['cantidad'])
+    return lote
+
+
+def confirmar(lote, usuario=None):
+    lote.estado = 'CONFIRMADO'
+    lote.revisado = timezone.now()
+    lote.revisado_por = usuario
+    lote.save(update_fields=['estado', 'revisado', 'revisado_por'])
+
+
+def deshacer(lote, turno_ids=None, usuario=None):
+    """
+    Vuelve a PENDIENTE los turnos del lote (o solo `turno_ids`). Los que alguien
+    cambió a mano después del cierre se dejan como están y siguen en el lote sin
+    deshacer (el lote queda para revisar). Devuelve cuántos volvieron.
+    """
+    with transaction.atomic():
+        cierres = lote.cierres.filter(deshecho=False)
+        if turno_ids is not None:
+            cierres = cierres.filter(turno_id__in=turno_ids)
+        por_estado = {}
+        for pk, estado in cierres.values_list('turno_id', 'estado_nuevo'):
+            por_estado.setdefault(estado, []).append(pk)
+
+        vueltos = []
+        for estado, ids in por_estado.items():
+            vueltos += actualizar_turnos(
+                ids, {'estado': 'PENDIENTE'}, filtro=Q(estado=estado), usuario=usuario, tipo_evento='ESTADO'
+            )
+        lote.cierres.filter(turno_id__in=vueltos).update(deshecho=True)
+
+        lote.revisado = timezone.now()
+        lote.revisado_por = usuario
+        if not lote.cierres.filter(deshecho=False).exists():
+            lote.estado = 'DESHECHO'
+        lote.save(update_fields=['estado', 'revisado', 'revisado_por'])
+    return len(vueltos)
@@ -0,0 +1,108 @@
+"""
+Conciliación de Obras Sociales: lo que cada obra social nos debería pagar por los
+turnos atendidos en un período contra lo que efectivamente liquidó.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, Sum
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+
+from . import versiones
+from .routers import marca_copia
+from .models import Turno, TurnoArchivado, LiquidacionObraSocial
+
+# Diferencias menores a esto se consideran redondeo
+TOLERANCIA = Decimal(str(getattr(settings, 'CONCILIACION_TOLERANCIA', '1.00')))
+
+
+def _esperado_por_obra_social(anio, mes):
+    """Consulta agrupada: turnos atendidos y monto esperado por obra social (tabla activa + archivo)."""
+    resultado = {}
+    for modelo in (Turno, TurnoArchivado):
+        filas = (
+            modelo.objects.filter(estado='FINALIZADO', fecha__year=anio, fecha__month=mes)
+            .values('obra_social_aplicada', 'obra_social_aplicada__nombre')
+            .annotate(turnos=Count('id'), esperado=Sum('monto_obra_social'))
+        )
+        for f in filas:
+            fila = resultado.setdefault(f['obra_social_aplicada'], {
+                'nombre': f['obra_social_aplicada__nombre'], 'turnos': 0, 'esperado': Decimal('0'),
+            })
+            fila['turnos'] += f['turnos']
+            fila['esperado'] += f['esperado'] or Decimal('0')
+    return resultado
+
+
+def _liquidado_por_obra_social(anio, mes):
+    """Suma de liquidaciones del período (si no cargaron mes/año, usamos la fecha de ingreso)."""
+    filas = (
+        LiquidacionObraSocial.objects.annotate(
+            mes_liq=Coalesce('periodo_mes', ExtractMonth('fecha_ingreso'), output_field=IntegerField()),
+            anio_liq=Coalesce('periodo_anio', ExtractYear('fecha_ingreso'), output_field=IntegerField()),
+        )
+        .filter(mes_liq=mes, anio_liq=anio)
+        .values('obra_social', 'obra_social__nombre')
+        .annotate(liquidaciones=Count('id'), liquidado=Sum('monto_total'))
+    )
+    return {
+        f['obra_social']: {
+            'nombre': f['obra_social__nombre'],
+            'liquidaciones': f['liquidaciones'],
+            'liquidado': f['liquidado'] or Decimal('0'),
+        }
+        for f in filas
+    }
+
+
+def _estado(esperado, liquidado):
+    diferencia = esperado - liquidado
+    if abs(diferencia) <= TOLERANCIA:
+        return 'OK'
+    if liquidado == 0:
+        return 'SIN_LIQUIDAR'
+    if diferencia > 0:
+        return 'FALTANTE'
+    return 'EXCEDENTE'
+
+
+def _calcular(anio, mes):
+    esperado = _esperado_por_obra_social(anio, mes)
+    liquidado = _liquidado_por_obra_social(anio, mes)
+
+    filas = []
+    for os_id in set(esperado) | set(liquidado):
+        e = esperado.get(os_id, {})
+        liq = liquidado.get(os_id, {})
+        monto_esperado = e.get('esperado', Decimal('0'))
+        monto_liquidado = liq.get('liquidado', Decimal('0'))
+        if monto_esperado == 0 and monto_liquidado == 0:
+            continue  # Particulares u obras sociales sin convenio cargado
+        filas.append({
+            'obra_social_id': os_id,
+            'obra_social': e.get('nombre') or liq.get('nombre'),
+            'turnos': e.get('turnos', 0),
+            'liquidaciones': liq.get('liquidaciones', 0),
+            'esperado': monto_esperado,
+            'liquidado': monto_liquidado,
+            'diferencia': monto_esperado - monto_liquidado,
+            'estado': _estado(monto_esperado, monto_liquidado),
+        })
+    filas.sort(key=lambda f: f['obra_social'])
+    return filas
+
+
+def conciliar_periodo(anio, mes):
+    """
+    Devuelve una fila por obra social con lo esperado, lo liquidado y la diferencia.
+    El resultado queda en caché hasta que cambie algún turno o liquidación.
+    """
+    clave = 'conciliacion:{}:{}:{}:{}:{}'.format(
+        anio, mes, versiones.version('turnos'), versiones.version('liquidaciones'), marca_copia()
+    )
+    filas = cache.get(clave)
+    if filas is None:
+        filas = _calcular(anio, mes)
+        cache.set(clave, filas, getattr(settings, 'CONCILIACION_CACHE_SEGUNDOS', 60 * 60 * 24))
+    return filas
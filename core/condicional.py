@@ -0,0 +1,53 @@
+"""
+GET condicional (ETag / Last-Modified / 304) para páginas que dependen de datos versionados.
+
+Si el navegador ya tiene la página y ninguna de las versiones cambió, respondemos
+304 sin ejecutar la vista (ni sus consultas). El ETag incluye al usuario (el menú
+cambia según permisos) y la cookie CSRF (la página lleva formularios con el token).
+"""
+import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from . import versiones
+from .catalogos import version_catalogos
+
+
+def _cacheable(request):
+    # Con mensajes pendientes hay que mostrarlos: no puede salir un 304
+    return request.user.is_authenticated and not len(messages.get_messages(request))
+
+
+def etag_por_version(*nombres):
+    """
+    Las versiones son milisegundos (ver `versiones`), así que la más nueva sirve
+    también como fecha de última modificación.
+    """
+    def calcular_etag(request, *args, **kwargs):
+        if not _cacheable(request):
+            return None
+        csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')[-8:]
+        return f'"{version_catalogos(*nombres)}-{request.user.pk}-{csrf}"'
+
+    def calcular_ultima_modificacion(request, *args, **kwargs):
+        if not _cacheable(request):
+            return None
+        ultima = max(versiones.version(nombre) for nombre in nombres)
+        return datetime.datetime.fromtimestamp(ultima / 1000, tz=datetime.timezone.utc)
+
+    def decorador(vista):
+        vista_condicional = condition(etag_func=calcular_etag, last_modified_func=calcular_ultima_modificacion)(vista)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            response = vista_condicional(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.has_header('ETag'):
+                # El navegador la guarda, pero pregunta siempre antes de usarla
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return envoltura
+    return decorador
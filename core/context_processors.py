@@ -1,11 +1,11 @@
-from .models import Configuracion
+from .catalogos import obtener
 
 def info_clinica(request):
     try:
-        config = Configuracion.objects.first()
+        config = obtener('configuracion') # Sale de la caché: se usa en todas las páginas
     except:
         config = None
     
     return {
         'clinica_config': config
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,213 @@
+"""
+Pacientes duplicados: el mismo paciente cargado dos veces con un DNI o un nombre mal tipeado.
+
+Comparar todos contra todos no escala (100.000 pacientes son 5.000 millones de pares).
+Se lee la tabla una sola vez y se agrupan los pacientes por "bloques" que un
+duplicado casi seguro comparte:
+
+- el apellido normalizado (sin tildes, mayúsculas ni signos), si el error está en el DNI;
+- el DNI sin los últimos dígitos, si el error está en el nombre.
+
+Solo se comparan los pares dentro de cada bloque. En los bloques grandes (apellidos
+comunes) se ordena por el otro dato y cada paciente se compara con sus vecinos:
+si el apellido es el mismo, el nombre también tiene que parecerse.
+
+`fusionar` pasa los turnos (activos, borrados y archivados) del duplicado al
+paciente que se conserva y borra el duplicado, todo en una transacción.
+"""
+import unicodedata
+from collections import defaultdict, namedtuple
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import asistencia, auditoria, registro, versiones
+from .models import Paciente, Turno, TurnoArchivado
+from .operaciones import turnos_actualizados
+
+DIGITOS_FINALES = 2  # DNI sin los últimos dígitos: 12.345.678 va con 12.345.600 a 12.345.699
+MAXIMO_BLOQUE = 50
+VECINOS = 10
+
+Candidato = namedtuple('Candidato', ['puntaje', 'paciente_id', 'otro_id'])
+
+
+def _umbral():
+    return getattr(settings, 'DUPLICADOS_UMBRAL', 75)
+
+
+# --- NORMALIZACIÓN ---
+def normalizar(texto):
+    """'  Pérez-Gómez ' -> 'perez gomez'"""
+    sin_tildes = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in sin_tildes.lower()).split())
+
+
+def solo_digitos(texto):
+    return ''.join(c for c in texto or '' if c.isdigit())
+
+
+Ficha = namedtuple('Ficha', ['id', 'nombre', 'apellido', 'dni', 'telefono', 'email'])
+
+
+def _ficha(pk, nombre, apellido, dni, telefono, email):
+    return Ficha(pk, normalizar(nombre), normalizar(apellido), solo_digitos(dni) or normalizar(dni),
+                 solo_digitos(telefono)[-8:], (email or '').strip().lower())
+
+
+# --- PUNTAJE ---
+def _distancia(a, b, tope=3):
+    """Ediciones (cambiar, agregar, sacar o invertir dos dígitos) de a hasta b; corta en `tope`"""
+    if abs(len(a) - len(b)) >= tope:
+        return tope
+    anterior, fila = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        nueva = [i]
+        for j, cb in enumerate(b, 1):
+            costo = min(fila[j] + 1, nueva[j - 1] + 1, fila[j - 1] + (ca != cb))
+            if anterior and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                costo = min(costo, anterior[j - 2] + 1)
+            nueva.append(costo)
+        if min(nueva) >= tope:
+            return tope
+        anterior, fila = fila, nueva
+    return min(fila[-1], tope)
+
+
+def _parecido(a, b):
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    if a.startswith(b) or b.startswith(a):  # "juan" / "juan carlos"
+        return 0.9
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _parecido_dni(a, b):
+    if a == b:
+        return 1.0
+    if len(a) == len(b) and sum(map(str.__ne__, a, b)) > 2:
+        return 0.0  # Más de dos dígitos distintos: ni un dígito mal ni dos invertidos
+    return {1: 0.8, 2: 0.5}.get(_distancia(a, b), 0.0)
+
+
+def puntaje(a, b, minimo=0):
+    """
+    0 a 100: cuánto se parecen dos fichas (DNI 40, apellido 35, nombre 25, +10 si
+    comparten teléfono o email). Devuelve 0 apenas se sabe que no llega a `minimo`.
+    """
+    dni = _parecido_dni(a.dni, b.dni)
+    if 40 * dni + 35 + 25 + 10 < minimo:
+        return 0
+    total = 40 * dni + 35 * _parecido(a.apellido, b.apellido) + 25 * _parecido(a.nombre, b.nombre)
+    if (a.telefono and a.telefono == b.telefono) or (a.email and a.email == b.email):
+        total += 10
+    return min(100, round(total))
+
+
+# --- BÚSQUEDA ---
+def _bloques(fichas):
+    """(bloque, orden para los bloques grandes): por apellido se busca el error en el DNI y viceversa"""
+    por_apellido, por_dni = defaultdict(list), defaultdict(list)
+    for f in fichas:
+        if f.apellido:
+            por_apellido[f.apellido].append(f)
+        if len(f.dni) > DIGITOS_FINALES:
+            por_dni[f.dni[:-DIGITOS_FINALES]].append(f)
+    for bloque in por_apellido.values():
+        yield bloque, lambda f: f.nombre
+    for bloque in por_dni.values():
+        yield bloque, lambda f: (f.apellido, f.nombre)
+
+
+def _pares(bloque, orden):
+    """Todos contra todos si el bloque es chico; si no, cada uno con sus vecinos según `orden`"""
+    if len(bloque) <= MAXIMO_BLOQUE:
+        yield from combinations(bloque, 2)
+        return
+    bloque = sorted(bloque, key=orden)
+    for i, f in enumerate(bloque):
+        for otro in bloque[i + 1:i + 1 + VECINOS]:
+            yield f, otro
+
+
+def buscar_duplicados(umbral=None):
+    """Pares de pacientes que parecen el mismo, del más parecido al menos"""
+    umbral = _umbral() if umbral is None else umbral
+    fichas = [
+        _ficha(*fila) for fila in
+        Paciente.objects.order_by().values_list('id', 'nombre', 'apellido', 'dni', 'telefono', 'email').iterator(chunk_size=5000)
+    ]
+    encontrados = {}  # Un par puede estar en dos bloques (mismo apellido y DNI parecido)
+    for bloque, orden in _bloques(fichas):
+        if len(bloque) < 2:
+            continue
+        for a, b in _pares(bloque, orden):
+            valor = puntaje(a, b, umbral)
+            if valor >= umbral:
+                encontrados[(a.id, b.id) if a.id < b.id else (b.id, a.id)] = valor
+    return sorted((Candidato(valor, *par) for par, valor in encontrados.items()),
+                  key=lambda c: (-c.puntaje, c.paciente_id))
+
+
+def duplicados_cacheados():
+    """`buscar_duplicados` guardado con la versión de pacientes: se recalcula solo si alguien cargó o editó uno"""
+    clave = f'duplicados:{versiones.version("pacientes")}:{_umbral()}'
+    candidatos = cache.get(clave)
+    if candidatos is None:
+        candidatos = buscar_duplicados()
+        cache.set(clave, candidatos, 60 * 60 * 24)
+    return candidatos
+
+
+# --- FUSIÓN ---
+def fusionar(conservar, duplicado, usuario=None):
+    """
+    Pasa todo lo del `duplicado` al paciente que se `conserva` y borra el duplicado.
+    Los datos que le faltan al que se conserva (teléfono, email, obra social) se
+    completan con los del duplicado. Devuelve cuántos turnos se movieron.
+    """
+    if conservar.pk == duplicado.pk:
+        raise ValueError("No se puede fusionar un paciente consigo mismo.")
+
+    with transaction.atomic():
+        conservar, duplicado = (
+            Paciente.objects.select_for_update().get(pk=p.pk) for p in (conservar, duplicado)
+        )
+
+        # Turnos: en bloque, incluidos los borrados (si no, PROTECT no deja borrar el duplicado)
+        filas = list(Turno.todos.filter(paciente=duplicado).order_by().values('id', 'fecha'))
+        Turno.todos.filter(paciente=duplicado).update(paciente=conservar)
+        archivados = TurnoArchivado.objects.filter(paciente=duplicado).update(paciente=conservar)
+
+        # Datos de contacto que le faltan al que se conserva
+        for campo in ('telefono', 'email', 'obra_social_default_id'):
+            if not getattr(conservar, campo) and getattr(duplicado, campo):
+                setattr(conservar, campo, getattr(duplicado, campo))
+        nota = f"Fusionado con {duplicado.apellido}, {duplicado.nombre} (DNI {duplicado.dni})."
+        conservar.observaciones = '\n'.join(filter(None, [conservar.observaciones, duplicado.observaciones, nota]))
+        conservar.save()
+
+        duplicado_id = duplicado.pk
+        auditoria.registrar_varios('paciente', 'BAJA', {duplicado_id: {
+            'fusionado_con': [duplicado_id, conservar.pk],
+            'apellido': [duplicado.apellido, None], 'nombre': [duplicado.nombre, None], 'dni': [duplicado.dni, None],
+        }}, usuario=usuario)
+        duplicado.delete()  # Su resumen de asistencia se borra en cascada
+
+        # Lo que harían las señales de cada turno (versiones, auditoría, agenda, asistencia)
+        if filas:
+            for fila in filas:
+                fila['paciente_id'] = conservar.pk
+            turnos_actualizados(filas, {f['id']: {'paciente_id': [duplicado_id, conservar.pk]} for f in filas}, usuario)
+        elif archivados:
+            asistencia.actualizar([conservar.pk])
+
+    registro.evento('pacientes_fusionados', paciente=conservar.pk, duplicado=duplicado_id,
+                    turnos=len(filas), archivados=archivados,
+                    usuario=usuario.get_username() if usuario else None)
+    return len(filas) + archivados
@@ -0,0 +1,189 @@
+"""
+Estadísticas por tratamiento y por obra social: turnos, atendidos, tasa de
+cancelación, facturado y ticket promedio, mes a mes.
+
+- Cada mes se calcula con consultas agrupadas (tabla activa + archivo) y se guarda
+  en `EstadisticaMensual`. Solo se recalculan los meses cuyos turnos cambiaron
+  (cada mes tiene su versión, que sube la señal de Turno).
+- La comparación es con el mes calendario anterior; la participación de cada uno
+  en el total sale de una función de ventana si la base la soporta.
+- Cada mes calculado guarda además una fila 'MES' con el total, aunque no haya
+  turnos: así un mes vacío también queda al día y no se recalcula en cada visita.
+- El resultado final queda en caché hasta que cambie algún mes del período.
+
+`python manage.py calcular_estadisticas` las deja calculadas de antemano (cron).
+"""
+import datetime
+import hashlib
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Window
+from django.db.models.functions import TruncMonth
+
+from . import versiones
+from .analisis_gastos import meses_hasta
+from .models import EstadisticaMensual, Turno, TurnoArchivado
+
+# dimensión: (campo en EstadisticaMensual, campo en Turno)
+DIMENSIONES = {
+    'TRATAMIENTO': ('tratamiento', 'tratamiento'),
+    'OBRA_SOCIAL': ('obra_social', 'obra_social_aplicada'),
+}
+CENTAVOS = Decimal('0.01')
+
+
+def version_mes(anio, mes):
+    return f'estadisticas:{anio}-{mes:02d}'
+
+
+def _indice(anio, mes):
+    return anio * 12 + mes
+
+
+# --- MATERIALIZAR ---
+def _agrupar(meses, campo_turno):
+    """{(anio, mes, id): {...}} para varios meses, sumando tabla activa y archivo"""
+    rangos = reduce(or_, (
+        Q(fecha__gte=datetime.date(a, m, 1), fecha__lt=datetime.date(a + m // 12, m % 12 + 1, 1))
+        for a, m in meses
+    ))
+    atendido = Q(estado='FINALIZADO')
+    resultado = {}
+    for modelo in (Turno, TurnoArchivado):
+        filas = (
+            modelo.objects.filter(rangos)
+            .annotate(periodo=TruncMonth('fecha'))
+            .values('periodo', f'{campo_turno}_id')
+            .annotate(
+                turnos=Count('id'),
+                atendidos=Count('id', filter=atendido),
+                cancelados=Count('id', filter=Q(estado='CANCELADO')),
+                facturado=Sum(F('monto_paciente') + F('monto_obra_social'), filter=atendido),
+            )
+            .order_by()
+        )
+        for f in filas:
+            clave = (f['periodo'].year, f['periodo'].month, f[f'{campo_turno}_id'])
+            fila = resultado.setdefault(clave, {'turnos': 0, 'atendidos': 0, 'cancelados': 0, 'facturado': Decimal('0')})
+            for campo in ('turnos', 'atendidos', 'cancelados'):
+                fila[campo] += f[campo]
+            fila['facturado'] += f['facturado'] or Decimal('0')
+    return resultado
+
+
+def materializar(meses):
+    """Recalcula los meses que no están calculados o cuyos turnos cambiaron. Devuelve cuáles."""
+    actuales = {m: versiones.version(version_mes(*m)) for m in meses}
+    guardadas = {}
+    for fila in (
+        EstadisticaMensual.objects.filter(reduce(or_, (Q(anio=a, mes=m) for a, m in meses)))
+        .values_list('anio', 'mes', 'version').distinct()
+    ):
+        guardadas.setdefault(fila[:2], set()).add(fila[2])
+    viejos = [m for m in meses if guardadas.get(m) != {actuales[m]}]
+    if not viejos:
+        return []
+
+    vacio = {'turnos': 0, 'atendidos': 0, 'cancelados': 0, 'facturado': Decimal('0')}
+    totales = {m: dict(vacio) for m in viejos}
+    nuevas = []
+    for dimension, (campo, campo_turno) in DIMENSIONES.items():
+        for (anio, mes, objeto_id), datos in _agrupar(viejos, campo_turno).items():
+            nuevas.append(EstadisticaMensual(
+                anio=anio, mes=mes, dimension=dimension, version=actuales[(anio, mes)],
+                **{f'{campo}_id': objeto_id}, **datos,
+            ))
+            if dimension == 'TRATAMIENTO':  # Todo turno tiene tratamiento: sumados dan el total del mes
+                for clave, valor in datos.items():
+                    totales[(anio, mes)][clave] += valor
+    nuevas += [
+        EstadisticaMensual(anio=anio, mes=mes, dimension='MES', version=actuales[(anio, mes)], **datos)
+        for (anio, mes), datos in totales.items()
+    ]
+    with transaction.atomic():
+        EstadisticaMensual.objects.filter(reduce(or_, (Q(anio=a, mes=m) for a, m in viejos))).delete()
+        EstadisticaMensual.objects.bulk_create(nuevas, batch_size=500)
+    return viejos
+
+
+# --- CONSULTAR ---
+def _filas_del_periodo(dimension, meses):
+    campo = DIMENSIONES[dimension][0]
+    por_indice = EstadisticaMensual.objects.filter(dimension=dimension).annotate(indice=F('anio') * 12 + F('mes'))
+    # El mes calendario anterior (no la fila anterior: si ese mes no tuvo turnos, no hay con qué comparar)
+    mes_anterior = por_indice.filter(**{campo: OuterRef(campo)}, indice=OuterRef('indice') - 1).values('facturado')[:1]
+    consulta = (
+        por_indice
+        .filter(indice__gte=_indice(*meses[0]), indice__lte=_indice(*meses[-1]))
+        .annotate(anterior=Subquery(mes_anterior))
+        .values('anio', 'mes', f'{campo}_id', f'{campo}__nombre', 'turnos', 'atendidos', 'cancelados', 'facturado', 'anterior')
+        .order_by(f'{campo}__nombre', f'{campo}_id', 'anio', 'mes')
+    )
+    if connection.features.supports_over_clause:
+        return list(consulta.annotate(total_mes=Window(Sum('facturado'), partition_by=[F('anio'), F('mes')])))
+
+    # Sin funciones de ventana: lo mismo en Python
+    filas = list(consulta)
+    totales = {}
+    for f in filas:
+        totales[(f['anio'], f['mes'])] = totales.get((f['anio'], f['mes']), 0) + f['facturado']
+    for f in filas:
+        f['total_mes'] = totales[(f['anio'], f['mes'])]
+    return filas
+
+
+def _porcentaje(parte, total):
+    return (Decimal(parte) * 100 / total).quantize(Decimal('0.1')) if total else None
+
+
+def _resumir(dimension, meses):
+    campo = DIMENSIONES[dimension][0]
+    ultimo = meses[-1]
+    por_objeto = {}
+    for f in _filas_del_periodo(dimension, meses):
+        por_objeto.setdefault(f[f'{campo}_id'], []).append(f)
+
+    filas = []
+    for objeto_id, meses_objeto in por_objeto.items():
+        turnos = sum(f['turnos'] for f in meses_objeto)
+        atendidos = sum(f['atendidos'] for f in meses_objeto)
+        cancelados = sum(f['cancelados'] for f in meses_objeto)
+        facturado = sum((f['facturado'] for f in meses_objeto), Decimal('0'))
+        del_ultimo = next((f for f in meses_objeto if (f['anio'], f['mes']) == ultimo), None)
+        por_mes = {(f['anio'], f['mes']): f['facturado'] for f in meses_objeto}
+        variacion = None
+        if del_ultimo and del_ultimo['anterior']:
+            variacion = _porcentaje(del_ultimo['facturado'] - del_ultimo['anterior'], del_ultimo['anterior'])
+        filas.append({
+            'id': objeto_id,
+            'nombre': meses_objeto[0][f'{campo}__nombre'],
+            'turnos': turnos,
+            'atendidos': atendidos,
+            'cancelacion': _porcentaje(cancelados, turnos),
+            'facturado': facturado,
+            'ticket': (facturado / atendidos).quantize(CENTAVOS) if atendidos else None,
+            'facturado_mes': del_ultimo['facturado'] if del_ultimo else Decimal('0'),
+            'participacion': _porcentaje(del_ultimo['facturado'], del_ultimo['total_mes']) if del_ultimo else None,
+            'variacion': variacion,
+            'por_mes': [por_mes.get(m, Decimal('0')) for m in meses],
+        })
+    filas.sort(key=lambda f: f['facturado'], reverse=True)
+    return filas
+
+
+def estadisticas(dimension, anio, mes, cantidad=12):
+    """Una fila por tratamiento u obra social con los números de los últimos `cantidad` meses"""
+    meses = meses_hasta(anio, mes, cantidad)
+    huella = hashlib.sha1('-'.join(str(versiones.version(version_mes(*m))) for m in meses).encode()).hexdigest()
+    clave = f'estadisticas:{dimension}:{_indice(*meses[-1])}:{cantidad}:{huella}'
+    filas = cache.get(clave)
+    if filas is None:
+        materializar(meses)
+        filas = _resumir(dimension, meses)
+        cache.set(clave, filas, getattr(settings, 'ESTADISTICAS_CACHE_SEGUNDOS', 60 * 60 * 24))
+    return {'meses': meses, 'filas': filas}
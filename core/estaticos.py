@@ -0,0 +1,16 @@
+"""
+Almacenamiento de los estáticos sin DEBUG.
+
+Es el de WhiteNoise (nombres con hash, .gz/.br y caché de un año), salvo que
+todavía no se haya corrido `collectstatic`: sin manifiesto usa los nombres comunes
+en vez de hacer fallar cada página que tenga un {% static %}.
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class EstaticosComprimidos(CompressedManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        if not self.hashed_files:  # Sin staticfiles.json
+            return name
+        return super().stored_name(name)
@@ -0,0 +1,216 @@
+"""
+Agenda en vivo: cada cambio de un turno deja un `EventoTurno` chiquito y las
+agendas abiertas lo reciben por Server-Sent Events (GET /eventos/turnos/).
+
+Con el servidor ASGI (uvicorn, ver config/asgi.py) hay un solo sondeo a la base
+por proceso, que reparte los eventos nuevos a todas las conexiones abiertas.
+Con runserver (WSGI) la conexión se corta cada tantos segundos y el navegador
+reconecta solo, retomando desde el último evento que recibió.
+
+El navegador solo recibe {"id", "turno", "tipo"} y pide la fila actualizada a
+`fila_turno`, así que cada escritorio baja una fila en vez de la página entera.
+"""
+import asyncio
+import datetime
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import EventoTurno, Turno
+
+# Cada cuántos eventos borramos los viejos
+PODAR_CADA = 500
+MAXIMO_POR_CONSULTA = 200
+
+_silenciados = ContextVar('eventos_silenciados', default=False)
+
+
+def _intervalo():
+    return getattr(settings, 'EVENTOS_INTERVALO', 1.0)
+
+
+# --- PUBLICAR ---
+def publicar(turno_id, tipo):
+    if _silenciados.get():
+        return None
+    evento = EventoTurno.objects.create(turno_id=turno_id, tipo=tipo)
+    if evento.pk % PODAR_CADA == 0:
+        podar()
+    return evento
+
+
+def publicar_varios(turno_ids, tipo):
+    """Un evento por turno en un solo INSERT (para cambios masivos)"""
+    if _silenciados.get() or not turno_ids:
+        return []
+    eventos = EventoTurno.objects.bulk_create([EventoTurno(turno_id=pk, tipo=tipo) for pk in turno_ids])
+    ids = [e.pk for e in eventos if e.pk]
+    if ids and (min(ids) - 1) // PODAR_CADA != max(ids) // PODAR_CADA:  # Pasamos por un múltiplo
+        podar()
+    return eventos
+
+
+def podar(horas=None):
+    """Borra los eventos viejos: una agenda que estuvo horas desconectada se recarga entera"""
+    horas = horas or getattr(settings, 'EVENTOS_RETENCION_HORAS', 24)
+    limite = timezone.now() - datetime.timedelta(hours=horas)
+    return EventoTurno.objects.filter(creado__lt=limite).delete()[0]
+
+
+@contextmanager
+def sin_eventos():
+    """Para movimientos masivos que no cambian lo que ve la agenda (ej: archivar turnos viejos)"""
+    token = _silenciados.set(True)
+    try:
+        yield
+    finally:
+        _silenciados.reset(token)
+
+
+def _tipo_de_cambio(turno, created):
+    if created:
+        return 'ALTA'
+    antes = getattr(turno, '_valores_originales', {})
+    if turno.borrado and not antes.get('borrado'):
+        return 'BAJA'
+    if antes.get('estado') != turno.estado:
+        return 'ESTADO'
+    if antes.get('monto_pagado') != turno.monto_pagado or antes.get('pagado') != turno.pagado:
+        return 'PAGO'
+    return 'CAMBIO'
+
+
+# Se conectan antes que las de auditoría (ver CoreConfig.ready): necesitamos
+# `_valores_originales` como estaban antes de este guardado.
+def turno_guardado(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publicar(instance.pk, _tipo_de_cambio(instance, created))
+
+
+def turno_borrado(sender, instance, **kwargs):
+    publicar(instance.pk, 'BAJA')
+
+
+post_save.connect(turno_guardado, sender=Turno, dispatch_uid='eventos_turno_guardado')
+post_delete.connect(turno_borrado, sender=Turno, dispatch_uid='eventos_turno_borrado')
+
+
+# --- LEER ---
+def ultimo_id():
+    return EventoTurno.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def eventos_desde(desde_id):
+    return list(
+        EventoTurno.objects.filter(id__gt=desde_id).order_by('id')
+        .values('id', 'turno_id', 'tipo')[:MAXIMO_POR_CONSULTA]
+    )
+
+
+def _todos_desde(desde_id):
+    """Como `eventos_desde` pero sin tope: sigue pidiendo hasta que un lote viene incompleto"""
+    while True:
+        eventos = eventos_desde(desde_id)
+        yield from eventos
+        if len(eventos) < MAXIMO_POR_CONSULTA:
+            return
+        desde_id = eventos[-1]['id']
+
+
+def formatear(evento):
+    datos = json.dumps({'id': evento['id'], 'turno': evento['turno_id'], 'tipo': evento['tipo']})
+    return f"id: {evento['id']}\nevent: turno\ndata: {datos}\n\n"
+
+
+class _Difusor:
+    """Un solo sondeo a la base por proceso, repartido entre todas las conexiones"""
+
+    def __init__(self):
+        self.colas = set()
+        self.tarea = None
+        self.ultimo = None
+
+    async def suscribir(self):
+        cola = asyncio.Queue()
+        self.colas.add(cola)
+        if self.tarea is None or self.tarea.done():
+            self.tarea = asyncio.create_task(self._sondear())
+        return cola
+
+    def desuscribir(self, cola):
+        self.colas.discard(cola)
+
+    async def _sondear(self):
+        if self.ultimo is None:
+            self.ultimo = await sync_to_async(ultimo_id)()
+        while self.colas:
+            eventos = await sync_to_async(eventos_desde)(self.ultimo)
+            if eventos:
+                self.ultimo = eventos[-1]['id']
+                for cola in list(self.colas):
+                    cola.put_nowait(eventos)
+            await asyncio.sleep(_intervalo())
+        self.ultimo = None  # Sin conexiones: la próxima arranca de cero
+
+
+_difusor = _Difusor()
+
+
+async def _flujo_asgi(desde_id):
+    # Django 4.2 no se entera si el navegador cerró la pestaña: cortamos cada tanto
+    # y el navegador reconecta, así no quedan flujos huérfanos para siempre.
+    limite = time.monotonic() + getattr(settings, 'EVENTOS_ASGI_SEGUNDOS', 300)
+    cola = await _difusor.suscribir()
+    try:
+        # Lo que se perdió mientras estaba desconectado, de a lotes hasta alcanzar al último
+        # (si no, lo que pasara de MAXIMO_POR_CONSULTA se saltearía al seguir en vivo)
+        while desde_id is not None:
+            eventos = await sync_to_async(eventos_desde)(desde_id)
+            for evento in eventos:
+                desde_id = evento['id']
+                yield formatear(evento)
+            if len(eventos) < MAXIMO_POR_CONSULTA:
+                break
+        espera = getattr(settings, 'EVENTOS_PING_SEGUNDOS', 15)
+        while time.monotonic() < limite:
+            try:
+                eventos = await asyncio.wait_for(cola.get(), timeout=espera)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'  # Evita que un proxy corte la conexión por inactividad
+                continue
+            for evento in eventos:
+                if desde_id is None or evento['id'] > desde_id:
+                    desde_id = evento['id']
+                    yield formatear(evento)
+    finally:
+        _difusor.desuscribir(cola)
+
+
+def _flujo_wsgi(desde_id):
+    """Sin ASGI no podemos dejar un hilo colgado para siempre: cortamos y el navegador reconecta"""
+    if desde_id is None:
+        desde_id = ultimo_id()
+    limite = time.monotonic() + getattr(settings, 'EVENTOS_WSGI_SEGUNDOS', 25)
+    while True:
+        for evento in _todos_desde(desde_id):
+            desde_id = evento['id']
+            yield formatear(evento)
+        if time.monotonic() >= limite:
+            break
+        time.sleep(_intervalo())
+
+
+def flujo_eventos(request, desde_id):
+    """Respuesta text/event-stream (asíncrona si corremos bajo ASGI)"""
+    flujo = _flujo_asgi(desde_id) if hasattr(request, 'scope') else _flujo_wsgi(desde_id)
+    response = StreamingHttpResponse(flujo, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: no juntar los eventos en el buffer
+    return response
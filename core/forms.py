@@ -36,8 +36,8 @@ class TurnoForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
         model = Turno
         # Incluimos 'pagado' para que pueda tildarlo al editar
-        fields = ['fecha', 'hora', 'paciente', 'tratamiento', 'obra_social_aplicada', 
-                  'monto_paciente', 'monto_pagado', 'metodo_pago', 'nota_evolucion', 'pagado']
+        fields = ['fecha', 'hora', 'paciente', 'profesional', 'tratamiento', 'obra_social_aplicada', 
+                  'monto_paciente', 'monto_obra_social', 'monto_pagado', 'metodo_pago', 'nota_evolucion', 'pagado']
         
         widgets = {
             # FORMATO CORRECTO PARA QUE NO SE BORRE LA FECHA
@@ -55,19 +55,24 @@ class TurnoForm(BootstrapFormMixin, forms.ModelForm):
         }
         help_texts = {
             'monto_paciente': 'Dejar en 0 para que el sistema calcule el precio automático según el Arancel.',
+            'monto_obra_social': 'Lo que paga la obra social. Dejar en 0 para tomarlo del Arancel.',
             'obra_social_aplicada': 'Seleccioná con qué obra social se atiende HOY.',
             'pagado': 'Marcar si canceló el TOTAL de la deuda.'
         }
 
     def clean(self):
         cleaned_data = super().clean()
+        self._validar_montos(cleaned_data)
         fecha = cleaned_data.get('fecha')
         hora = cleaned_data.get('hora')
+        profesional = cleaned_data.get('profesional')
 
         if not fecha or not hora:
             return cleaned_data
 
+        # Cada profesional tiene su agenda: dos profesionales pueden atender a la misma hora
         coincidencias = Turno.objects.filter(
+            profesional=profesional,
             fecha=fecha, 
             hora=hora
         ).exclude(estado='CANCELADO')
@@ -76,10 +81,33 @@ class TurnoForm(BootstrapFormMixin, forms.ModelForm):
             coincidencias = coincidencias.exclude(pk=self.instance.pk)
 
         if coincidencias.exists():
-            raise forms.ValidationError("⚠️ ¡Cuidado! Ya existe un turno activo en ese horario.")
+            raise forms.ValidationError("⚠️ ¡Cuidado! Ya existe un turno activo en ese horario para este profesional.")
         
         return cleaned_data
 
+    def _validar_montos(self, cleaned_data):
+        """Lo cobrado va de 0 al precio: no se recorta, se avisa (un pago de más es plata que entró)"""
+        monto_paciente = cleaned_data.get('monto_paciente')
+        monto_pagado = cleaned_data.get('monto_pagado')
+        if monto_paciente is None or monto_pagado is None:
+            return
+        if monto_paciente < 0:
+            self.add_error('monto_paciente', "El precio no puede ser negativo.")
+            return
+        if monto_pagado < 0:
+            self.add_error('monto_pagado', "El monto pagado no puede ser negativo.")
+            return
+
+        precio = monto_paciente
+        if not precio and not self.instance.pk:
+            # En 0 el turno nuevo toma el precio del arancel al guardarse (ver Turno.save)
+            arancel = Arancel.objects.filter(
+                obra_social=cleaned_data.get('obra_social_aplicada'), tratamiento=cleaned_data.get('tratamiento'),
+            ).first()
+            precio = arancel.copago_sugerido if arancel else 0
+        if monto_pagado > precio:
+            self.add_error('monto_pagado', f"El monto pagado (${monto_pagado}) supera el precio del turno (${precio}).")
+
 # --- ACÁ ESTÁ EL SEGUNDO ARREGLO (GASTOS) ---
 class GastoForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
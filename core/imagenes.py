@@ -0,0 +1,84 @@
+"""
+Versiones optimizadas del logo del consultorio.
+
+El logo original puede ser una foto de celular de varios MB. Las páginas usan
+estas variantes chicas; el nombre de cada archivo lleva un hash del contenido,
+así el navegador puede guardarlas en caché sin miedo a mostrar una vieja.
+"""
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# campo: (tamaño, recortar al cuadrado, formato)
+VARIANTES = {
+    'logo_favicon': ((64, 64), True, 'PNG'),
+    'logo_avatar': ((60, 60), True, None),       # Se ve a 30px: 2x para pantallas retina
+    'logo_banner': ((600, 400), False, None),    # Sidebar: ~300px de ancho y 200px de alto máx.
+    'logo_banner_webp': ((600, 400), False, 'WEBP'),
+}
+
+
+def _formato(imagen, formato):
+    """Sin formato fijo: PNG si tiene transparencia, JPEG si es una foto"""
+    if formato:
+        return formato
+    return 'PNG' if imagen.mode in ('RGBA', 'LA', 'P') else 'JPEG'
+
+
+def _procesar(original, tamano, recortar, formato):
+    if recortar:
+        imagen = ImageOps.fit(original, tamano, Image.LANCZOS)
+    else:
+        imagen = original.copy()
+        imagen.thumbnail(tamano, Image.LANCZOS)
+
+    formato = _formato(imagen, formato)
+    if formato == 'JPEG' and imagen.mode != 'RGB':
+        imagen = imagen.convert('RGB')
+
+    salida = io.BytesIO()
+    opciones = {
+        'PNG': {'optimize': True},
+        'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+        'WEBP': {'quality': 82, 'method': 6},
+    }[formato]
+    imagen.save(salida, formato, **opciones)
+    return salida.getvalue(), formato.lower().replace('jpeg', 'jpg')
+
+
+def abrir_imagen(archivo):
+    """Devuelve la imagen lista para procesar o lanza ValueError si no es una imagen"""
+    try:
+        archivo.seek(0)
+        imagen = Image.open(archivo)
+        imagen.load()
+    except Exception:
+        raise ValueError("El archivo no es una imagen válida.")
+    finally:
+        archivo.seek(0)
+
+    # Las fotos de celular vienen giradas según el EXIF
+    imagen = ImageOps.exif_transpose(imagen)
+    if imagen.mode not in ('RGB', 'RGBA'):
+        imagen = imagen.convert('RGBA' if 'transparency' in imagen.info or imagen.mode in ('LA', 'P') else 'RGB')
+    return imagen
+
+
+def generar_variantes_logo(config):
+    """Genera todas las variantes a partir de config.logo y borra las anteriores"""
+    with config.logo.open('rb') as archivo:
+        contenido = archivo.read()
+        original = abrir_imagen(archivo)
+    huella = hashlib.sha1(contenido).hexdigest()[:10]
+
+    for campo, (tamano, recortar, formato) in VARIANTES.items():
+        datos, extension = _procesar(original, tamano, recortar, formato)
+        anterior = getattr(config, campo)
+        if anterior:
+            anterior.delete(save=False)
+        nombre = f"{campo.replace('logo_', '')}-{huella}.{extension}"
+        getattr(config, campo).save(nombre, ContentFile(datos), save=False)
+
+    config.save(update_fields=list(VARIANTES))
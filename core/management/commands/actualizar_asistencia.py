@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.asistencia import actualizar, pacientes_con_cambios
+from core.models import Paciente
+
+
+class Command(BaseCommand):
+    help = 'Actualiza el riesgo de ausencia de los pacientes (turnos que pasaron, deudas vencidas). Correr cada noche.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=1,
+                            help='Revisar lo que cambió en los últimos N días (si el cron no corrió, subirlo).')
+        parser.add_argument('--todos', action='store_true',
+                            help='Recalcular todos los pacientes (por ejemplo, la primera vez).')
+
+    def handle(self, *args, **options):
+        if options['todos']:
+            ids = list(Paciente.objects.values_list('pk', flat=True))
+        else:
+            ids = list(pacientes_con_cambios(max(1, options['dias'])))
+        total = 0
+        for i in range(0, len(ids), 500):
+            total += actualizar(ids[i:i + 500])
+        self.stdout.write(self.style.SUCCESS(f'Asistencia actualizada para {total} pacientes.'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.respaldos import copiar_base, ruta_snapshot_reportes
+
+
+class Command(BaseCommand):
+    help = 'Renueva la copia de la base que usan los reportes (balance, conciliación, exportaciones).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cada', type=int, default=0,
+                            help='Repetir cada tantos segundos (0 = una sola vez).')
+
+    def handle(self, *args, **options):
+        while True:
+            inicio = time.monotonic()
+            try:
+                destino = copiar_base(ruta_snapshot_reportes())
+            except ValueError as e:
+                raise CommandError(f"{e} Con Postgres, apuntá la conexión 'reportes' a una réplica.")
+            self.stdout.write(self.style.SUCCESS(
+                f'Copia de reportes actualizada en {time.monotonic() - inicio:.1f}s: {destino}'
+            ))
+            if not options['cada']:
+                break
+            time.sleep(options['cada'])
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.archivo import archivar_turnos, borrados_para_purgar, purgar_borrados, turnos_archivables
+
+
+class Command(BaseCommand):
+    help = ('Mueve al archivo los turnos atendidos y pagados más viejos que TURNOS_DIAS_ARCHIVO días '
+            'y borra de verdad los que tenían borrado lógico.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.TURNOS_DIAS_ARCHIVO,
+                            help='Antigüedad mínima en días (por defecto: %(default)s).')
+        parser.add_argument('--lote', type=int, default=1000, help='Turnos por transacción.')
+        parser.add_argument('--simular', action='store_true', help='Solo cuenta, no mueve nada.')
+
+    def handle(self, *args, **options):
+        if options['simular']:
+            cantidad = turnos_archivables(options['dias']).count()
+            borrados = borrados_para_purgar(options['dias']).count()
+            self.stdout.write(f'Se archivarían {cantidad} turnos y se purgarían {borrados} borrados.')
+            return
+
+        cantidad = archivar_turnos(dias=options['dias'], lote=options['lote'])
+        borrados = purgar_borrados(dias=options['dias'], lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{cantidad} turnos archivados, {borrados} borrados purgados.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.analisis_gastos import meses_hasta
+from core.estadisticas import materializar
+
+
+class Command(BaseCommand):
+    help = 'Calcula y guarda las estadísticas mensuales por tratamiento y obra social (solo los meses que cambiaron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, default=24, help='Cuántos meses hacia atrás revisar.')
+
+    def handle(self, *args, **options):
+        hoy = timezone.localdate()
+        recalculados = materializar(meses_hasta(hoy.year, hoy.month, max(1, options['meses'])))
+        if recalculados:
+            meses = ', '.join(f'{m:02d}/{a}' for a, m in recalculados)
+            self.stdout.write(self.style.SUCCESS(f'Recalculados {len(recalculados)} meses: {meses}'))
+        else:
+            self.stdout.write('Las estadísticas ya estaban al día.')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.cierre import cerrar_pendientes, vista_previa
+
+
+class Command(BaseCommand):
+    help = 'Cierra los turnos PENDIENTE que quedaron atrás (AUSENTE o FINALIZADO según el pago). Correr cada noche.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Cerrar los pendientes de hace más de N días (por defecto CIERRE_PENDIENTES_DIAS).')
+        parser.add_argument('--simular', action='store_true',
+                            help='Solo mostrar cuántos se cerrarían, sin cambiar nada.')
+
+    def handle(self, *args, **options):
+        if options['simular']:
+            resumen = vista_previa(options['dias'])
+            for estado, cantidad in resumen.items():
+                self.stdout.write(f'{estado}: {cantidad}')
+            self.stdout.write(self.style.SUCCESS(f'Se cerrarían {sum(resumen.values())} turnos.'))
+            return
+
+        lote = cerrar_pendientes(options['dias'], automatico=True)
+        if lote is None:
+            self.stdout.write(self.style.SUCCESS('No hay turnos pendientes vencidos.'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Se cerraron {lote.cantidad} turnos (lote {lote.pk}). Revisarlos en /cierres/.'
+        ))
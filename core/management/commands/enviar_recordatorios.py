@@ -0,0 +1,30 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.recordatorios import enviar_recordatorios
+
+
+class Command(BaseCommand):
+    help = ('Manda por email el recordatorio de los turnos pendientes de mañana. '
+            'Pensado para correr una vez por día (cron / Programador de tareas).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Día de los turnos (AAAA-MM-DD). Por defecto, mañana.')
+        parser.add_argument('--lote', type=int, help='Cantidad de mails por lote.')
+        parser.add_argument('--simular', action='store_true', help='Solo cuenta, no manda nada.')
+
+    def handle(self, *args, **options):
+        fecha = None
+        if options['fecha']:
+            try:
+                fecha = datetime.date.fromisoformat(options['fecha'])
+            except ValueError:
+                raise CommandError('La fecha tiene que tener el formato AAAA-MM-DD.')
+
+        resumen = enviar_recordatorios(fecha=fecha, tamano_lote=options['lote'], simular=options['simular'])
+
+        self.stdout.write(
+            f"Turnos del {resumen['fecha']:%d/%m/%Y}: {resumen['total']} a recordar, "
+            f"{resumen['enviados']} enviados, {resumen['sin_email']} sin email, {resumen['errores']} con error."
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.resumenes import generar_resumenes
+from core.routers import leer_de_reportes
+
+
+class Command(BaseCommand):
+    help = 'Genera las planillas por obra social y los resúmenes de cuenta de pacientes de un mes (ZIP).'
+
+    def add_arguments(self, parser):
+        hoy = timezone.localdate()
+        parser.add_argument('--anio', type=int, default=hoy.year)
+        parser.add_argument('--mes', type=int, default=hoy.month)
+        parser.add_argument('--procesos', type=int, default=None, help='Procesos para renderizar.')
+        parser.add_argument('--salida', help='Archivo ZIP (por defecto resumenes_AAAA_MM.zip).')
+
+    def handle(self, *args, **options):
+        anio, mes = options['anio'], options['mes']
+        if not 1 <= mes <= 12:
+            raise CommandError('El mes tiene que estar entre 1 y 12.')
+        inicio = time.monotonic()
+        with leer_de_reportes():
+            resultado = generar_resumenes(anio, mes, procesos=options['procesos'])
+        salida = options['salida'] or f'resumenes_{anio}_{mes:02d}.zip'
+        with open(salida, 'wb') as archivo:
+            archivo.write(resultado['contenido'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['documentos']} documentos ({resultado['renderizados']} renderizados, el resto sin cambios) "
+            f"en {time.monotonic() - inicio:.1f}s: {salida}"
+        ))
@@ -0,0 +1,80 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.models import Tarea
+from core.tareas import ejecutar, latir, recuperar_abandonadas, tomar_siguiente
+
+
+def _inicializar_proceso():
+    # Cada proceso hijo abre sus propias conexiones a la base
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def _ejecutar_en_proceso(tarea_id):
+    try:
+        return ejecutar(tarea_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de tareas en segundo plano (exportaciones, reportes pesados).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=getattr(settings, 'TAREAS_PROCESOS', 2),
+                            help='Cantidad de tareas que corren en paralelo.')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos de espera cuando la cola está vacía.')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa lo que haya en cola y termina (útil para cron).')
+
+    def handle(self, *args, **options):
+        procesos = max(1, options['procesos'])
+
+        # Si un worker se cortó a mitad de camino, esas tareas vuelven a la cola
+        # (las que otro worker sigue corriendo no: las renueva con latir)
+        recuperadas = recuperar_abandonadas()
+        if recuperadas:
+            self.stdout.write(f'{recuperadas} tarea(s) interrumpidas vuelven a la cola.')
+
+        # No heredar conexiones abiertas a los procesos hijos
+        connections.close_all()
+
+        self.stdout.write(f'Procesando tareas con {procesos} proceso(s)...')
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso) as pool:
+            en_curso = {}
+            try:
+                while True:
+                    if en_curso:
+                        latir(en_curso.values())
+                    while len(en_curso) < procesos:
+                        tarea = tomar_siguiente()
+                        if tarea is None:
+                            break
+                        self.stdout.write(f'-> {tarea.pk}: {tarea.get_tipo_display()}')
+                        en_curso[pool.submit(_ejecutar_en_proceso, tarea.pk)] = tarea.pk
+                    connections.close_all()
+
+                    if not en_curso:
+                        if options['una_vez']:
+                            break
+                        time.sleep(options['intervalo'])
+                        continue
+
+                    terminadas, _ = wait(en_curso, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                    for futuro in terminadas:
+                        tarea_id = en_curso.pop(futuro)
+                        try:
+                            estado = futuro.result()
+                        except Exception as e:  # El proceso hijo murió
+                            Tarea.objects.filter(pk=tarea_id).update(estado='ERROR', error=str(e))
+                            estado = 'ERROR'
+                        self.stdout.write(f'<- {tarea_id}: {estado}')
+            except KeyboardInterrupt:
+                self.stdout.write('Deteniendo worker...')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.imagenes import generar_variantes_logo
+from core.models import Configuracion
+
+
+class Command(BaseCommand):
+    help = 'Vuelve a generar las versiones chicas del logo (favicon, avatar y banner).'
+
+    def handle(self, *args, **options):
+        config = Configuracion.objects.first()
+        if not config or not config.logo:
+            self.stdout.write('No hay logo cargado.')
+            return
+
+        generar_variantes_logo(config)
+        for campo in ('logo_favicon', 'logo_avatar', 'logo_banner', 'logo_banner_webp'):
+            archivo = getattr(config, campo)
+            self.stdout.write(f'{campo}: {archivo.name} ({archivo.size // 1024} KB)')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.respaldos import crear_respaldo
+
+
+class Command(BaseCommand):
+    help = 'Respaldo comprimido y verificado de la base y de los archivos subidos, sin frenar la aplicación.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', help='Carpeta de respaldos (por defecto RESPALDOS_DIR).')
+        parser.add_argument('--conservar', type=int, default=14,
+                            help='Cantidad de respaldos a conservar (0 = todos).')
+        parser.add_argument('--sin-media', action='store_true', help='Respaldar solo la base.')
+
+    def handle(self, *args, **options):
+        try:
+            resultado = crear_respaldo(
+                options['destino'], incluir_media=not options['sin_media'], conservar=options['conservar'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        base = 'nueva' if resultado['base_nueva'] else 'sin cambios, se reutiliza la anterior'
+        self.stdout.write(self.style.SUCCESS(
+            f"Respaldo {resultado['ruta']}: base {base}, "
+            f"{resultado['media_copiados']} archivos de media nuevos de {len(resultado['media'])}, "
+            f"{resultado['borrados']} respaldos viejos borrados."
+        ))
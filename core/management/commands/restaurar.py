@@ -0,0 +1,49 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.respaldos import crear_respaldo, listar_respaldos, restaurar_respaldo, verificar_respaldo
+
+
+class Command(BaseCommand):
+    help = 'Verifica un respaldo y, con --confirmar, reemplaza la base y los archivos de media por los suyos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('respaldo', nargs='?', help='Manifiesto (respaldo-AAAAMMDD-HHMMSS-micros.json). Por defecto el último.')
+        parser.add_argument('--destino', help='Carpeta de respaldos (por defecto RESPALDOS_DIR).')
+        parser.add_argument('--confirmar', action='store_true',
+                            help='Restaurar de verdad (sin esto solo se verifica).')
+        parser.add_argument('--sin-previo', action='store_true',
+                            help='No respaldar el estado actual antes de restaurar.')
+
+    def handle(self, *args, **options):
+        ruta = self._elegir(options['respaldo'], options['destino'])
+        try:
+            manifiesto = verificar_respaldo(ruta)
+        except (ValueError, OSError) as e:
+            raise CommandError(f'El respaldo no sirve: {e}')
+        self.stdout.write(f"Respaldo del {manifiesto['fecha']} verificado ({len(manifiesto['media'])} archivos de media).")
+        if not options['confirmar']:
+            self.stdout.write('Para restaurarlo, detené la aplicación y repetí con --confirmar.')
+            return
+
+        if not options['sin_previo']:
+            # Por si el respaldo elegido no era el correcto
+            previo = crear_respaldo(os.path.dirname(ruta))
+            self.stdout.write(f"Estado actual guardado en {previo['ruta']}.")
+        restaurar_respaldo(ruta)
+        self.stdout.write(self.style.SUCCESS(
+            'Base restaurada. Corré `manage.py migrate` si el respaldo es de una versión anterior '
+            'y `manage.py actualizar_copia_reportes` para renovar la copia de reportes.'
+        ))
+
+    def _elegir(self, respaldo, directorio):
+        if respaldo:
+            if os.path.exists(respaldo):
+                return respaldo
+            respaldos = [r for r in listar_respaldos(directorio) if os.path.basename(r) == respaldo]
+        else:
+            respaldos = listar_respaldos(directorio)
+        if not respaldos:
+            raise CommandError('No se encontró el respaldo.')
+        return respaldos[-1]
@@ -0,0 +1,37 @@
+import time
+
+from . import auditoria
+
+
+class AuditoriaMiddleware:
+    """
+    Junta los cambios auditados durante el pedido y los guarda todos juntos al final,
+    así cada save() no paga un INSERT extra.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        usuario = request.user if request.user.is_authenticated else None
+        tokens = auditoria.iniciar(usuario)
+        try:
+            return self.get_response(request)
+        finally:
+            auditoria.terminar(tokens)
+
+
+class EscrituraRecienteMiddleware:
+    """
+    Anota en la sesión cuándo guardó algo el usuario. Los reportes que leen de la
+    copia (ver core.routers.tolera_desfase) usan la principal hasta que la copia
+    incluya ese cambio.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400 \
+                and getattr(request, 'user', None) and request.user.is_authenticated:
+            request.session['ultima_escritura'] = time.time()
+        return response
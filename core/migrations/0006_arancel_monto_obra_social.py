@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_configuracion_alter_turno_estado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arancel',
+            name='monto_obra_social',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='liquidacionobrasocial',
+            name='periodo_anio',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='liquidacionobrasocial',
+            name='periodo_mes',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='monto_obra_social',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=10),
+        ),
+    ]
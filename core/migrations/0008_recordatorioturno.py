@@ -0,0 +1,26 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tarea'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordatorioTurno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('ENVIADO', 'Enviado'), ('SIN_EMAIL', 'Paciente sin email'), ('ERROR', 'Error al enviar')], max_length=20)),
+                ('intentos', models.PositiveSmallIntegerField(default=1)),
+                ('enviado', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('turno', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recordatorio', to='core.turno')),
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:06
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+# En SQLite la base misma rechaza modificar o borrar filas de la auditoría.
+# (Se permite que "usuario" pase a NULL cuando se borra un usuario.)
+TRIGGERS_SQLITE = [
+    """
+    CREATE TRIGGER auditoria_sin_modificar
+    BEFORE UPDATE OF fecha, usuario_nombre, modelo, objeto_id, accion, cambios ON core_registroauditoria
+    BEGIN SELECT RAISE(ABORT, 'El registro de auditoria no se puede modificar'); END
+    """,
+    """
+    CREATE TRIGGER auditoria_sin_borrar
+    BEFORE DELETE ON core_registroauditoria
+    BEGIN SELECT RAISE(ABORT, 'El registro de auditoria no se puede borrar'); END
+    """,
+]
+
+
+def crear_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in TRIGGERS_SQLITE:
+            schema_editor.execute(sql)
+
+
+def borrar_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TRIGGER IF EXISTS auditoria_sin_modificar")
+        schema_editor.execute("DROP TRIGGER IF EXISTS auditoria_sin_borrar")
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0008_recordatorioturno'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('usuario_nombre', models.CharField(blank=True, default='', max_length=150)),
+                ('modelo', models.CharField(max_length=50)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('accion', models.CharField(choices=[('ALTA', 'Alta'), ('MODIFICACION', 'Modificación'), ('BAJA', 'Baja')], max_length=20)),
+                ('cambios', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Registro de Auditoría',
+                'verbose_name_plural': 'Registro de Auditoría',
+                'ordering': ['-fecha', '-id'],
+                'indexes': [models.Index(fields=['fecha'], name='auditoria_fecha_idx'), models.Index(fields=['usuario', 'fecha'], name='auditoria_usuario_fecha_idx'), models.Index(fields=['modelo', 'objeto_id', 'fecha'], name='auditoria_objeto_idx')],
+            },
+        ),
+        migrations.RunPython(crear_triggers, borrar_triggers),
+    ]
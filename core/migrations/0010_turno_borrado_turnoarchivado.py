@@ -0,0 +1,63 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_registroauditoria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TurnoArchivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_original', models.BigIntegerField(unique=True)),
+                ('fecha', models.DateField()),
+                ('hora', models.TimeField()),
+                ('monto_paciente', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('monto_pagado', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('monto_obra_social', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('pagado', models.BooleanField()),
+                ('metodo_pago', models.CharField(blank=True, choices=[('EFECTIVO', 'Efectivo'), ('TRANSFERENCIA', 'Transferencia/MP')], max_length=20, null=True)),
+                ('estado', models.CharField(choices=[('PENDIENTE', '⏳ Pendiente'), ('FINALIZADO', '✅ Atendido'), ('CANCELADO', '🚫 Cancelado')], max_length=20)),
+                ('nota_evolucion', models.TextField(blank=True, null=True)),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Turnos archivados',
+                'ordering': ['-fecha', '-hora'],
+            },
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='borrado',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(condition=models.Q(('borrado', False)), fields=['fecha', 'hora'], name='turno_activo_fecha_idx'),
+        ),
+        migrations.AddField(
+            model_name='turnoarchivado',
+            name='obra_social_aplicada',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.obrasocial'),
+        ),
+        migrations.AddField(
+            model_name='turnoarchivado',
+            name='paciente',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='turnos_archivados', to='core.paciente'),
+        ),
+        migrations.AddField(
+            model_name='turnoarchivado',
+            name='tratamiento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.tipotratamiento'),
+        ),
+        migrations.AddIndex(
+            model_name='turnoarchivado',
+            index=models.Index(fields=['fecha'], name='turnoarchivado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_turno_borrado_turnoarchivado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='configuracion',
+            name='logo_avatar',
+            field=models.ImageField(blank=True, null=True, upload_to='logos/variantes/'),
+        ),
+        migrations.AddField(
+            model_name='configuracion',
+            name='logo_banner',
+            field=models.ImageField(blank=True, null=True, upload_to='logos/variantes/'),
+        ),
+        migrations.AddField(
+            model_name='configuracion',
+            name='logo_banner_webp',
+            field=models.ImageField(blank=True, null=True, upload_to='logos/variantes/'),
+        ),
+        migrations.AddField(
+            model_name='configuracion',
+            name='logo_favicon',
+            field=models.ImageField(blank=True, null=True, upload_to='logos/variantes/'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_configuracion_variantes_logo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoTurno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('turno_id', models.PositiveBigIntegerField()),
+                ('tipo', models.CharField(choices=[('ALTA', 'Turno nuevo'), ('ESTADO', 'Cambio de estado'), ('PAGO', 'Pago'), ('CAMBIO', 'Otros cambios'), ('BAJA', 'Turno borrado')], max_length=10)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['creado'], name='evento_turno_creado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0012_eventoturno'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profesional',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('apellido', models.CharField(max_length=100)),
+                ('matricula', models.CharField(blank=True, max_length=50, null=True)),
+                ('activo', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Profesionales',
+                'ordering': ['apellido', 'nombre'],
+            },
+        ),
+        migrations.AddField(
+            model_name='profesional',
+            name='usuario',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profesional', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='gasto',
+            name='profesional',
+            field=models.ForeignKey(blank=True, help_text='Vacío si es un gasto del consultorio en general.', null=True, on_delete=django.db.models.deletion.PROTECT, to='core.profesional'),
+        ),
+        migrations.AddField(
+            model_name='liquidacionobrasocial',
+            name='profesional',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='core.profesional'),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='profesional',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='core.profesional'),
+        ),
+        migrations.AddField(
+            model_name='turnoarchivado',
+            name='profesional',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.profesional'),
+        ),
+        migrations.AddIndex(
+            model_name='gasto',
+            index=models.Index(fields=['profesional', 'fecha'], name='gasto_prof_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='liquidacionobrasocial',
+            index=models.Index(fields=['profesional', 'fecha_ingreso'], name='liquidacion_prof_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(condition=models.Q(('borrado', False)), fields=['profesional', 'fecha', 'hora'], name='turno_prof_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='turnoarchivado',
+            index=models.Index(fields=['profesional', 'fecha'], name='turnoarchivado_prof_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:27
+
+from django.db import migrations, models
+from django.db.models import F, Q
+
+
+def calcular_saldos(apps, schema_editor):
+    """
+    Llena el saldo de los turnos existentes. Los pagos no se tocan: si hay alguno
+    fuera de rango (antes se podía cobrar de más) la migración se frena y lista
+    cuáles son, para corregirlos a mano antes de agregar la restricción.
+    """
+    fuera_de_rango = []
+    for nombre in ('Turno', 'TurnoArchivado'):
+        modelo = apps.get_model('core', nombre)
+        fuera_de_rango += [
+            f"{nombre} {pk}: {fecha}, precio ${paciente}, pagado ${pagado}"
+            for pk, fecha, paciente, pagado in modelo._base_manager.filter(
+                Q(monto_pagado__lt=0) | Q(monto_pagado__gt=F('monto_paciente'))
+            ).order_by('pk').values_list('pk', 'fecha', 'monto_paciente', 'monto_pagado')
+        ]
+    if fuera_de_rango:
+        raise RuntimeError(
+            f"Hay {len(fuera_de_rango)} turno(s) con un pago negativo o mayor que el precio. "
+            "Corregí el precio o el pago de cada uno y volvé a migrar:\n" + '\n'.join(fuera_de_rango)
+        )
+
+    for nombre in ('Turno', 'TurnoArchivado'):
+        apps.get_model('core', nombre)._base_manager.update(saldo=F('monto_paciente') - F('monto_pagado'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_profesional'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='turno',
+            name='saldo',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='turnoarchivado',
+            name='saldo',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(calcular_saldos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(condition=models.Q(('borrado', False)), fields=['estado', 'saldo'], name='turno_estado_saldo_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='turno',
+            constraint=models.CheckConstraint(check=models.Q(('monto_pagado__gte', 0), ('monto_pagado__lte', models.F('monto_paciente'))), name='turno_monto_pagado_valido'),
+        ),
+        migrations.AddConstraint(
+            model_name='turnoarchivado',
+            constraint=models.CheckConstraint(check=models.Q(('monto_pagado__gte', 0), ('monto_pagado__lte', models.F('monto_paciente'))), name='turnoarchivado_monto_pagado_valido'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_saldo_turno'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoriagasto',
+            name='presupuesto_mensual',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Opcional: tope de gasto por mes para el análisis de gastos.', max_digits=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='gasto',
+            index=models.Index(fields=['categoria', 'fecha'], name='gasto_categoria_fecha_idx'),
+        ),
+    ]
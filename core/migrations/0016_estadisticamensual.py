@@ -0,0 +1,36 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_presupuesto_categoria_gasto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField()),
+                ('mes', models.PositiveSmallIntegerField()),
+                ('dimension', models.CharField(choices=[('TRATAMIENTO', 'Tratamiento'), ('OBRA_SOCIAL', 'Obra social')], max_length=20)),
+                ('turnos', models.PositiveIntegerField(default=0)),
+                ('atendidos', models.PositiveIntegerField(default=0)),
+                ('cancelados', models.PositiveIntegerField(default=0)),
+                ('facturado', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('version', models.BigIntegerField()),
+                ('calculada', models.DateTimeField(auto_now=True)),
+                ('obra_social', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.obrasocial')),
+                ('tratamiento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.tipotratamiento')),
+            ],
+            options={
+                'verbose_name_plural': 'Estadísticas mensuales',
+                'ordering': ['anio', 'mes'],
+                'indexes': [models.Index(fields=['dimension', 'anio', 'mes'], name='estadistica_dim_mes_idx')],
+            },
+        ),
+    ]
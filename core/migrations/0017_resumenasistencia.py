@@ -0,0 +1,30 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_estadisticamensual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAsistencia',
+            fields=[
+                ('paciente', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='asistencia', serialize=False, to='core.paciente')),
+                ('turnos', models.PositiveIntegerField(default=0)),
+                ('atendidos', models.PositiveIntegerField(default=0)),
+                ('cancelados', models.PositiveIntegerField(default=0)),
+                ('ausentes', models.PositiveIntegerField(default=0)),
+                ('impagos', models.PositiveIntegerField(default=0)),
+                ('riesgo', models.PositiveSmallIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Resúmenes de asistencia',
+            },
+        ),
+    ]
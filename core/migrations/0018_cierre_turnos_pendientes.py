@@ -0,0 +1,77 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0017_resumenasistencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CierreTurno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('regla', models.CharField(max_length=20)),
+                ('estado_nuevo', models.CharField(choices=[('PENDIENTE', '⏳ Pendiente'), ('FINALIZADO', '✅ Atendido'), ('CANCELADO', '🚫 Cancelado'), ('AUSENTE', '🚷 No asistió')], max_length=20)),
+                ('deshecho', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LoteCierre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('automatico', models.BooleanField(default=False)),
+                ('estado', models.CharField(choices=[('APLICADO', 'Para revisar'), ('CONFIRMADO', 'Confirmado'), ('DESHECHO', 'Deshecho')], default='APLICADO', max_length=20)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('revisado', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Lotes de cierre',
+                'ordering': ['-creado'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='turno',
+            name='estado',
+            field=models.CharField(choices=[('PENDIENTE', '⏳ Pendiente'), ('FINALIZADO', '✅ Atendido'), ('CANCELADO', '🚫 Cancelado'), ('AUSENTE', '🚷 No asistió')], default='PENDIENTE', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='turnoarchivado',
+            name='estado',
+            field=models.CharField(choices=[('PENDIENTE', '⏳ Pendiente'), ('FINALIZADO', '✅ Atendido'), ('CANCELADO', '🚫 Cancelado'), ('AUSENTE', '🚷 No asistió')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(condition=models.Q(('borrado', False)), fields=['estado', 'fecha'], name='turno_estado_fecha_idx'),
+        ),
+        migrations.AddField(
+            model_name='lotecierre',
+            name='revisado_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='lotecierre',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='cierreturno',
+            name='lote',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cierres', to='core.lotecierre'),
+        ),
+        migrations.AddField(
+            model_name='cierreturno',
+            name='turno',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.turno'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-19 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_cierre_turnos_pendientes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='estadisticamensual',
+            name='dimension',
+            field=models.CharField(choices=[('TRATAMIENTO', 'Tratamiento'), ('OBRA_SOCIAL', 'Obra social'), ('MES', 'Total del mes')], max_length=20),
+        ),
+    ]
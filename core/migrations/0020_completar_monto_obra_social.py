@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def completar_monto_obra_social(apps, schema_editor):
+    """
+    Los turnos cargados antes de 0006 quedaron con monto_obra_social = 0. Se completan
+    con el monto del arancel (obra social + tratamiento), como hace Turno.save() al crearlos.
+    """
+    Arancel = apps.get_model('core', 'Arancel')
+    for nombre in ('Turno', 'TurnoArchivado'):
+        modelo = apps.get_model('core', nombre)
+        for arancel in Arancel.objects.filter(monto_obra_social__gt=0).iterator():
+            modelo._base_manager.filter(
+                obra_social_aplicada_id=arancel.obra_social_id, tratamiento_id=arancel.tratamiento_id,
+                monto_obra_social=0,
+            ).update(monto_obra_social=arancel.monto_obra_social)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_estadistica_total_mes'),
+    ]
+
+    operations = [
+        migrations.RunPython(completar_monto_obra_social, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.10 on 2026-10-19 19:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_tarea_latido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cierreturno',
+            name='turno_archivado',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.turnoarchivado'),
+        ),
+        migrations.AddField(
+            model_name='recordatorioturno',
+            name='turno_archivado',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.turnoarchivado'),
+        ),
+        migrations.AlterField(
+            model_name='cierreturno',
+            name='turno',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.turno'),
+        ),
+        migrations.AlterField(
+            model_name='recordatorioturno',
+            name='turno',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recordatorio', to='core.turno'),
+        ),
+    ]
@@ -1,6 +1,19 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
+
+class AuditableMixin:
+    """
+    Recuerda los valores tal como se leyeron de la base, así la auditoría puede
+    comparar al guardar sin hacer otra consulta.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._valores_originales = dict(zip(field_names, values))
+        return instancia
+
 class ObraSocial(models.Model):
     nombre = models.CharField(max_length=100)
     
@@ -19,11 +32,13 @@ class TipoTratamiento(models.Model):
 
 class Arancel(models.Model):
     """
-    Define cuánto paga el paciente (Copago) para cada combinación.
+    Define cuánto paga el paciente (Copago) y cuánto la obra social para cada combinación.
     """
     obra_social = models.ForeignKey(ObraSocial, on_delete=models.CASCADE)
     tratamiento = models.ForeignKey(TipoTratamiento, on_delete=models.CASCADE)
     copago_sugerido = models.DecimalField(max_digits=10, decimal_places=2)
+    # Lo que la obra social nos tiene que liquidar por cada prestación
+    monto_obra_social = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     
     class Meta:
         unique_together = ('obra_social', 'tratamiento')
@@ -45,11 +60,46 @@ class Paciente(models.Model):
         os_nombre = self.obra_social_default.nombre if self.obra_social_default else "Particular"
         return f"{self.apellido}, {self.nombre} - ({os_nombre})"
 
-class Turno(models.Model):
+class Profesional(models.Model):
+    """Odontólogo/a del consultorio. Turnos, gastos y liquidaciones pueden ser de un profesional."""
+    nombre = models.CharField(max_length=100)
+    apellido = models.CharField(max_length=100)
+    matricula = models.CharField(max_length=50, blank=True, null=True)
+    # Si el profesional entra al sistema, su agenda arranca filtrada
+    usuario = models.OneToOneField('auth.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='profesional')
+    activo = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['apellido', 'nombre']
+        verbose_name_plural = "Profesionales"
+
+    def __str__(self):
+        return f"{self.apellido}, {self.nombre}"
+
+
+class ProfesionalQuerySet(models.QuerySet):
+    def del_profesional(self, profesional):
+        """
+        Solo lo de un profesional (None = todos). Los índices de estas tablas
+        empiezan por profesional, así que no se recorre lo de los demás.
+        """
+        if not profesional:
+            return self
+        return self.filter(profesional=profesional)
+
+
+class TurnoManager(models.Manager.from_queryset(ProfesionalQuerySet)):
+    """El manager por defecto esconde los turnos borrados (borrado lógico)"""
+    def get_queryset(self):
+        return super().get_queryset().filter(borrado=False)
+
+
+class Turno(AuditableMixin, models.Model):
     ESTADOS = [
         ('PENDIENTE', '⏳ Pendiente'),
         ('FINALIZADO', '✅ Atendido'),
         ('CANCELADO', '🚫 Cancelado'),
+        ('AUSENTE', '🚷 No asistió'),
     ]
     METODOS_PAGO = [('EFECTIVO', 'Efectivo'), ('TRANSFERENCIA', 'Transferencia/MP')]
 
@@ -58,30 +108,58 @@ class Turno(models.Model):
     paciente = models.ForeignKey('Paciente', on_delete=models.PROTECT)
     tratamiento = models.ForeignKey('TipoTratamiento', on_delete=models.PROTECT)
     obra_social_aplicada = models.ForeignKey('ObraSocial', on_delete=models.PROTECT)
+    profesional = models.ForeignKey('Profesional', on_delete=models.PROTECT, null=True, blank=True)
     
     monto_paciente = models.DecimalField(max_digits=10, decimal_places=2, blank=True, default=0)
     monto_pagado = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Parte que paga la obra social (se copia del Arancel al crear el turno)
+    monto_obra_social = models.DecimalField(max_digits=10, decimal_places=2, blank=True, default=0)
     pagado = models.BooleanField(default=False)
+    # Copia de saldo_pendiente en la base (se recalcula en save) para filtrar y sumar deudas en SQL
+    saldo = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
     
     metodo_pago = models.CharField(max_length=20, choices=METODOS_PAGO, blank=True, null=True)
     estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
     nota_evolucion = models.TextField(blank=True, null=True)
+    borrado = models.BooleanField(default=False)
+
+    objects = TurnoManager()
+    todos = ProfesionalQuerySet.as_manager() # Incluye los borrados
 
     class Meta:
         ordering = ['-fecha', '-hora']
+        indexes = [
+            # Índice parcial: solo los turnos activos (los que usan la agenda y los reportes)
+            models.Index(fields=['fecha', 'hora'], condition=models.Q(borrado=False), name='turno_activo_fecha_idx'),
+            # Agenda y disponibilidad de un profesional
+            models.Index(fields=['profesional', 'fecha', 'hora'], condition=models.Q(borrado=False), name='turno_prof_fecha_idx'),
+            # Reporte de deudores: estado='FINALIZADO' AND saldo > 0
+            models.Index(fields=['estado', 'saldo'], condition=models.Q(borrado=False), name='turno_estado_saldo_idx'),
+            # Cierre de pendientes vencidos: estado='PENDIENTE' AND fecha < ...
+            models.Index(fields=['estado', 'fecha'], condition=models.Q(borrado=False), name='turno_estado_fecha_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(monto_pagado__gte=0, monto_pagado__lte=models.F('monto_paciente')),
+                name='turno_monto_pagado_valido',
+            ),
+        ]
 
     @property
     def saldo_pendiente(self):
         return self.monto_paciente - self.monto_pagado
 
     def save(self, *args, **kwargs):
-        if not self.id and self.monto_paciente == 0:
+        if not self.id and (self.monto_paciente == 0 or self.monto_obra_social == 0):
             try:
                 arancel = Arancel.objects.get(
                     obra_social=self.obra_social_aplicada, 
                     tratamiento=self.tratamiento
                 )
-                self.monto_paciente = arancel.copago_sugerido
+                if self.monto_paciente == 0:
+                    self.monto_paciente = arancel.copago_sugerido
+                if self.monto_obra_social == 0:
+                    self.monto_obra_social = arancel.monto_obra_social
             except Arancel.DoesNotExist:
                 pass 
 
@@ -91,32 +169,115 @@ class Turno(models.Model):
         if self.monto_paciente > 0 and self.monto_pagado >= self.monto_paciente:
             self.pagado = True
 
+        # Un pago fuera de rango no se corrige acá: lo rechaza TurnoForm o la base (turno_monto_pagado_valido)
+        self.saldo = self.saldo_pendiente
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'monto_paciente', 'monto_pagado', 'pagado'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'monto_pagado', 'pagado', 'saldo'}
+
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.fecha} - {self.paciente}"
 
-class LiquidacionObraSocial(models.Model):
+class TurnoArchivado(models.Model):
+    """
+    Turnos viejos, atendidos y pagados, que se sacan de la tabla principal
+    (`python manage.py archivar_turnos`) para que la agenda siga rápida.
+    Tiene los mismos campos que Turno, así los reportes pueden sumar ambas tablas.
+    """
+    archivado = True # Para distinguirlo de un Turno en los templates
+
+    id_original = models.BigIntegerField(unique=True)
+    fecha = models.DateField()
+    hora = models.TimeField()
+    paciente = models.ForeignKey('Paciente', on_delete=models.PROTECT, related_name='turnos_archivados')
+    tratamiento = models.ForeignKey('TipoTratamiento', on_delete=models.PROTECT, related_name='+')
+    obra_social_aplicada = models.ForeignKey('ObraSocial', on_delete=models.PROTECT, related_name='+')
+    profesional = models.ForeignKey('Profesional', on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    monto_paciente = models.DecimalField(max_digits=10, decimal_places=2)
+    monto_pagado = models.DecimalField(max_digits=10, decimal_places=2)
+    monto_obra_social = models.DecimalField(max_digits=10, decimal_places=2)
+    pagado = models.BooleanField()
+    saldo = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    metodo_pago = models.CharField(max_length=20, choices=Turno.METODOS_PAGO, blank=True, null=True)
+    estado = models.CharField(max_length=20, choices=Turno.ESTADOS)
+    nota_evolucion = models.TextField(blank=True, null=True)
+    fecha_archivado = models.DateTimeField(auto_now_add=True)
+
+    objects = ProfesionalQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-fecha', '-hora']
+        verbose_name_plural = "Turnos archivados"
+        indexes = [
+            models.Index(fields=['fecha'], name='turnoarchivado_fecha_idx'),
+            models.Index(fields=['profesional', 'fecha'], name='turnoarchivado_prof_fecha_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(monto_pagado__gte=0, monto_pagado__lte=models.F('monto_paciente')),
+                name='turnoarchivado_monto_pagado_valido',
+            ),
+        ]
+
+    @property
+    def saldo_pendiente(self):
+        return self.monto_paciente - self.monto_pagado
+
+    def __str__(self):
+        return f"{self.fecha} - {self.paciente} (archivado)"
+
+class LiquidacionObraSocial(AuditableMixin, models.Model):
     fecha_ingreso = models.DateField(default=timezone.now)
     obra_social = models.ForeignKey(ObraSocial, on_delete=models.PROTECT)
     periodo = models.CharField(max_length=100) # Ej: "Marzo 2026"
+    # Mes/año de las prestaciones que cubre. Si quedan vacíos se usa la fecha de ingreso.
+    periodo_mes = models.PositiveSmallIntegerField(blank=True, null=True)
+    periodo_anio = models.PositiveSmallIntegerField(blank=True, null=True)
     monto_total = models.DecimalField(max_digits=12, decimal_places=2)
     comprobante = models.FileField(upload_to='liquidaciones/', blank=True, null=True)
+    profesional = models.ForeignKey('Profesional', on_delete=models.PROTECT, null=True, blank=True)
+
+    objects = ProfesionalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['profesional', 'fecha_ingreso'], name='liquidacion_prof_fecha_idx'),
+        ]
 
 class CategoriaGasto(models.Model):
     nombre = models.CharField(max_length=50)
+    presupuesto_mensual = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True,
+                                              help_text="Opcional: tope de gasto por mes para el análisis de gastos.")
     def __str__(self): return self.nombre
 
-class Gasto(models.Model):
+class Gasto(AuditableMixin, models.Model):
     fecha = models.DateField(default=timezone.now)
     categoria = models.ForeignKey(CategoriaGasto, on_delete=models.PROTECT)
     descripcion = models.CharField(max_length=200, blank=True, null=True)
     monto = models.DecimalField(max_digits=12, decimal_places=2)
+    profesional = models.ForeignKey('Profesional', on_delete=models.PROTECT, null=True, blank=True,
+                                    help_text="Vacío si es un gasto del consultorio en general.")
+
+    objects = ProfesionalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['profesional', 'fecha'], name='gasto_prof_fecha_idx'),
+            # Análisis de gastos: totales por categoría y mes
+            models.Index(fields=['categoria', 'fecha'], name='gasto_categoria_fecha_idx'),
+        ]
 
 class Configuracion(models.Model):
     # Solo permitiremos que exista 1 fila en esta tabla
     nombre_clinica = models.CharField(max_length=100, default="Mi Consultorio")
     logo = models.ImageField(upload_to='logos/', blank=True, null=True)
+    # Versiones chicas del logo (las genera core.imagenes al subirlo)
+    logo_favicon = models.ImageField(upload_to='logos/variantes/', blank=True, null=True)
+    logo_avatar = models.ImageField(upload_to='logos/variantes/', blank=True, null=True)
+    logo_banner = models.ImageField(upload_to='logos/variantes/', blank=True, null=True)
+    logo_banner_webp = models.ImageField(upload_to='logos/variantes/', blank=True, null=True)
     
     class Meta:
         verbose_name = "Configuración del Sistema"
@@ -129,4 +290,243 @@ class Configuracion(models.Model):
         # Esto asegura que si ya existe una config, no cree otra, sino que edite la existente
         if not self.pk and Configuracion.objects.exists():
             return # O podrías lanzar un error, pero con esto evitamos duplicados simples
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class Tarea(models.Model):
+    """
+    Trabajo pesado (exportaciones, reportes) que se procesa en segundo plano
+    con `python manage.py procesar_tareas`, fuera de los pedidos web.
+    """
+    ESTADOS = [
+        ('PENDIENTE', 'En cola'),
+        ('EN_CURSO', 'Procesando'),
+        ('FINALIZADA', 'Terminada'),
+        ('ERROR', 'Con error'),
+    ]
+
+    tipo = models.CharField(max_length=50)
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+    progreso = models.PositiveSmallIntegerField(default=0) # 0 a 100
+    mensaje = models.CharField(max_length=200, blank=True, default='')
+    resultado = models.FileField(upload_to='tareas/', blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    usuario = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    creada = models.DateTimeField(auto_now_add=True)
+    iniciada = models.DateTimeField(blank=True, null=True)
+    latido = models.DateTimeField(blank=True, null=True) # El worker la renueva mientras la tiene EN_CURSO
+    finalizada = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-creada']
+        indexes = [
+            # El worker busca siempre "la próxima pendiente"
+            models.Index(fields=['estado', 'creada'], name='tarea_estado_creada_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} ({self.get_estado_display()})"
+
+    def get_tipo_display(self):
+        from .tareas import REGISTRO
+        registrada = REGISTRO.get(self.tipo)
+        return registrada.descripcion if registrada else self.tipo
+
+
+class RecordatorioTurno(models.Model):
+    """Estado del recordatorio de cada turno (así volver a correr el envío no duplica mails)"""
+    ESTADOS = [
+        ('ENVIADO', 'Enviado'),
+        ('SIN_EMAIL', 'Paciente sin email'),
+        ('ERROR', 'Error al enviar'),
+    ]
+
+    turno = models.OneToOneField(Turno, on_delete=models.CASCADE, null=True, blank=True, related_name='recordatorio')
+    # Cuando el turno pasa al archivo (ver core.archivo) el historial queda apuntando ahí
+    turno_archivado = models.ForeignKey('TurnoArchivado', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    estado = models.CharField(max_length=20, choices=ESTADOS)
+    intentos = models.PositiveSmallIntegerField(default=1)
+    enviado = models.DateTimeField(blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.turno or self.turno_archivado} - {self.get_estado_display()}"
+
+
+
+class RegistroAuditoriaQuerySet(models.QuerySet):
+    """La auditoría solo se agrega: no se puede modificar ni borrar en masa"""
+    def update(self, **kwargs):
+        raise PermissionError("El registro de auditoría no se puede modificar.")
+
+    def delete(self):
+        raise PermissionError("El registro de auditoría no se puede borrar.")
+
+
+class RegistroAuditoria(models.Model):
+    """Historial de cambios de montos (turnos, gastos y liquidaciones). Solo se agregan filas."""
+    ACCIONES = [
+        ('ALTA', 'Alta'),
+        ('MODIFICACION', 'Modificación'),
+        ('BAJA', 'Baja'),
+    ]
+
+    fecha = models.DateTimeField(default=timezone.now)
+    usuario = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    usuario_nombre = models.CharField(max_length=150, blank=True, default='') # Queda aunque borren el usuario
+    modelo = models.CharField(max_length=50) # Ej: "turno", "gasto"
+    objeto_id = models.PositiveBigIntegerField()
+    accion = models.CharField(max_length=20, choices=ACCIONES)
+    cambios = models.JSONField(default=dict, encoder=DjangoJSONEncoder) # {campo: [antes, después]}
+
+    objects = RegistroAuditoriaQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-fecha', '-id']
+        verbose_name = "Registro de Auditoría"
+        verbose_name_plural = "Registro de Auditoría"
+        indexes = [
+            models.Index(fields=['fecha'], name='auditoria_fecha_idx'),
+            models.Index(fields=['usuario', 'fecha'], name='auditoria_usuario_fecha_idx'),
+            models.Index(fields=['modelo', 'objeto_id', 'fecha'], name='auditoria_objeto_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y %H:%M} - {self.get_accion_display()} {self.modelo} #{self.objeto_id}"
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise PermissionError("El registro de auditoría no se puede modificar.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise PermissionError("El registro de auditoría no se puede borrar.")
+
+
+class EventoTurno(models.Model):
+    """
+    Cambios recientes de turnos para actualizar las agendas abiertas en vivo (ver core.eventos).
+    No es un historial: se borran solos a las pocas horas.
+    """
+    TIPOS = [
+        ('ALTA', 'Turno nuevo'),
+        ('ESTADO', 'Cambio de estado'),
+        ('PAGO', 'Pago'),
+        ('CAMBIO', 'Otros cambios'),
+        ('BAJA', 'Turno borrado'),
+    ]
+
+    turno_id = models.PositiveBigIntegerField() # Sin FK: el evento de baja queda aunque el turno ya no esté
+    tipo = models.CharField(max_length=10, choices=TIPOS)
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['creado'], name='evento_turno_creado_idx')]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.turno_id}"
+
+
+class EstadisticaMensual(models.Model):
+    """
+    Números de un mes por tratamiento o por obra social (turnos activos + archivo),
+    calculados una vez y guardados (ver core.estadisticas).
+    """
+    DIMENSIONES = [
+        ('TRATAMIENTO', 'Tratamiento'),
+        ('OBRA_SOCIAL', 'Obra social'),
+    ]
+
+    anio = models.PositiveSmallIntegerField()
+    mes = models.PositiveSmallIntegerField()
+    # 'MES': el total del mes, se guarda siempre (también sin turnos) para saber que el mes está calculado
+    dimension = models.CharField(max_length=20, choices=DIMENSIONES + [('MES', 'Total del mes')])
+    tratamiento = models.ForeignKey('TipoTratamiento', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    obra_social = models.ForeignKey('ObraSocial', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    turnos = models.PositiveIntegerField(default=0)
+    atendidos = models.PositiveIntegerField(default=0)
+    cancelados = models.PositiveIntegerField(default=0)
+    # Paciente + obra social de los turnos atendidos
+    facturado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Versión de los turnos del mes con la que se calculó: si cambió, se recalcula
+    version = models.BigIntegerField()
+    calculada = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['anio', 'mes']
+        verbose_name_plural = "Estadísticas mensuales"
+        indexes = [models.Index(fields=['dimension', 'anio', 'mes'], name='estadistica_dim_mes_idx')]
+
+    def __str__(self):
+        return f"{self.mes}/{self.anio} - {self.tratamiento or self.obra_social}"
+
+
+class ResumenAsistencia(models.Model):
+    """
+    Historial de asistencia de un paciente en pocos números, para marcar en la
+    agenda los turnos con riesgo de ausencia sin consultar todo su historial.
+    Se actualiza cada vez que cambia un turno del paciente (ver core.asistencia).
+    """
+    paciente = models.OneToOneField('Paciente', on_delete=models.CASCADE, primary_key=True, related_name='asistencia')
+    turnos = models.PositiveIntegerField(default=0)      # Con fecha pasada (activos + archivo)
+    atendidos = models.PositiveIntegerField(default=0)
+    cancelados = models.PositiveIntegerField(default=0)
+    ausentes = models.PositiveIntegerField(default=0)    # Siguen PENDIENTE con la fecha ya pasada
+    impagos = models.PositiveIntegerField(default=0)     # Atendidos con saldo después del plazo de pago
+    riesgo = models.PositiveSmallIntegerField(default=0) # 0 a 100
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Resúmenes de asistencia"
+
+    @property
+    def nivel(self):
+        from .asistencia import nivel_de_riesgo
+        return nivel_de_riesgo(self.riesgo)
+
+    def __str__(self):
+        return f"{self.paciente_id}: riesgo {self.riesgo}"
+
+
+class LoteCierre(models.Model):
+    """
+    Turnos PENDIENTE con la fecha vencida que se cerraron juntos (ver core.cierre).
+    Queda para revisarlo: confirmarlo o deshacerlo (todo o algunos turnos).
+    """
+    ESTADOS = [
+        ('APLICADO', 'Para revisar'),
+        ('CONFIRMADO', 'Confirmado'),
+        ('DESHECHO', 'Deshecho'),
+    ]
+
+    creado = models.DateTimeField(auto_now_add=True)
+    usuario = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    automatico = models.BooleanField(default=False) # Lo cerró el comando programado
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='APLICADO')
+    cantidad = models.PositiveIntegerField(default=0)
+    revisado = models.DateTimeField(blank=True, null=True)
+    revisado_por = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        ordering = ['-creado']
+        verbose_name_plural = "Lotes de cierre"
+
+    def __str__(self):
+        return f"Cierre {self.creado:%d/%m/%Y %H:%M} ({self.cantidad} turnos)"
+
+
+class CierreTurno(models.Model):
+    """Un turno de un lote de cierre: a qué estado pasó y por qué regla"""
+    lote = models.ForeignKey(LoteCierre, on_delete=models.CASCADE, related_name='cierres')
+    turno = models.ForeignKey('Turno', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    turno_archivado = models.ForeignKey('TurnoArchivado', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    regla = models.CharField(max_length=20)
+    estado_nuevo = models.CharField(max_length=20, choices=Turno.ESTADOS)
+    deshecho = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['id']
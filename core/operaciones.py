@@ -0,0 +1,105 @@
+"""
+Cambios masivos de turnos con `QuerySet.update`.
+
+Un update no pasa por `save()` ni dispara señales, así que lo que harían las
+señales para cada turno se hace acá de una vez para todo el lote: versiones de
+caché, auditoría, eventos de la agenda y resumen de asistencia.
+"""
+from django.db import transaction
+from django.db.models import F, Q
+
+from . import asistencia, auditoria, eventos, registro, versiones
+from .estadisticas import version_mes
+from .models import Turno, TurnoArchivado
+
+# Las listas de IDs van en tandas (límite de parámetros de SQLite)
+TANDA = 500
+
+NO_CANCELADO = ~Q(estado='CANCELADO')
+SIN_ATENDER = Q(estado__in=['PENDIENTE', 'AUSENTE'])
+# Lo mismo que deja Turno.save() con pagado=True: pagó todo, no debe nada
+PAGO_TOTAL = {'monto_pagado': F('monto_paciente'), 'pagado': True, 'saldo': 0}
+
+# Acciones de la agenda sobre varios turnos: (descripción, cambios, a qué turnos se aplica, evento)
+ACCIONES = {
+    'atendido': ('Marcar atendidos', {'estado': 'FINALIZADO'}, SIN_ATENDER, 'ESTADO'),
+    'pagado': ('Marcar pagados', PAGO_TOTAL, NO_CANCELADO, 'PAGO'),
+    'atendido_pagado': ('Atendidos y pagados', {'estado': 'FINALIZADO', **PAGO_TOTAL}, NO_CANCELADO, 'ESTADO'),
+    'cancelar': ('Cancelar', {'estado': 'CANCELADO'}, SIN_ATENDER, 'ESTADO'),
+}
+
+
+def _tandas(ids):
+    ids = list(ids)
+    for inicio in range(0, len(ids), TANDA):
+        yield ids[inicio:inicio + TANDA]
+
+
+def actualizar_turnos(ids, cambios, filtro=None, usuario=None, tipo_evento='CAMBIO'):
+    """
+    Aplica `cambios` (valores o expresiones F) a los turnos `ids` que además cumplan
+    `filtro` (ej: que sigan PENDIENTE). Devuelve los IDs que efectivamente cambiaron.
+    """
+    filtro = filtro or Q()
+    campos = ['id', 'paciente_id', 'fecha', *cambios]
+    with transaction.atomic():
+        anteriores, nuevos = [], {}
+        for tanda in _tandas(ids):
+            filas = list(Turno.objects.select_for_update().filter(filtro, pk__in=tanda).order_by().values(*campos))
+            # Se actualiza exactamente lo que se leyó (y quedó bloqueado)
+            elegidos = Turno.objects.filter(pk__in=[f['id'] for f in filas])
+            elegidos.update(**cambios)
+            nuevos.update((f['id'], f) for f in elegidos.order_by().values(*campos))
+            anteriores += filas
+
+        diferencias = {}
+        for antes in anteriores:
+            despues = nuevos[antes['id']]
+            cambiados = {campo: [antes[campo], despues[campo]] for campo in cambios if antes[campo] != despues[campo]}
+            if cambiados:
+                diferencias[antes['id']] = cambiados
+        if diferencias:
+            turnos_actualizados([f for f in anteriores if f['id'] in diferencias], diferencias, usuario, tipo_evento)
+    return list(diferencias)
+
+
+def turnos_actualizados(filas, diferencias, usuario=None, tipo_evento='CAMBIO'):
+    """Lo que hacen las señales de Turno, para filas ya actualizadas por un update"""
+    meses = {version_mes(f['fecha'].year, f['fecha'].month) for f in filas}
+    versiones.incrementar('turnos', *meses)
+    auditoria.registrar_varios('turno', 'MODIFICACION', diferencias, usuario=usuario)
+    eventos.publicar_varios([f['id'] for f in filas], tipo_evento)
+    for tanda in _tandas({f['paciente_id'] for f in filas}):
+        asistencia.actualizar(tanda)
+
+
+def aplicar_accion(accion, ids, usuario=None):
+    """Una acción de la agenda (ver ACCIONES) sobre varios turnos en una transacción"""
+    _, cambios, filtro, tipo_evento = ACCIONES[accion]
+    actualizados = actualizar_turnos(ids, cambios, filtro=filtro, usuario=usuario, tipo_evento=tipo_evento)
+    registro.evento('accion_masiva', accion=accion, pedidos=len(ids), actualizados=len(actualizados),
+                    usuario=usuario.get_username() if usuario else None)
+    return actualizados
+
+
+def completar_monto_obra_social(arancel, usuario=None):
+    """
+    Los turnos de este arancel que quedaron con monto_obra_social en 0 (cargados
+    antes de que el arancel tuviera ese monto) toman el monto actual. Así la
+    columna es la única fuente para la conciliación, las planillas y las estadísticas.
+    Devuelve cuántos turnos se completaron.
+    """
+    if not arancel.monto_obra_social:
+        return 0
+    sin_monto = Q(obra_social_aplicada_id=arancel.obra_social_id, tratamiento_id=arancel.tratamiento_id,
+                  monto_obra_social=0)
+    with transaction.atomic():
+        ids = Turno.objects.filter(sin_monto).values_list('pk', flat=True)
+        completados = actualizar_turnos(ids, {'monto_obra_social': arancel.monto_obra_social}, filtro=sin_monto,
+                                        usuario=usuario)
+        archivados = TurnoArchivado.objects.filter(sin_monto)
+        fechas = set(archivados.dates('fecha', 'month'))
+        archivados = archivados.update(monto_obra_social=arancel.monto_obra_social)
+        if archivados:
+            versiones.incrementar('turnos', *(version_mes(f.year, f.month) for f in fechas))
+    return len(completados) + archivados
@@ -0,0 +1,100 @@
+"""
+Recordatorios de turnos por email.
+
+Se mandan los del día siguiente en lotes, reutilizando una sola conexión SMTP,
+y se guarda el resultado de cada turno en `RecordatorioTurno`. Volver a correrlo
+solo manda los que faltan (o los que dieron error).
+"""
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import versiones
+from .models import Configuracion, RecordatorioTurno, Turno
+
+
+def turnos_a_recordar(fecha):
+    """Una sola consulta: turnos pendientes del día que todavía no tienen recordatorio enviado"""
+    return (
+        Turno.objects.filter(fecha=fecha, estado='PENDIENTE')
+        .exclude(recordatorio__estado='ENVIADO')
+        .select_related('paciente', 'tratamiento', 'recordatorio')
+        .order_by('hora')
+    )
+
+
+def armar_mensaje(turno, clinica, conexion):
+    contexto = {'turno': turno, 'paciente': turno.paciente, 'clinica': clinica}
+    asunto = render_to_string('core/emails/recordatorio_asunto.txt', contexto).strip()
+    mensaje = EmailMultiAlternatives(
+        subject=asunto,
+        body=render_to_string('core/emails/recordatorio.txt', contexto),
+        to=[turno.paciente.email],
+        connection=conexion,
+    )
+    mensaje.attach_alternative(render_to_string('core/emails/recordatorio.html', contexto), 'text/html')
+    return mensaje
+
+
+def _registrar(resultados):
+    """Guarda el estado de todo el lote en un solo INSERT ... ON CONFLICT"""
+    RecordatorioTurno.objects.bulk_create(
+        resultados,
+        update_conflicts=True,
+        unique_fields=['turno'],
+        update_fields=['estado', 'intentos', 'enviado', 'error', 'actualizado'],
+    )
+    versiones.incrementar('recordatorios') # La agenda muestra la campanita
+
+
+def _resultado(turno, estado, error=None):
+    anterior = getattr(turno, 'recordatorio', None)
+    return RecordatorioTurno(
+        turno=turno,
+        estado=estado,
+        intentos=(anterior.intentos + 1) if anterior else 1,
+        enviado=timezone.now() if estado == 'ENVIADO' else None,
+        error=error,
+    )
+
+
+def enviar_recordatorios(fecha=None, tamano_lote=None, simular=False):
+    """
+    Manda los recordatorios de `fecha` (por defecto, mañana).
+    Devuelve un resumen con la cantidad de enviados, sin email y errores.
+    """
+    fecha = fecha or timezone.localdate() + datetime.timedelta(days=1)
+    tamano_lote = tamano_lote or getattr(settings, 'RECORDATORIOS_LOTE', 50)
+
+    turnos = list(turnos_a_recordar(fecha))
+    resumen = {'fecha': fecha, 'total': len(turnos), 'enviados': 0, 'sin_email': 0, 'errores': 0}
+    if simular or not turnos:
+        return resumen
+
+    clinica = Configuracion.objects.first()
+    conexion = get_connection()
+    conexion.open()  # Una sola conexión para todos los lotes
+    try:
+        for inicio in range(0, len(turnos), tamano_lote):
+            resultados = []
+            for turno in turnos[inicio:inicio + tamano_lote]:
+                if not turno.paciente.email:
+                    resultados.append(_resultado(turno, 'SIN_EMAIL'))
+                    resumen['sin_email'] += 1
+                    continue
+                try:
+                    armar_mensaje(turno, clinica, conexion).send()
+                except Exception as e:
+                    resultados.append(_resultado(turno, 'ERROR', str(e)))
+                    resumen['errores'] += 1
+                else:
+                    resultados.append(_resultado(turno, 'ENVIADO'))
+                    resumen['enviados'] += 1
+            _registrar(resultados)
+    finally:
+        conexion.close()
+
+    return resumen
@@ -0,0 +1,184 @@
+"""
+Registro estructurado (una línea JSON por registro) de pedidos y eventos del negocio.
+
+- `RegistroPedidosMiddleware` deja una línea por pedido: ruta, usuario, estado,
+  duración y cantidad de consultas (logger `consultorio.pedidos`).
+- `evento('pago_registrado', turno=..., monto=...)` para lo que importa del negocio
+  (logger `consultorio.eventos`).
+
+El pedido solo pone el registro en una cola en memoria: el JSON y la escritura en
+disco los hace un hilo aparte (`ManejadorEnCola`), así que registrar no suma
+tiempo de respuesta. La configuración está en LOGGING (config/settings.py).
+
+Los campos van como `extra` y salen como claves del JSON:
+
+    logger.warning('importacion_fallida', extra={'archivo': nombre, 'fila': 12})
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import time
+import uuid
+from contextlib import ExitStack
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from django.conf import settings
+from django.db import connections
+
+logger_pedidos = logging.getLogger('consultorio.pedidos')
+logger_eventos = logging.getLogger('consultorio.eventos')
+
+# Identificador del pedido en curso: los eventos lo llevan para cruzarlos con su pedido
+_pedido = ContextVar('registro_pedido', default=None)
+
+# Atributos propios de LogRecord: todo lo demás vino en `extra`
+_ATRIBUTOS_BASE = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+# --- FORMATO ---
+class FormatoJSON(logging.Formatter):
+    def format(self, record):
+        datos = {
+            'momento': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_BASE and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            datos['error'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+# --- ESCRITURA EN SEGUNDO PLANO ---
+class ManejadorEnCola(QueueHandler):
+    """
+    Encola los registros y un hilo (QueueListener) los escribe en un archivo que
+    rota por tamaño. El hilo arranca con el primer registro de cada proceso, así
+    los procesos hijos (procesar_tareas, gunicorn) tienen el suyo.
+
+    Con varios procesos escribiendo el mismo archivo la rotación puede perder
+    alguna línea; en ese caso conviene rotar afuera (logrotate) con `max_bytes=0`.
+    """
+    def __init__(self, archivo, max_bytes=10 * 1024 * 1024, copias=5):
+        super().__init__(queue.SimpleQueue())
+        self.archivo = str(archivo)
+        self.max_bytes = max_bytes
+        self.copias = copias
+        self.oyente = None
+        self._pid = None
+
+    def _arrancar(self):
+        os.makedirs(os.path.dirname(self.archivo) or '.', exist_ok=True)
+        destino = RotatingFileHandler(self.archivo, maxBytes=self.max_bytes, backupCount=self.copias,
+                                      encoding='utf-8', delay=True)
+        destino.setFormatter(FormatoJSON())
+        self.queue = queue.SimpleQueue()  # La heredada del padre no la lee nadie
+        self.oyente = QueueListener(self.queue, destino)
+        self.oyente.start()
+        self._pid = os.getpid()
+        atexit.register(self.cerrar)
+
+    def prepare(self, record):
+        # Lo mínimo en el hilo del pedido: el mensaje armado y el traceback como texto.
+        # El JSON se arma en el hilo que escribe.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        if self._pid != os.getpid():  # handle() ya tiene tomado el lock del manejador
+            self._arrancar()
+        super().emit(record)
+
+    def cerrar(self):
+        """Espera a que se escriba lo encolado (al salir del proceso, o en las pruebas)"""
+        if self.oyente and self._pid == os.getpid():
+            self.oyente.stop()
+            for destino in self.oyente.handlers:
+                destino.close()
+            self.oyente = None
+            self._pid = None
+
+    def close(self):
+        self.cerrar()
+        super().close()
+
+
+# --- EVENTOS DEL NEGOCIO ---
+def evento(nombre, nivel=logging.INFO, **datos):
+    """Registra un hecho del negocio: turno creado, pago registrado, logo actualizado..."""
+    if logger_eventos.isEnabledFor(nivel):
+        logger_eventos.log(nivel, nombre, extra={'evento': nombre, 'pedido': _pedido.get(), **datos})
+
+
+# --- PEDIDOS ---
+class _ContadorConsultas:
+    def __init__(self):
+        self.cantidad = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.cantidad += 1
+        return execute(sql, params, many, context)
+
+
+class RegistroPedidosMiddleware:
+    """
+    Una línea por pedido. Los que tardan más de REGISTRO_PEDIDO_LENTO_MS salen como
+    WARNING para encontrarlos rápido (ej.: un balance que tarda en cargar).
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.lento = getattr(settings, 'REGISTRO_PEDIDO_LENTO_MS', 1000)
+
+    def __call__(self, request):
+        if not logger_pedidos.isEnabledFor(logging.WARNING):
+            return self.get_response(request)
+
+        token = _pedido.set(uuid.uuid4().hex[:12])
+        contador = _ContadorConsultas()
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(contador))
+                response = self.get_response(request)
+        except Exception:
+            self._registrar(request, 500, inicio, contador)
+            raise
+        else:
+            self._registrar(request, response.status_code, inicio, contador)
+            return response
+        finally:
+            _pedido.reset(token)
+
+    def _registrar(self, request, estado, inicio, contador):
+        milisegundos = round((time.perf_counter() - inicio) * 1000, 1)
+        nivel = logging.WARNING if milisegundos >= self.lento else logging.INFO
+        if not logger_pedidos.isEnabledFor(nivel):
+            return
+        usuario = getattr(request, 'user', None)
+        ruta = request.resolver_match
+        logger_pedidos.log(nivel, 'pedido', extra={
+            'pedido': _pedido.get(),
+            'metodo': request.method,
+            'ruta': ruta.view_name if ruta else None,
+            'url': request.path,
+            'usuario': usuario.get_username() if usuario is not None and usuario.is_authenticated else None,
+            'estado': estado,
+            'milisegundos': milisegundos,
+            'consultas': contador.cantidad,
+        })
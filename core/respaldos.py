@@ -0,0 +1,241 @@
+"""
+Copias de la base SQLite mientras la aplicación sigue funcionando.
+
+Usa la API de backup de SQLite de a pocas páginas por paso: entre paso y paso la
+base queda libre, así que recepción puede seguir cargando turnos durante la copia.
+
+Respaldos (`manage.py respaldar` / `manage.py restaurar`) en RESPALDOS_DIR:
+
+    respaldo-20260301-230000-123456.json  <- manifiesto: qué base y qué archivos de media
+    base/<sha256>.sqlite3.gz              <- la base comprimida (si no cambió, se reutiliza)
+    media/<ab>/<sha256>                   <- cada archivo de media una sola vez (incremental)
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.conf import settings
+from django.db import connections
+
+# Páginas por paso (con páginas de 4 KB son ~4 MB) y pausa entre pasos en segundos
+PAGINAS_POR_PASO = 1024
+PAUSA_ENTRE_PASOS = 0.005
+
+
+def ruta_base(using='default'):
+    conexion = connections[using]
+    if conexion.vendor != 'sqlite':
+        raise ValueError(f"La base '{using}' no es SQLite ({conexion.vendor}).")
+    return str(conexion.settings_dict['NAME'])
+
+
+def copiar_base(destino, using='default', paginas=PAGINAS_POR_PASO, pausa=PAUSA_ENTRE_PASOS):
+    """
+    Copia consistente de la base a `destino`. Se escribe en un temporal y se
+    reemplaza al final, así nadie lee nunca una copia a medias.
+    """
+    temporal = f'{destino}.tmp'
+    origen = sqlite3.connect(ruta_base(using))
+    copia = sqlite3.connect(temporal)
+    try:
+        origen.backup(copia, pages=paginas, sleep=pausa)
+    finally:
+        copia.close()
+        origen.close()
+    os.replace(temporal, destino)
+    return destino
+
+
+def ruta_snapshot_reportes():
+    return str(settings.DATABASES['reportes']['NAME'])
+
+
+# --- RESPALDOS ---
+def directorio_respaldos():
+    return str(getattr(settings, 'RESPALDOS_DIR', os.path.join(settings.BASE_DIR, 'respaldos')))
+
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def verificar_integridad(ruta):
+    """PRAGMA integrity_check sobre un archivo SQLite. Lanza ValueError si está dañado."""
+    conexion = sqlite3.connect(f'file:{ruta}?mode=ro', uri=True)
+    try:
+        resultado = conexion.execute('PRAGMA integrity_check').fetchone()[0]
+    finally:
+        conexion.close()
+    if resultado != 'ok':
+        raise ValueError(f'La base {ruta} está dañada: {resultado}')
+
+
+def listar_respaldos(directorio=None):
+    """Manifiestos del más viejo al más nuevo"""
+    directorio = directorio or directorio_respaldos()
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(
+        os.path.join(directorio, nombre) for nombre in os.listdir(directorio)
+        if nombre.startswith('respaldo-') and nombre.endswith('.json')
+    )
+
+
+def leer_manifiesto(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def _respaldar_media(directorio, anterior):
+    """
+    Guarda cada archivo de media por su hash. Si tamaño y fecha coinciden con el
+    respaldo anterior no se vuelve a leer: solo se copian los archivos nuevos.
+    """
+    previos = anterior.get('media', {}) if anterior else {}
+    media = {}
+    copiados = 0
+    raiz = str(settings.MEDIA_ROOT)
+    for carpeta, _, archivos in os.walk(raiz):
+        for nombre in archivos:
+            ruta = os.path.join(carpeta, nombre)
+            relativa = os.path.relpath(ruta, raiz)
+            if relativa.split(os.sep)[0] == 'tareas':
+                continue  # Exportaciones: se pueden volver a generar
+            estado = os.stat(ruta)
+            previo = previos.get(relativa)
+            if previo and previo['tamano'] == estado.st_size and previo['modificado'] == int(estado.st_mtime):
+                huella = previo['sha256']
+            else:
+                huella = _sha256(ruta)
+            blob = os.path.join(directorio, 'media', huella[:2], huella)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                shutil.copy2(ruta, blob)
+                copiados += 1
+            media[relativa] = {'sha256': huella, 'tamano': estado.st_size, 'modificado': int(estado.st_mtime)}
+    return media, copiados
+
+
+def crear_respaldo(directorio=None, incluir_media=True, conservar=None):
+    """
+    Copia la base (en pasos, sin bloquear), la verifica, la comprime y guarda el
+    manifiesto. Devuelve el manifiesto con un par de datos extra para mostrar.
+    """
+    directorio = directorio or directorio_respaldos()
+    os.makedirs(os.path.join(directorio, 'base'), exist_ok=True)
+    respaldos = listar_respaldos(directorio)
+    anterior = leer_manifiesto(respaldos[-1]) if respaldos else None
+
+    with tempfile.TemporaryDirectory(dir=directorio) as temporal:
+        copia = copiar_base(os.path.join(temporal, 'copia.sqlite3'))
+        verificar_integridad(copia)
+        huella = _sha256(copia)
+        tamano = os.path.getsize(copia)
+        comprimida = os.path.join(directorio, 'base', f'{huella}.sqlite3.gz')
+        base_nueva = not os.path.exists(comprimida)
+        if base_nueva:
+            with open(copia, 'rb') as origen, gzip.open(f'{comprimida}.tmp', 'wb', compresslevel=6) as destino:
+                shutil.copyfileobj(origen, destino, 1024 * 1024)
+            os.replace(f'{comprimida}.tmp', comprimida)
+
+    media, copiados = _respaldar_media(directorio, anterior) if incluir_media else ({}, 0)
+
+    ahora = datetime.datetime.now()
+    manifiesto = {
+        'fecha': ahora.isoformat(timespec='seconds'),
+        'base': os.path.relpath(comprimida, directorio),
+        'sha256': huella,
+        'tamano': tamano,
+        'media': media,
+    }
+    # Con microsegundos: dos respaldos en el mismo segundo no comparten manifiesto
+    # (y 'x' falla antes que pisar uno que ya existe)
+    ruta = os.path.join(directorio, f'respaldo-{ahora:%Y%m%d-%H%M%S-%f}.json')
+    with open(ruta, 'x', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, indent=1)
+
+    borrados = podar_respaldos(conservar, directorio) if conservar else 0
+    return dict(manifiesto, ruta=ruta, base_nueva=base_nueva, media_copiados=copiados, borrados=borrados)
+
+
+def podar_respaldos(conservar, directorio=None):
+    """Deja los últimos `conservar` respaldos y borra los archivos que ya nadie usa"""
+    directorio = directorio or directorio_respaldos()
+    respaldos = listar_respaldos(directorio)
+    viejos = respaldos[:-conservar] if conservar else []
+    for ruta in viejos:
+        os.remove(ruta)
+
+    usados = set()
+    for ruta in respaldos[len(viejos):]:
+        manifiesto = leer_manifiesto(ruta)
+        usados.add(os.path.join(directorio, manifiesto['base']))
+        usados.update(
+            os.path.join(directorio, 'media', m['sha256'][:2], m['sha256']) for m in manifiesto['media'].values()
+        )
+    for carpeta in ('base', 'media'):
+        for raiz, _, archivos in os.walk(os.path.join(directorio, carpeta)):
+            for nombre in archivos:
+                ruta = os.path.join(raiz, nombre)
+                if ruta not in usados:
+                    os.remove(ruta)
+    return len(viejos)
+
+
+def _descomprimir_base(directorio, manifiesto, destino):
+    with gzip.open(os.path.join(directorio, manifiesto['base']), 'rb') as origen, open(destino, 'wb') as copia:
+        shutil.copyfileobj(origen, copia, 1024 * 1024)
+    if _sha256(destino) != manifiesto['sha256']:
+        raise ValueError('La base del respaldo no coincide con su huella (archivo dañado).')
+    verificar_integridad(destino)
+
+
+def verificar_respaldo(ruta):
+    """Descomprime en un temporal y comprueba huellas e integridad sin tocar nada"""
+    directorio = os.path.dirname(ruta)
+    manifiesto = leer_manifiesto(ruta)
+    with tempfile.TemporaryDirectory(dir=directorio) as temporal:
+        _descomprimir_base(directorio, manifiesto, os.path.join(temporal, 'prueba.sqlite3'))
+    faltantes = [
+        relativa for relativa, m in manifiesto['media'].items()
+        if not os.path.exists(os.path.join(directorio, 'media', m['sha256'][:2], m['sha256']))
+    ]
+    if faltantes:
+        raise ValueError(f'Faltan {len(faltantes)} archivos de media, por ejemplo {faltantes[0]}.')
+    return manifiesto
+
+
+def restaurar_respaldo(ruta, using='default'):
+    """
+    Reemplaza la base y los archivos de media por los del respaldo. La base se
+    verifica antes de tocar nada y se cambia de una sola vez (os.replace).
+    La aplicación tiene que estar detenida.
+    """
+    directorio = os.path.dirname(ruta)
+    manifiesto = verificar_respaldo(ruta)
+    destino = ruta_base(using)
+    connections[using].close()
+
+    temporal = f'{destino}.restaurando'
+    _descomprimir_base(directorio, manifiesto, temporal)
+    # Sin esto SQLite podría mezclar el diario de la base anterior con la nueva
+    for sufijo in ('-wal', '-shm', '-journal'):
+        if os.path.exists(destino + sufijo):
+            os.remove(destino + sufijo)
+    os.replace(temporal, destino)
+
+    raiz = str(settings.MEDIA_ROOT)
+    for relativa, m in manifiesto['media'].items():
+        ruta_media = os.path.join(raiz, relativa)
+        os.makedirs(os.path.dirname(ruta_media), exist_ok=True)
+        shutil.copy2(os.path.join(directorio, 'media', m['sha256'][:2], m['sha256']), ruta_media)
+    return manifiesto
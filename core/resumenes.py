@@ -0,0 +1,179 @@
+"""
+Resúmenes mensuales listos para imprimir: la planilla de prestaciones que se
+presenta a cada obra social y el resumen de cuenta de cada paciente.
+
+Se generan todos juntos para un período (tarea 'resumenes_mensuales' o
+`python manage.py generar_resumenes`) y salen en un ZIP de páginas HTML
+preparadas para imprimir o guardar como PDF desde el navegador.
+
+- Los datos salen de pocas consultas agrupadas (tabla activa + archivo), no de una por documento.
+- El HTML se arma en un pool de procesos.
+- Cada documento queda en caché con una huella de sus datos: si el mes se vuelve
+  a generar, solo se renderizan los que cambiaron.
+"""
+import datetime
+import hashlib
+import io
+import json
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.template.loader import render_to_string
+from django.utils.formats import date_format
+from django.utils.text import capfirst, slugify
+
+from .catalogos import obtener
+from .models import Turno, TurnoArchivado
+
+COLUMNAS_OBRA_SOCIAL = (
+    'obra_social_aplicada_id', 'obra_social_aplicada__nombre', 'fecha', 'hora',
+    'paciente__apellido', 'paciente__nombre', 'paciente__dni', 'tratamiento__nombre',
+    'profesional__apellido', 'monto_obra_social',
+)
+COLUMNAS_PACIENTE = (
+    'paciente_id', 'paciente__apellido', 'paciente__nombre', 'paciente__dni', 'fecha', 'hora',
+    'tratamiento__nombre', 'obra_social_aplicada__nombre', 'monto_paciente', 'monto_pagado', 'saldo',
+)
+
+
+def _del_periodo(anio, mes, columnas, **filtros):
+    """Turnos atendidos del mes, de la tabla activa y del archivo, en una sola consulta"""
+    def consulta(modelo):
+        return (
+            modelo.objects.filter(estado='FINALIZADO', fecha__year=anio, fecha__month=mes, **filtros)
+            .order_by().values(*columnas)
+        )
+    return consulta(Turno).union(consulta(TurnoArchivado), all=True)
+
+
+# --- DATOS ---
+def documentos_obras_sociales(anio, mes):
+    """Una planilla por obra social con lo que nos tiene que liquidar en el mes"""
+    filas = _del_periodo(anio, mes, COLUMNAS_OBRA_SOCIAL, monto_obra_social__gt=0).order_by(
+        'obra_social_aplicada__nombre', 'obra_social_aplicada_id', 'fecha', 'hora'
+    )
+    documentos = []
+    for os_id, prestaciones in groupby(filas, key=lambda f: f['obra_social_aplicada_id']):
+        prestaciones = list(prestaciones)
+        nombre = prestaciones[0]['obra_social_aplicada__nombre']
+        documentos.append({
+            'tipo': 'obra_social',
+            'id': os_id,
+            'archivo': f"obras_sociales/{slugify(nombre) or 'obra-social'}-{os_id}.html",  # "OSDE" y "O.S.D.E." dan lo mismo
+            'plantilla': 'core/resumenes/obra_social.html',
+            'contexto': {
+                'obra_social': nombre,
+                'prestaciones': prestaciones,
+                'total': sum((p['monto_obra_social'] for p in prestaciones), Decimal('0')),
+            },
+        })
+    return documentos
+
+
+def documentos_pacientes(anio, mes):
+    """Un resumen de cuenta por paciente atendido en el mes o que arrastra deuda"""
+    filas = _del_periodo(anio, mes, COLUMNAS_PACIENTE).order_by(
+        'paciente__apellido', 'paciente__nombre', 'paciente_id', 'fecha', 'hora'
+    )
+    # Lo archivado está pago: la deuda anterior sale solo de la tabla activa
+    anteriores = {
+        f['paciente_id']: f
+        for f in Turno.objects.filter(estado='FINALIZADO', fecha__lt=datetime.date(anio, mes, 1), saldo__gt=0)
+        .values('paciente_id', 'paciente__apellido', 'paciente__nombre', 'paciente__dni')
+        .annotate(deuda=Sum('saldo')).order_by()
+    }
+
+    por_paciente = {pid: list(turnos) for pid, turnos in groupby(filas, key=lambda f: f['paciente_id'])}
+    for pid in anteriores.keys() - por_paciente.keys():
+        por_paciente[pid] = []
+
+    documentos = []
+    for pid, turnos in por_paciente.items():
+        datos = turnos[0] if turnos else anteriores[pid]
+        anterior = anteriores.get(pid, {}).get('deuda') or Decimal('0')
+        del_mes = sum((t['saldo'] for t in turnos), Decimal('0'))
+        documentos.append({
+            'tipo': 'paciente',
+            'id': pid,
+            'archivo': f"pacientes/{slugify(datos['paciente__apellido'])}-{datos['paciente__dni']}.html",
+            'plantilla': 'core/resumenes/paciente.html',
+            'contexto': {
+                'paciente': f"{datos['paciente__apellido']}, {datos['paciente__nombre']}",
+                'dni': datos['paciente__dni'],
+                'turnos': turnos,
+                'total_mes': sum((t['monto_paciente'] for t in turnos), Decimal('0')),
+                'pagado_mes': sum((t['monto_pagado'] for t in turnos), Decimal('0')),
+                'saldo_anterior': anterior,
+                'saldo_total': anterior + del_mes,
+            },
+        })
+    documentos.sort(key=lambda d: d['contexto']['paciente'])
+    return documentos
+
+
+# --- RENDER ---
+def _inicializar_proceso():
+    import django
+    django.setup()
+
+
+def _renderizar(plantilla, contexto):
+    return render_to_string(plantilla, contexto)
+
+
+def _clave(documento, anio, mes):
+    # La huella de los datos hace de versión: si no cambió nada, es el mismo HTML
+    huella = hashlib.sha1(
+        json.dumps(documento['contexto'], sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    return f"resumen:{documento['tipo']}:{documento['id']}:{anio}-{mes}:{huella}"
+
+
+def generar_resumenes(anio, mes, procesos=None, progreso=None):
+    """
+    Arma todos los documentos del período y devuelve el ZIP (bytes) con un
+    resumen de lo hecho. `progreso(porcentaje, mensaje)` es opcional.
+    """
+    procesos = procesos or getattr(settings, 'TAREAS_PROCESOS', 2)
+    progreso = progreso or (lambda porcentaje, mensaje: None)
+    config = obtener('configuracion')
+    comunes = {
+        'consultorio': config.nombre_clinica if config else 'Mi Consultorio',
+        'periodo': capfirst(date_format(datetime.date(anio, mes, 1), 'F Y')),
+    }
+
+    documentos = documentos_obras_sociales(anio, mes) + documentos_pacientes(anio, mes)
+    progreso(10, f'{len(documentos)} documentos')
+    for documento in documentos:
+        documento['contexto'].update(comunes)
+        documento['clave'] = _clave(documento, anio, mes)
+
+    guardados = cache.get_many([d['clave'] for d in documentos])
+    pendientes = [d for d in documentos if d['clave'] not in guardados]
+    argumentos = ([d['plantilla'] for d in pendientes], [d['contexto'] for d in pendientes])
+    if procesos > 1 and len(pendientes) > 1:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso) as pool:
+            renderizados = list(pool.map(_renderizar, *argumentos, chunksize=20))
+    else:
+        renderizados = list(map(_renderizar, *argumentos))
+    nuevos = {d['clave']: html for d, html in zip(pendientes, renderizados)}
+    cache.set_many(nuevos, getattr(settings, 'RESUMENES_CACHE_SEGUNDOS', 60 * 60 * 24 * 31))
+    guardados.update(nuevos)
+    progreso(90, f'{len(pendientes)} renderizados, {len(documentos) - len(pendientes)} sin cambios')
+
+    salida = io.BytesIO()
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as archivo:
+        archivo.writestr('index.html', render_to_string('core/resumenes/indice.html', dict(comunes, documentos=documentos)))
+        for documento in documentos:
+            archivo.writestr(documento['archivo'], guardados[documento['clave']])
+
+    return {
+        'contenido': salida.getvalue(),
+        'documentos': len(documentos),
+        'renderizados': len(pendientes),
+    }
@@ -0,0 +1,95 @@
+"""
+Lecturas de reportes sobre una copia de la base.
+
+Los reportes pesados (balance, conciliación, exportaciones) leen de la conexión
+'reportes': una copia de SQLite que se renueva cada pocos minutos con
+`python manage.py actualizar_copia_reportes`, o una réplica si la base es Postgres.
+La agenda y todas las escrituras siguen usando 'default'.
+
+Solo se lee de la copia dentro de `leer_de_reportes()` (o en vistas con
+`@tolera_desfase`), y solo si la copia existe y no es demasiado vieja.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+ALIAS = 'reportes'
+
+_leyendo = ContextVar('leyendo_de_reportes', default=False)
+
+
+def edad_copia():
+    """Segundos desde la última copia. 0 si es una réplica; None si no hay copia que usar."""
+    if ALIAS not in connections.databases:
+        return None
+    conf = connections[ALIAS].settings_dict
+    if conf['ENGINE'] != 'django.db.backends.sqlite3':
+        return 0  # Réplica: el motor se encarga de mantenerla al día
+    if conf['NAME'] == connections['default'].settings_dict['NAME']:
+        return None  # Espejo de la principal (ej: en las pruebas)
+    try:
+        return time.time() - os.path.getmtime(conf['NAME'])
+    except OSError:
+        return None  # Todavía no se hizo la primera copia
+
+
+def copia_usable(desde=None):
+    """La copia sirve si existe, no supera REPORTES_DESFASE_MAXIMO y es posterior a `desde` (timestamp)"""
+    edad = edad_copia()
+    if edad is None or edad > getattr(settings, 'REPORTES_DESFASE_MAXIMO', 15 * 60):
+        return False
+    return desde is None or time.time() - edad > desde
+
+
+@contextmanager
+def leer_de_reportes(desde=None):
+    token = _leyendo.set(copia_usable(desde))
+    try:
+        yield
+    finally:
+        _leyendo.reset(token)
+
+
+def tolera_desfase(vista):
+    """
+    Marca una vista de reportes que puede mostrar datos de hace unos minutos.
+    Si el usuario acaba de guardar algo (ver EscrituraRecienteMiddleware) y la
+    copia es anterior, lee de la principal para que vea su propio cambio.
+    """
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        sesion = getattr(request, 'session', None)
+        desde = sesion.get('ultima_escritura') if sesion is not None else None
+        with leer_de_reportes(desde):
+            return vista(request, *args, **kwargs)
+    return envoltura
+
+
+def marca_copia():
+    """Para las claves de caché: lo calculado sobre la copia no debe mezclarse con lo de la principal"""
+    if not _leyendo.get():
+        return 'principal'
+    return f'copia-{int(time.time() - (edad_copia() or 0))}'
+
+
+class RouterReportes:
+    def db_for_read(self, model, **hints):
+        if _leyendo.get():
+            return ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Un objeto leído de la copia puede referenciar a otro de la principal: son la misma base
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # La copia hereda el esquema de la principal
+        return db != ALIAS
@@ -0,0 +1,83 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import registro, versiones
+from .models import (
+    Turno, Paciente, Gasto, LiquidacionObraSocial, ObraSocial, TipoTratamiento, CategoriaGasto, Arancel, Configuracion,
+    Profesional
+)
+
+
+# --- INVALIDACIÓN DE CACHÉ ---
+@receiver([post_save, post_delete], sender=Turno)
+def turno_modificado(sender, instance, **kwargs):
+    # Además, la versión del mes del turno (y del mes anterior si se cambió la fecha) para las estadísticas
+    from .estadisticas import version_mes
+    fechas = {instance.fecha, getattr(instance, '_valores_originales', {}).get('fecha')}
+    versiones.incrementar('turnos', *(version_mes(f.year, f.month) for f in fechas if hasattr(f, 'year')))
+
+
+@receiver([post_save, post_delete], sender=Paciente)
+def paciente_modificado(sender, **kwargs):
+    versiones.incrementar('pacientes')
+
+
+@receiver([post_save, post_delete], sender=Gasto)
+def gasto_modificado(sender, instance, **kwargs):
+    # Versión por mes: cargar un gasto de hoy no invalida los meses ya cerrados (ver core.analisis_gastos)
+    from .analisis_gastos import version_mes
+    fechas = {instance.fecha, getattr(instance, '_valores_originales', {}).get('fecha')}
+    versiones.incrementar(*(version_mes(f.year, f.month) for f in fechas if hasattr(f, 'year')))
+
+
+@receiver([post_save, post_delete], sender=LiquidacionObraSocial)
+def liquidacion_modificada(sender, **kwargs):
+    versiones.incrementar('liquidaciones')
+
+
+# --- CATÁLOGOS (ver core.catalogos) ---
+@receiver([post_save, post_delete], sender=ObraSocial)
+def obra_social_modificada(sender, **kwargs):
+    # Los aranceles muestran el nombre de la obra social
+    versiones.incrementar('obras_sociales', 'aranceles')
+
+
+@receiver([post_save, post_delete], sender=TipoTratamiento)
+def tratamiento_modificado(sender, **kwargs):
+    versiones.incrementar('tratamientos', 'aranceles')
+
+
+@receiver([post_save, post_delete], sender=CategoriaGasto)
+def categoria_modificada(sender, **kwargs):
+    versiones.incrementar('categorias')
+
+
+@receiver([post_save, post_delete], sender=Arancel)
+def arancel_modificado(sender, **kwargs):
+    versiones.incrementar('aranceles')
+
+
+@receiver(post_save, sender=Arancel)
+def arancel_guardado(sender, instance, raw=False, **kwargs):
+    # Los turnos que esperaban este monto (quedaron en 0) lo toman ahora
+    if not raw:
+        from .operaciones import completar_monto_obra_social
+        completar_monto_obra_social(instance)
+
+
+@receiver([post_save, post_delete], sender=Profesional)
+def profesional_modificado(sender, **kwargs):
+    versiones.incrementar('profesionales')
+
+
+@receiver([post_save, post_delete], sender=Configuracion)
+def configuracion_modificada(sender, **kwargs):
+    versiones.incrementar('configuracion')
+
+
+# --- REGISTRO (core.registro) ---
+@receiver(post_save, sender=Turno)
+def turno_creado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        registro.evento('turno_creado', turno=instance.pk, paciente=instance.paciente_id,
+                        fecha=instance.fecha, hora=instance.hora, profesional=instance.profesional_id)
@@ -0,0 +1,109 @@
+// AGENDA EN VIVO
+// Recibe los cambios de turnos por Server-Sent Events y actualiza solo la fila afectada,
+// en vez de recargar la página entera en cada escritorio.
+(function () {
+    const agenda = document.getElementById('agenda');
+    if (!agenda) return;
+    const cuerpo = agenda.querySelector('tbody');
+    const encabezados = { 'X-Requested-With': 'fetch' };
+
+    function urlFila(pk) {
+        const filtros = agenda.dataset.filtros ? '?' + agenda.dataset.filtros : '';
+        return agenda.dataset.fila.replace('/0/', '/' + pk + '/') + filtros;
+    }
+
+    // La agenda está ordenada por fecha (más nueva arriba) y después por hora
+    function vaAntes(a, b) {
+        if (a.dataset.fecha !== b.dataset.fecha) return a.dataset.fecha > b.dataset.fecha;
+        return a.dataset.hora < b.dataset.hora;
+    }
+
+    function colocar(pk, html) {
+        const actual = document.getElementById('turno-' + pk);
+        if (!html) { // El turno se borró o ya no entra en los filtros
+            if (actual) actual.remove();
+            return;
+        }
+        const molde = document.createElement('tbody');
+        molde.innerHTML = html.trim();
+        const nueva = molde.querySelector('tr');
+
+        if (actual) {
+            const tildado = actual.querySelector('.js-seleccion');
+            if (tildado && tildado.checked) nueva.querySelector('.js-seleccion').checked = true;
+            actual.replaceWith(nueva);
+        } else {
+            const vacia = document.getElementById('agenda-vacia');
+            if (vacia) vacia.remove();
+            const siguiente = Array.from(cuerpo.querySelectorAll('tr[id^="turno-"]')).find(f => vaAntes(nueva, f));
+            cuerpo.insertBefore(nueva, siguiente || null);
+        }
+        nueva.classList.add('fila-actualizada');
+        nueva.querySelectorAll('[data-bs-toggle="tooltip"]').forEach(el => new bootstrap.Tooltip(el));
+    }
+
+    async function actualizar(pk) {
+        const respuesta = await fetch(urlFila(pk), { headers: encabezados });
+        if (respuesta.ok) colocar(pk, respuesta.status === 204 ? '' : await respuesta.text());
+    }
+
+    // 1. Botones de atendido / pagado sin recargar la página
+    cuerpo.addEventListener('click', async (e) => {
+        const boton = e.target.closest('a.js-toggle');
+        if (!boton) return;
+        e.preventDefault();
+        const tooltip = bootstrap.Tooltip.getInstance(boton);
+        if (tooltip) tooltip.dispose();
+
+        const respuesta = await fetch(boton.href, { headers: encabezados });
+        if (respuesta.redirected || !respuesta.ok) { // Ej: se venció la sesión
+            window.location = respuesta.url;
+            return;
+        }
+        const pk = boton.closest('tr').id.replace('turno-', '');
+        colocar(pk, respuesta.status === 204 ? '' : await respuesta.text());
+    });
+
+    // 2. Acciones sobre los turnos tildados: un solo POST y después se refresca cada fila
+    const acciones = document.getElementById('acciones-masivas');
+    const todos = document.getElementById('seleccionar-todos');
+
+    function tildados() {
+        return Array.from(cuerpo.querySelectorAll('.js-seleccion:checked'));
+    }
+
+    function contarSeleccion() {
+        const cantidad = tildados().length;
+        document.getElementById('cantidad-seleccion').textContent = cantidad;
+        acciones.querySelectorAll('button').forEach(b => { b.disabled = cantidad === 0; });
+    }
+
+    if (acciones) {
+        contarSeleccion();
+        cuerpo.addEventListener('change', (e) => { if (e.target.matches('.js-seleccion')) contarSeleccion(); });
+        todos.addEventListener('change', () => {
+            cuerpo.querySelectorAll('.js-seleccion').forEach(c => { c.checked = todos.checked; });
+            contarSeleccion();
+        });
+        acciones.addEventListener('submit', async (e) => {
+            e.preventDefault();
+            const datos = new FormData(acciones);
+            datos.append('accion', e.submitter.value);
+            const respuesta = await fetch(acciones.action, { method: 'POST', body: datos, headers: encabezados });
+            if (respuesta.redirected || !respuesta.ok) {
+                window.location = respuesta.url;
+                return;
+            }
+            tildados().forEach(c => { c.checked = false; });
+            todos.checked = false;
+            contarSeleccion();
+            (await respuesta.json()).actualizados.forEach(actualizar);
+        });
+    }
+
+    // 3. Cambios hechos desde otros escritorios
+    if (window.EventSource) {
+        const fuente = new EventSource(agenda.dataset.eventos);
+        fuente.addEventListener('turno', (e) => actualizar(JSON.parse(e.data).turno));
+    }
+})();
@@ -0,0 +1,51 @@
+// 1. Tooltips
+var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'))
+var tooltipList = tooltipTriggerList.map(function (tooltipTriggerEl) {
+  return new bootstrap.Tooltip(tooltipTriggerEl)
+})
+
+// 2. Modo Oscuro
+const boton = document.getElementById('btnModoOscuro');
+const cuerpo = document.body;
+
+function aplicarTema(tema) {
+    if (tema === 'oscuro') {
+        cuerpo.classList.add('dark-mode');
+        boton.innerHTML = '<i class="bi bi-sun-fill"></i> Modo Claro';
+        boton.classList.replace('btn-outline-light', 'btn-outline-warning');
+    } else {
+        cuerpo.classList.remove('dark-mode');
+        boton.innerHTML = '<i class="bi bi-moon-stars-fill"></i> Modo Oscuro';
+        boton.classList.replace('btn-outline-warning', 'btn-outline-light');
+    }
+}
+
+if (localStorage.getItem('tema') === 'oscuro') { aplicarTema('oscuro'); }
+
+if (boton) {
+    boton.addEventListener('click', () => {
+        if (cuerpo.classList.contains('dark-mode')) {
+            localStorage.setItem('tema', 'claro');
+            aplicarTema('claro');
+        } else {
+            localStorage.setItem('tema', 'oscuro');
+            aplicarTema('oscuro');
+        }
+    });
+}
+
+// 3. CERRAR MENÚ AUTOMÁTICAMENTE SOLO EN CELULAR
+// Este script detecta si estás en celular y cerrás el menú al hacer clic en un link.
+// En PC no hace nada (por lo que los links funcionan normal).
+document.querySelectorAll('.link-menu').forEach(link => {
+    link.addEventListener('click', () => {
+        // Chequeamos si la pantalla es chica (menor a 768px - md breakpoint)
+        if (window.innerWidth < 768) {
+            const sidebar = document.getElementById('sidebarMenu');
+            const bsOffcanvas = bootstrap.Offcanvas.getInstance(sidebar);
+            if (bsOffcanvas) {
+                bsOffcanvas.hide();
+            }
+        }
+    });
+});
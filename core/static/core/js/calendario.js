@@ -0,0 +1,190 @@
+// CALENDARIO
+// Pide al servidor solo los turnos del rango visible (filas compactas, ver turnos_rango)
+// y arma la grilla acá. Los rangos de al lado se piden de antemano: avanzar o
+// retroceder no espera a la red.
+(function () {
+    const raiz = document.getElementById('calendario');
+    if (!raiz) return;
+    const grilla = document.getElementById('calendario-grilla');
+    const titulo = document.getElementById('calendario-titulo');
+
+    const DIAS = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom'];
+    const MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio',
+                   'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
+    const VISIBLES_POR_DIA_EN_MES = 4;
+
+    const rangos = new Map(); // 'desde|hasta' -> promesa con los turnos
+    let vista = raiz.dataset.vista;
+    let fecha = aFecha(raiz.dataset.fecha);
+    let dibujando = 0; // Si el usuario avanza rápido, solo se dibuja lo último que pidió
+
+    // --- FECHAS ---
+    function aFecha(texto) {
+        const [a, m, d] = texto.split('-').map(Number);
+        return new Date(a, m - 1, d);
+    }
+
+    function iso(f) {
+        return f.getFullYear() + '-' + String(f.getMonth() + 1).padStart(2, '0') + '-' + String(f.getDate()).padStart(2, '0');
+    }
+
+    function sumarDias(f, dias) {
+        const r = new Date(f);
+        r.setDate(r.getDate() + dias);
+        return r;
+    }
+
+    function lunes(f) {
+        return sumarDias(f, -((f.getDay() + 6) % 7));
+    }
+
+    function rango(v, f) {
+        if (v === 'dia') return [f, f];
+        if (v === 'semana') return [lunes(f), sumarDias(lunes(f), 6)];
+        const inicio = lunes(new Date(f.getFullYear(), f.getMonth(), 1));
+        return [inicio, sumarDias(inicio, 41)]; // 6 semanas completas
+    }
+
+    function mover(v, f, paso) {
+        if (v === 'dia') return sumarDias(f, paso);
+        if (v === 'semana') return sumarDias(f, 7 * paso);
+        return new Date(f.getFullYear(), f.getMonth() + paso, 1);
+    }
+
+    function nombreDia(f) {
+        return DIAS[(f.getDay() + 6) % 7] + ' ' + f.getDate() + '/' + (f.getMonth() + 1);
+    }
+
+    // --- DATOS ---
+    function pedir(desde, hasta) {
+        const clave = iso(desde) + '|' + iso(hasta);
+        if (!rangos.has(clave)) {
+            const parametros = new URLSearchParams({
+                desde: iso(desde), hasta: iso(hasta), profesional: raiz.dataset.profesional,
+            });
+            const promesa = fetch(raiz.dataset.rango + '?' + parametros, { headers: { 'X-Requested-With': 'fetch' } })
+                .then(r => {
+                    if (r.redirected) window.location = r.url; // Se venció la sesión
+                    if (!r.ok || r.redirected) throw new Error('Error ' + r.status);
+                    return r.json();
+                })
+                .then(datos => datos.turnos);
+            promesa.catch(() => rangos.delete(clave)); // Si falló, la próxima vez se vuelve a pedir
+            rangos.set(clave, promesa);
+        }
+        return rangos.get(clave);
+    }
+
+    function precargarVecinos() {
+        [-1, 1].forEach(paso => {
+            const [desde, hasta] = rango(vista, mover(vista, fecha, paso));
+            pedir(desde, hasta).catch(() => {});
+        });
+    }
+
+    // --- DIBUJO ---
+    function elemento(etiqueta, clase, texto) {
+        const el = document.createElement(etiqueta);
+        if (clase) el.className = clase;
+        if (texto) el.textContent = texto;
+        return el;
+    }
+
+    function turnoEnGrilla([pk, , hora, paciente, tratamiento, estado]) {
+        const enlace = elemento('a', 'calendario-turno estado-' + estado, hora + ' ' + paciente + ' · ' + tratamiento);
+        enlace.href = raiz.dataset.editar.replace('/0/', '/' + pk + '/');
+        enlace.title = enlace.textContent;
+        return enlace;
+    }
+
+    function celda(dia, turnos, hoy) {
+        const caja = elemento('div', 'calendario-dia');
+        if (iso(dia) === hoy) caja.classList.add('hoy');
+        if (vista === 'mes' && dia.getMonth() !== fecha.getMonth()) caja.classList.add('fuera-de-mes');
+
+        const encabezado = elemento('div', 'small fw-bold mb-1', vista === 'mes' ? String(dia.getDate()) : nombreDia(dia));
+        if (turnos.length) encabezado.append(elemento('span', 'badge bg-light text-muted border ms-1', String(turnos.length)));
+        caja.append(encabezado);
+
+        const visibles = vista === 'mes' ? turnos.slice(0, VISIBLES_POR_DIA_EN_MES) : turnos;
+        visibles.forEach(t => caja.append(turnoEnGrilla(t)));
+        if (visibles.length < turnos.length) {
+            const mas = elemento('a', 'small', '+' + (turnos.length - visibles.length) + ' más');
+            mas.href = '#';
+            mas.addEventListener('click', (e) => {
+                e.preventDefault();
+                cambiar('dia', dia);
+            });
+            caja.append(mas);
+        }
+        return caja;
+    }
+
+    function ponerTitulo(desde, hasta) {
+        if (vista === 'mes') titulo.textContent = MESES[fecha.getMonth()] + ' ' + fecha.getFullYear();
+        else if (vista === 'dia') titulo.textContent = nombreDia(desde) + '/' + desde.getFullYear();
+        else titulo.textContent = 'semana del ' + desde.getDate() + '/' + (desde.getMonth() + 1) + ' al ' + hasta.getDate() + '/' + (hasta.getMonth() + 1);
+    }
+
+    async function mostrar() {
+        const pedido = ++dibujando;
+        const [desde, hasta] = rango(vista, fecha);
+        ponerTitulo(desde, hasta);
+        document.querySelectorAll('[data-vista]').forEach(b => b.classList.toggle('active', b.dataset.vista === vista));
+
+        let turnos;
+        try {
+            turnos = await pedir(desde, hasta);
+        } catch (error) {
+            if (pedido === dibujando) grilla.replaceChildren(elemento('div', 'text-danger p-4', 'No se pudieron cargar los turnos.'));
+            return;
+        }
+        if (pedido !== dibujando) return;
+
+        const porDia = {};
+        turnos.forEach(t => (porDia[t[1]] = porDia[t[1]] || []).push(t));
+        const hoy = iso(new Date());
+        const celdas = [];
+        for (let dia = desde; dia <= hasta; dia = sumarDias(dia, 1)) {
+            celdas.push(celda(dia, porDia[iso(dia)] || [], hoy));
+        }
+        grilla.className = 'calendario-grilla vista-' + vista;
+        grilla.replaceChildren(...celdas);
+
+        // La URL refleja lo que se ve (se puede recargar o compartir)
+        const parametros = new URLSearchParams(window.location.search);
+        parametros.set('vista', vista);
+        parametros.set('fecha', iso(fecha));
+        history.replaceState(null, '', '?' + parametros);
+
+        precargarVecinos();
+    }
+
+    function cambiar(nuevaVista, nuevaFecha) {
+        vista = nuevaVista;
+        fecha = nuevaFecha;
+        mostrar();
+    }
+
+    // --- CONTROLES ---
+    document.querySelectorAll('[data-mover]').forEach(boton => boton.addEventListener('click', () => {
+        const paso = Number(boton.dataset.mover);
+        cambiar(vista, paso === 0 ? aFecha(iso(new Date())) : mover(vista, fecha, paso));
+    }));
+    document.querySelectorAll('[data-vista]').forEach(boton => boton.addEventListener('click', () => cambiar(boton.dataset.vista, fecha)));
+
+    // Cambios desde otros escritorios: se olvida lo precargado y se vuelve a pedir
+    if (window.EventSource) {
+        let espera = null;
+        const fuente = new EventSource(raiz.dataset.eventos);
+        fuente.addEventListener('turno', () => {
+            clearTimeout(espera);
+            espera = setTimeout(() => {
+                rangos.clear();
+                mostrar();
+            }, 300);
+        });
+    }
+
+    mostrar();
+})();
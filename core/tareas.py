@@ -0,0 +1,195 @@
+"""
+Cola de tareas en segundo plano guardada en la base de datos.
+
+No necesita Redis ni nada externo: las vistas encolan una `Tarea` y el comando
+`python manage.py procesar_tareas` las ejecuta en un pool de procesos.
+
+Para agregar una tarea nueva:
+
+    @registrar_tarea('mi_tarea', 'Descripción para el usuario')
+    def mi_tarea(tarea, **parametros):
+        reportar_progreso(tarea, 50, 'Mitad...')
+        guardar_resultado(tarea, 'archivo.csv', contenido)
+"""
+import csv
+import datetime
+import io
+import logging
+import traceback
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Tarea, Turno, TurnoArchivado
+from .routers import leer_de_reportes
+
+# mensual: la tarea recibe también `mes` (si no, solo `anio`)
+TareaRegistrada = namedtuple('TareaRegistrada', ['funcion', 'descripcion', 'mensual'])
+
+REGISTRO = {}
+
+logger = logging.getLogger('consultorio.tareas')
+
+
+def registrar_tarea(tipo, descripcion, mensual=False):
+    def decorador(funcion):
+        REGISTRO[tipo] = TareaRegistrada(funcion, descripcion, mensual)
+        return funcion
+    return decorador
+
+
+# --- API PARA LAS VISTAS ---
+def encolar(tipo, usuario=None, **parametros):
+    if tipo not in REGISTRO:
+        raise ValueError(f"No existe la tarea '{tipo}'")
+    return Tarea.objects.create(tipo=tipo, parametros=parametros, usuario=usuario)
+
+
+def reintentar(tarea):
+    """Vuelve a poner en cola una tarea con error (le da un intento más)"""
+    Tarea.objects.filter(pk=tarea.pk, estado='ERROR').update(
+        estado='PENDIENTE', progreso=0, mensaje='', error=None,
+        max_intentos=tarea.intentos + 1,
+    )
+
+
+# --- API PARA LAS TAREAS ---
+def reportar_progreso(tarea, progreso, mensaje=''):
+    """Actualiza solo las columnas de progreso (no pisa el resto de la fila)"""
+    tarea.progreso = max(0, min(100, int(progreso)))
+    tarea.mensaje = mensaje[:200]
+    Tarea.objects.filter(pk=tarea.pk).update(progreso=tarea.progreso, mensaje=tarea.mensaje)
+
+
+def guardar_resultado(tarea, nombre, contenido):
+    """Guarda el archivo resultado en MEDIA_ROOT/tareas/"""
+    if isinstance(contenido, str):
+        contenido = contenido.encode('utf-8')
+    tarea.resultado.save(nombre, ContentFile(contenido), save=False)
+    Tarea.objects.filter(pk=tarea.pk).update(resultado=tarea.resultado.name)
+
+
+# --- API PARA EL WORKER ---
+def tomar_siguiente():
+    """
+    Reserva la próxima tarea pendiente. El UPDATE con filtro por estado hace que
+    dos procesos nunca tomen la misma tarea.
+    """
+    candidatas = Tarea.objects.filter(estado='PENDIENTE').order_by('creada').values_list('pk', flat=True)[:5]
+    for pk in candidatas:
+        with transaction.atomic():
+            ahora = timezone.now()
+            tomada = Tarea.objects.filter(pk=pk, estado='PENDIENTE').update(
+                estado='EN_CURSO', iniciada=ahora, latido=ahora, finalizada=None, progreso=0,
+            )
+        if tomada:
+            return Tarea.objects.get(pk=pk)
+    return None
+
+
+def latir(tarea_ids):
+    """El worker avisa que sigue vivo y con estas tareas entre manos"""
+    Tarea.objects.filter(pk__in=tarea_ids, estado='EN_CURSO').update(latido=timezone.now())
+
+
+def recuperar_abandonadas():
+    """
+    Devuelve a la cola las tareas EN_CURSO cuyo worker dejó de latir hace más de
+    TAREAS_ABANDONO_SEGUNDOS (se cortó a mitad de camino). Las de un worker vivo
+    no se tocan: si no, otro worker las correría por segunda vez.
+    """
+    limite = timezone.now() - datetime.timedelta(seconds=getattr(settings, 'TAREAS_ABANDONO_SEGUNDOS', 300))
+    return Tarea.objects.filter(
+        Q(latido__lt=limite) | Q(latido__isnull=True), estado='EN_CURSO',  # Sin latido: tomadas antes de que existiera
+    ).update(estado='PENDIENTE')
+
+
+def ejecutar(tarea_id):
+    """Corre una tarea ya reservada. Si falla y le quedan intentos, vuelve a la cola."""
+    tarea = Tarea.objects.get(pk=tarea_id)
+    tarea.intentos += 1
+    Tarea.objects.filter(pk=tarea.pk).update(intentos=tarea.intentos)
+
+    try:
+        REGISTRO[tarea.tipo].funcion(tarea, **tarea.parametros)
+    except Exception:
+        estado = 'PENDIENTE' if tarea.intentos < tarea.max_intentos else 'ERROR'
+        logger.exception('tarea_fallida', extra={
+            'tarea': tarea.pk, 'tipo': tarea.tipo, 'intento': tarea.intentos, 'estado': estado,
+        })
+        Tarea.objects.filter(pk=tarea.pk).update(
+            estado=estado, error=traceback.format_exc(), finalizada=timezone.now(),
+        )
+        return estado
+
+    Tarea.objects.filter(pk=tarea.pk).update(
+        estado='FINALIZADA', progreso=100, error=None, finalizada=timezone.now(),
+    )
+    return 'FINALIZADA'
+
+
+# ==========================================
+# TAREAS DISPONIBLES
+# ==========================================
+
+COLUMNAS_EXPORTACION = (
+    'fecha', 'hora', 'paciente__apellido', 'paciente__nombre', 'paciente__dni',
+    'tratamiento__nombre', 'obra_social_aplicada__nombre', 'profesional__apellido', 'estado',
+    'monto_paciente', 'monto_pagado', 'monto_obra_social', 'metodo_pago',
+)
+
+
+@registrar_tarea('exportar_turnos', 'Exportar turnos del año (CSV)')
+def exportar_turnos(tarea, anio):
+    # Turnos activos + archivados, ordenados por fecha
+    turnos = (
+        Turno.objects.filter(fecha__year=anio).order_by().values_list(*COLUMNAS_EXPORTACION)
+        .union(TurnoArchivado.objects.filter(fecha__year=anio).order_by().values_list(*COLUMNAS_EXPORTACION), all=True)
+        .order_by('fecha', 'hora')
+    )
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow([
+        'Fecha', 'Hora', 'Apellido', 'Nombre', 'DNI', 'Tratamiento', 'Obra Social', 'Profesional', 'Estado',
+        'Precio', 'Pagado', 'A cargo O.S.', 'Método de Pago',
+    ])
+    with leer_de_reportes(): # Es un reporte: no compite con la agenda por la base principal
+        total = turnos.count() or 1
+        for i, fila in enumerate(turnos.iterator(chunk_size=2000), start=1):
+            escritor.writerow(fila)
+            if i % 2000 == 0:
+                reportar_progreso(tarea, i * 100 / total, f'{i} de {total} turnos')
+
+    guardar_resultado(tarea, f'turnos_{anio}.csv', salida.getvalue())
+
+
+@registrar_tarea('conciliacion_anual', 'Conciliación de obras sociales del año (CSV)')
+def conciliacion_anual(tarea, anio):
+    from .conciliacion import conciliar_periodo
+
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow(['Mes', 'Obra Social', 'Turnos', 'Esperado', 'Liquidado', 'Diferencia', 'Estado'])
+    for mes in range(1, 13):
+        with leer_de_reportes():
+            filas = conciliar_periodo(anio, mes)
+        for f in filas:
+            escritor.writerow([
+                mes, f['obra_social'], f['turnos'], f['esperado'], f['liquidado'], f['diferencia'], f['estado'],
+            ])
+        reportar_progreso(tarea, mes * 100 / 12, f'Mes {mes} de 12')
+
+    guardar_resultado(tarea, f'conciliacion_{anio}.csv', salida.getvalue())
+
+
+@registrar_tarea('resumenes_mensuales', 'Resúmenes del mes para obras sociales y pacientes (ZIP)', mensual=True)
+def resumenes_mensuales(tarea, anio, mes):
+    from .resumenes import generar_resumenes
+
+    with leer_de_reportes():
+        resultado = generar_resumenes(anio, mes, progreso=lambda p, m: reportar_progreso(tarea, p, m))
+    guardar_resultado(tarea, f'resumenes_{anio}_{mes:02d}.zip', resultado['contenido'])
@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Arancel, CategoriaGasto, ObraSocial, TipoTratamiento
+from . import fabricas
+
+
+class PruebaConsultorio(TestCase):
+    """
+    Escenario común a todas las pruebas: usuario logueado, OSDE, un tratamiento
+    con arancel y un paciente.
+
+    Se crea una sola vez por clase (setUpTestData) y cada prueba lo ve como
+    recién creado: Django deshace los cambios al terminar cada una.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # 1. Un usuario (las vistas tienen @login_required)
+        cls.user = User.objects.create_user(username='admin', password='123')
+
+        # 2. Datos básicos
+        cls.osde = ObraSocial.objects.create(nombre="OSDE")
+        cls.trat_conducto = TipoTratamiento.objects.create(nombre="Conducto", descripcion="Tratamiento raiz")
+        cls.categoria_luz = CategoriaGasto.objects.create(nombre="Luz")
+
+        # 3. Un precio (Arancel): OSDE paga Conducto -> $10.000
+        cls.arancel = Arancel.objects.create(
+            obra_social=cls.osde,
+            tratamiento=cls.trat_conducto,
+            copago_sugerido=10000
+        )
+
+        # 4. Un paciente
+        cls.paciente = fabricas.crear_paciente(
+            nombre="Lionel", apellido="Messi", dni="101010",
+            obra_social_default=cls.osde
+        )
+
+    def setUp(self):
+        cache.clear() # Las versiones y catálogos cacheados no se deshacen con el rollback de cada prueba
+        self.client.force_login(self.user) # Sin pasar por el hash de la contraseña
+
+    def turno(self, **campos):
+        """Un turno de Messi, Conducto por OSDE (salvo lo que se indique)"""
+        datos = {'paciente': self.paciente, 'tratamiento': self.trat_conducto, 'obra_social_aplicada': self.osde}
+        datos.update(campos)
+        return fabricas.crear_turno(**datos)
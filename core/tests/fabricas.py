@@ -0,0 +1,44 @@
+"""
+Fábricas de datos para las pruebas.
+
+- `crear_paciente` / `crear_turno` pasan por `save()` y las señales, como en la aplicación.
+- `crear_turnos` es para volumen (paginación, consultas por fila, rendimiento): un
+  solo INSERT sin señales, así que no genera auditoría, eventos ni asistencia.
+"""
+import datetime
+from itertools import count
+
+from django.utils import timezone
+
+from ..models import Paciente, Turno
+
+_dni = count(30000000)
+
+
+def crear_paciente(**campos):
+    numero = next(_dni)
+    datos = {'nombre': 'Paciente', 'apellido': f'Prueba {numero}', 'dni': str(numero)}
+    datos.update(campos)
+    return Paciente.objects.create(**datos)
+
+
+def crear_turno(**campos):
+    datos = {'hora': datetime.time(9, 0)}
+    datos.update(campos)
+    return Turno.objects.create(**datos)
+
+
+def crear_turnos(cantidad, desde=None, minutos=30, **campos):
+    """
+    `cantidad` turnos seguidos cada `minutos` a partir de `desde` (hoy a las 8:00).
+    Los montos van explícitos: acá no se busca el arancel.
+    """
+    inicio = desde or datetime.datetime.combine(timezone.localdate(), datetime.time(8, 0))
+    campos.setdefault('monto_paciente', 0)
+    campos.setdefault('monto_pagado', 0)
+    saldo = campos['monto_paciente'] - campos['monto_pagado']
+    turnos = []
+    for i in range(cantidad):
+        momento = inicio + datetime.timedelta(minutes=minutos * i)
+        turnos.append(Turno(fecha=momento.date(), hora=momento.time(), saldo=saldo, **campos))
+    return Turno.objects.bulk_create(turnos, batch_size=500)
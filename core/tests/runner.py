@@ -0,0 +1,88 @@
+"""
+Runner de pruebas que al final muestra las más lentas (también con --parallel).
+
+    python manage.py test                 # las 10 más lentas
+    python manage.py test --parallel 4    # en 4 procesos
+    python manage.py test --lentas 0      # sin reporte
+
+Con --parallel cada proceso mide sus pruebas y manda el tiempo como un evento
+más junto con el resultado (ver RemoteTestResult de Django).
+"""
+import time
+import unittest
+
+from django.test.runner import DiscoverRunner, ParallelTestSuite, RemoteTestResult, RemoteTestRunner
+
+
+# --- EN CADA PROCESO (--parallel) ---
+class ResultadoRemotoConTiempos(RemoteTestResult):
+    def startTest(self, test):
+        self._inicio = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.events.append(('registrarDuracion', self.test_index, time.perf_counter() - self._inicio))
+
+
+class RunnerRemotoConTiempos(RemoteTestRunner):
+    resultclass = ResultadoRemotoConTiempos
+
+
+class SuiteParalelaConTiempos(ParallelTestSuite):
+    runner_class = RunnerRemotoConTiempos
+
+
+# --- EN EL PROCESO PRINCIPAL ---
+class ResultadoConTiempos(unittest.TextTestResult):
+    medir = True # En paralelo no: los eventos llegan todos juntos y el tiempo viene aparte
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.duraciones = []
+
+    def startTest(self, test):
+        self._inicio = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        if self.medir:
+            self.registrarDuracion(test, time.perf_counter() - self._inicio)
+
+    def registrarDuracion(self, test, segundos):
+        self.duraciones.append((segundos, test.id()))
+
+
+class ResultadoEnParalelo(ResultadoConTiempos):
+    medir = False
+
+
+class RunnerConTiempos(DiscoverRunner):
+    parallel_test_suite = SuiteParalelaConTiempos
+
+    def __init__(self, lentas=10, **kwargs):
+        super().__init__(**kwargs)
+        self.lentas = lentas
+        self.en_paralelo = False
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--lentas', type=int, default=10,
+                            help='Cuántas pruebas lentas mostrar al final (0 = ninguna).')
+
+    def get_resultclass(self):
+        # --debug-sql y --pdb tienen su propia clase de resultado
+        return super().get_resultclass() or (ResultadoEnParalelo if self.en_paralelo else ResultadoConTiempos)
+
+    def run_suite(self, suite, **kwargs):
+        self.en_paralelo = isinstance(suite, ParallelTestSuite)
+        resultado = super().run_suite(suite, **kwargs)
+        duraciones = sorted(getattr(resultado, 'duraciones', []), reverse=True)
+        if self.lentas and duraciones:
+            self.log(f'\nLas {min(self.lentas, len(duraciones))} pruebas más lentas:')
+            for segundos, nombre in duraciones[:self.lentas]:
+                self.log(f'{segundos:7.2f}s  {nombre}')
+            self.log(f'{sum(s for s, _ in duraciones):7.2f}s  entre las {len(duraciones)} pruebas')
+        return resultado
@@ -0,0 +1,299 @@
+"""Administración: auditoría, logo del consultorio y admin"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import datetime
+import importlib
+import io
+import shutil
+import tempfile
+
+from PIL import Image
+
+from .. import auditoria
+from ..middleware import AuditoriaMiddleware
+from ..models import Turno, Gasto, RegistroAuditoria, Configuracion, ObraSocial, TipoTratamiento, Arancel
+from . import fabricas
+from .base import PruebaConsultorio
+
+
+class AdministracionTest(PruebaConsultorio):
+
+    # ==========================================
+    # 1. AUDITORÍA DE CAMBIOS
+    # ==========================================
+
+    def test_auditoria_registra_cambios_de_montos(self):
+        """Cobrar con el botón '$' deja registrado quién cambió el monto pagado"""
+        turno = self.turno(hora=datetime.time(9,0), monto_paciente=5000)
+        self.client.get(reverse('toggle_pagado', args=[turno.pk]))
+
+        registro = RegistroAuditoria.objects.filter(modelo='turno', objeto_id=turno.pk, accion='MODIFICACION').get()
+        self.assertEqual(registro.usuario, self.user)
+        self.assertEqual(registro.cambios['monto_pagado'], ['0.00', '5000.00'])
+        self.assertEqual(registro.cambios['pagado'], [False, True])
+        self.assertNotIn('hora', registro.cambios) # Solo lo que cambió
+
+    def test_auditoria_no_se_puede_modificar(self):
+        """El registro solo acepta altas"""
+        gasto = Gasto.objects.create(categoria=self.categoria_luz, monto=1000)
+        registro = RegistroAuditoria.objects.get(modelo='gasto', objeto_id=gasto.pk)
+
+        with self.assertRaises(PermissionError):
+            registro.save()
+        with self.assertRaises(PermissionError):
+            RegistroAuditoria.objects.all().delete()
+
+    def test_vista_auditoria_filtra_por_objeto(self):
+        """Solo quien tiene permiso ve la auditoría, y se puede filtrar por objeto"""
+        g1 = Gasto.objects.create(categoria=self.categoria_luz, monto=1000)
+        Gasto.objects.create(categoria=self.categoria_luz, monto=2000)
+
+        response = self.client.get(reverse('lista_auditoria'))
+        self.assertEqual(response.status_code, 403)
+
+        self.user.is_superuser = True
+        self.user.save()
+        response = self.client.get(reverse('lista_auditoria'), {'modelo': 'gasto', 'objeto': g1.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r.objeto_id for r in response.context['pagina']], [g1.pk])
+
+        # Filtros mal escritos se ignoran en vez de dar error 500
+        response = self.client.get(reverse('lista_auditoria'), {'desde': '2024-13-45', 'hasta': 'ayer', 'usuario': 'admin'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['pagina']), 2)
+
+    def test_auditoria_no_registra_cambios_deshechos(self):
+        """Si la transacción se deshace, el cambio no quedó hecho y tampoco queda en la auditoría"""
+        from django.db import transaction
+        from .. import auditoria
+
+        turno = self.turno(monto_paciente=5000)
+        tokens = auditoria.iniciar(self.user) # Como dentro de un pedido
+        try:
+            try:
+                with transaction.atomic():
+                    turno.monto_paciente = 8000
+                    turno.save()
+                    raise RuntimeError("falla a mitad de camino")
+            except RuntimeError:
+                pass
+        finally:
+            auditoria.terminar(tokens)
+
+        self.assertFalse(RegistroAuditoria.objects.filter(modelo='turno', accion='MODIFICACION').exists())
+
+    # ==========================================
+    # 2. LOGO DEL CONSULTORIO
+    # ==========================================
+
+    def test_subir_logo_genera_versiones_chicas(self):
+        """Una foto grande se achica para el favicon, el avatar y el banner"""
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+
+        foto = io.BytesIO()
+        Image.new('RGB', (3000, 2000), (200, 30, 30)).save(foto, 'JPEG')
+        archivo = SimpleUploadedFile('foto.jpg', foto.getvalue(), content_type='image/jpeg')
+
+        with override_settings(MEDIA_ROOT=media):
+            self.client.post(reverse('actualizar_logo'), {'logo': archivo})
+            config = Configuracion.objects.get()
+
+            self.assertEqual(Image.open(config.logo_favicon).size, (64, 64))
+            self.assertEqual(Image.open(config.logo_avatar).size, (60, 60))
+            self.assertEqual(Image.open(config.logo_banner).size, (600, 400))
+            self.assertEqual(Image.open(config.logo_banner_webp).format, 'WEBP')
+
+            response = self.client.get(reverse('lista_turnos'))
+        self.assertContains(response, config.logo_avatar.url)
+        self.assertNotContains(response, config.logo.url)
+
+    def test_subir_archivo_que_no_es_imagen(self):
+        """Si no es una imagen, no se guarda nada"""
+        archivo = SimpleUploadedFile('virus.jpg', b'esto no es una imagen', content_type='image/jpeg')
+        self.client.post(reverse('actualizar_logo'), {'logo': archivo})
+        self.assertFalse(Configuracion.objects.exists())
+
+    # ==========================================
+    # 3. ADMIN
+    # ==========================================
+
+    def test_admin_turnos_no_consulta_por_fila(self):
+        """El listado del admin hace las mismas consultas con 1 turno que con 20"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        url = reverse('admin:core_turno_changelist')
+
+        self.turno(hora="10:00")
+        self.client.get(url) # Primera visita: llena la caché de configuración
+        with CaptureQueriesContext(connection) as uno:
+            self.client.get(url)
+        fabricas.crear_turnos(19, paciente=self.paciente, tratamiento=self.trat_conducto,
+                              obra_social_aplicada=self.osde)
+        with CaptureQueriesContext(connection) as veinte:
+            response = self.client.get(url)
+
+        self.assertContains(response, 'Messi, Lionel')
+        self.assertEqual(len(uno), len(veinte))
+
+    def test_paginador_estimado_en_tablas_grandes(self):
+        """Sin filtros se usa la estimación de ANALYZE o el conteo guardado, nunca el id más alto"""
+        from django.db import connection
+        from ..admin import PaginadorEstimado
+
+        turno = self.turno(hora="10:00")
+        Turno.objects.filter(pk=turno.pk).update(id=50000) # Ids altos: se archivaron los viejos
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS sqlite_stat1")
+
+        # Sin estadísticas: conteo exacto, guardado hasta que cambien los turnos
+        self.assertEqual(PaginadorEstimado(Turno.objects.all(), 50).count, 1)
+        with self.assertNumQueries(1): # Solo la búsqueda de estadísticas
+            self.assertEqual(PaginadorEstimado(Turno.objects.all(), 50).count, 1)
+        self.turno(hora="11:00")
+        self.assertEqual(PaginadorEstimado(Turno.objects.all(), 50).count, 2)
+
+        # Con estadísticas de una tabla grande, se usan
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE "core_turno"')
+            cursor.execute("UPDATE sqlite_stat1 SET stat = '80000 1' WHERE tbl = 'core_turno'")
+        self.assertEqual(PaginadorEstimado(Turno.objects.all(), 50).count, 80000)
+        self.assertEqual(PaginadorEstimado(Turno.objects.filter(estado='PENDIENTE'), 50).count, 2)
+
+        # Al archivar se renuevan: la estimación no queda con los turnos que ya se fueron
+        from ..archivo import _actualizar_estadisticas
+        _actualizar_estadisticas()
+        self.assertEqual(PaginadorEstimado(Turno.objects.all(), 50).count, 2)
+
+    # ==========================================
+    # 4. REGISTRO ESTRUCTURADO
+    # ==========================================
+
+    def test_registro_de_pedidos_y_eventos(self):
+        """Cada pedido deja ruta, usuario, duración y consultas; el pago deja su evento con el mismo pedido"""
+        turno = self.turno(monto_paciente=5000, monto_pagado=0, estado='FINALIZADO')
+
+        with self.assertLogs('consultorio', level='INFO') as registros:
+            self.client.post(reverse('registrar_pago_deuda', args=[turno.pk]), {'monto_abonado': '2000'})
+            self.client.post(reverse('registrar_pago_deuda', args=[turno.pk]), {'monto_abonado': 'dos mil'})
+
+        pago, rechazo = [r for r in registros.records if r.name == 'consultorio.eventos']
+        pedidos = [r for r in registros.records if r.name == 'consultorio.pedidos']
+        self.assertEqual((pago.evento, pago.monto, pago.saldo, pago.usuario), ('pago_registrado', 2000, 3000, 'admin'))
+        self.assertEqual((rechazo.evento, rechazo.levelname), ('pago_rechazado', 'WARNING'))
+        self.assertEqual(pedidos[0].ruta, 'registrar_pago_deuda')
+        self.assertEqual(pedidos[0].usuario, 'admin')
+        self.assertEqual(pedidos[0].estado, 302)
+        self.assertGreater(pedidos[0].consultas, 0)
+        self.assertEqual(pago.pedido, pedidos[0].pedido)
+        turno.refresh_from_db()
+        self.assertEqual(turno.monto_pagado, 2000) # El monto inválido no tocó nada
+
+    def test_registro_se_escribe_en_json_desde_otro_hilo(self):
+        """El manejador en cola escribe una línea JSON por registro, con los campos extra"""
+        import json
+        import logging
+        from ..registro import ManejadorEnCola
+
+        carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, carpeta)
+        manejador = ManejadorEnCola(f'{carpeta}/prueba.log')
+        logger = logging.getLogger('consultorio.prueba_archivo')
+        logger.addHandler(manejador)
+        self.addCleanup(logger.removeHandler, manejador)
+        try:
+            logger.warning('importacion_fallida', extra={'fila': 12, 'fecha': datetime.date(2024, 5, 1)})
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                logger.exception('con_error')
+        finally:
+            manejador.close() # Espera a que el hilo escriba lo encolado
+
+        with open(f'{carpeta}/prueba.log', encoding='utf-8') as archivo:
+            lineas = [json.loads(linea) for linea in archivo]
+        self.assertEqual(lineas[0]['mensaje'], 'importacion_fallida')
+        self.assertEqual((lineas[0]['nivel'], lineas[0]['fila'], lineas[0]['fecha']), ('WARNING', 12, '2024-05-01'))
+        self.assertIn('ZeroDivisionError', lineas[1]['error'])
+
+
+class AuditoriaPorPedidoTest(TransactionTestCase):
+    """
+    Sin la transacción que envuelve cada prueba de TestCase: los save() van en
+    autocommit, como en un pedido de verdad, y se ve el buffer del middleware.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='admin', password='123')
+        osde = ObraSocial.objects.create(nombre="OSDE")
+        conducto = TipoTratamiento.objects.create(nombre="Conducto")
+        Arancel.objects.create(obra_social=osde, tratamiento=conducto, copago_sugerido=10000)
+        paciente = fabricas.crear_paciente(nombre="Lionel", apellido="Messi", dni="101010")
+        self.turno = fabricas.crear_turno(paciente=paciente, tratamiento=conducto, obra_social_aplicada=osde)
+
+    def _fixture_teardown(self):
+        # El flush del final borra todas las tablas y el trigger de la auditoría no lo deja
+        if connection.vendor != 'sqlite':
+            return super()._fixture_teardown()
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER IF EXISTS auditoria_sin_borrar")
+        try:
+            super()._fixture_teardown()
+        finally:
+            triggers = importlib.import_module('core.migrations.0009_registroauditoria').TRIGGERS_SQLITE
+            with connection.cursor() as cursor:
+                cursor.execute(triggers[1])
+
+    def pedido(self, vista):
+        request = RequestFactory().post('/')
+        request.user = self.user
+        return AuditoriaMiddleware(vista)(request)
+
+    def modificaciones(self):
+        return RegistroAuditoria.objects.filter(modelo='turno', accion='MODIFICACION')
+
+    def test_se_escribe_todo_junto_al_final_del_pedido(self):
+        """Durante el pedido los cambios quedan en memoria y al terminar van en un solo INSERT"""
+        def vista(request):
+            for monto in (6000, 7000):
+                self.turno.monto_paciente = monto
+                self.turno.save()
+            self.assertFalse(self.modificaciones().exists()) # Todavía en el buffer
+            return HttpResponse()
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.pedido(vista)
+
+        inserts = [q for q in consultas if q['sql'].startswith('INSERT INTO "core_registroauditoria"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual([r.cambios['monto_paciente'][1] for r in self.modificaciones().order_by('id')], [6000, 7000])
+        self.assertEqual(set(self.modificaciones().values_list('usuario', flat=True)), {self.user.pk})
+        self.assertIsNone(auditoria._buffer.get()) # El próximo pedido arranca de cero
+
+    def test_lo_deshecho_por_un_error_no_queda(self):
+        """Si el pedido falla y la transacción se deshace, su cambio no se audita; lo ya guardado sí"""
+        def vista(request):
+            self.turno.metodo_pago = 'EFECTIVO'
+            self.turno.save() # Autocommit: este cambio queda hecho
+            with transaction.atomic():
+                self.turno.monto_paciente = 8000
+                self.turno.save()
+                raise RuntimeError("falla a mitad de camino")
+
+        with self.assertRaises(RuntimeError):
+            self.pedido(vista)
+
+        self.turno.refresh_from_db()
+        self.assertEqual((self.turno.metodo_pago, self.turno.monto_paciente), ('EFECTIVO', 10000))
+        self.assertEqual([list(r.cambios) for r in self.modificaciones()], [['metodo_pago']])
+        self.assertIsNone(auditoria._buffer.get())
@@ -0,0 +1,278 @@
+"""Agenda: caché y 304, agenda en vivo, riesgo de ausencia, cierres, acciones masivas y calendario"""
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+import datetime
+import io
+
+from ..models import Turno, RegistroAuditoria, EventoTurno
+from .base import PruebaConsultorio
+
+
+class AgendaTest(PruebaConsultorio):
+
+    # ==========================================
+    # 1. CACHÉ DE CATÁLOGOS
+    # ==========================================
+
+    def test_lista_aranceles_responde_304_si_no_cambio(self):
+        """La segunda visita no consulta la base; al editar un arancel la página cambia"""
+        url = reverse('lista_aranceles')
+        self.client.get(url) # Primera visita: recibe la cookie CSRF
+        response = self.client.get(url)
+        self.assertContains(response, 'OSDE')
+        etag = response['ETag']
+
+        with self.assertNumQueries(2): # Sesión y usuario, nada más
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.arancel.copago_sugerido = 12345
+        self.arancel.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '12345')
+
+    def test_agenda_responde_304_hasta_que_cambia_un_turno(self):
+        """Recargar la agenda sin cambios no ejecuta las consultas de turnos"""
+        url = reverse('lista_turnos')
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Otro usuario no puede reutilizar el ETag (el menú depende de los permisos)
+        User.objects.create_user(username='recepcion', password='123')
+        self.client.login(username='recepcion', password='123')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Editar un paciente también cambia la página
+        etag = response['ETag']
+        self.paciente.apellido = 'Messi Cuccittini'
+        self.paciente.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    # ==========================================
+    # 2. AGENDA EN VIVO
+    # ==========================================
+
+    def test_cambios_de_turno_generan_eventos(self):
+        """Alta, cambio de estado, pago y borrado quedan como eventos para las agendas abiertas"""
+        turno = self.turno(hora="10:00")
+        self.client.get(reverse('toggle_atendido', args=[turno.pk]))
+        self.client.get(reverse('toggle_pagado', args=[turno.pk]))
+        self.client.post(reverse('borrar_turno', args=[turno.pk]))
+
+        tipos = list(EventoTurno.objects.filter(turno_id=turno.pk).values_list('tipo', flat=True))
+        self.assertEqual(tipos, ['ALTA', 'ESTADO', 'PAGO', 'BAJA'])
+
+        # La fila de un turno borrado ya no existe
+        response = self.client.get(reverse('fila_turno', args=[turno.pk]))
+        self.assertEqual(response.status_code, 204)
+
+    @override_settings(EVENTOS_WSGI_SEGUNDOS=0)
+    def test_flujo_de_eventos_y_toggle_devuelve_la_fila(self):
+        """El navegador recibe los eventos desde el último que vio y el toggle devuelve solo la fila"""
+        turno = self.turno(hora="10:00")
+        desde = EventoTurno.objects.get().pk
+
+        response = self.client.get(reverse('toggle_pagado', args=[turno.pk]), HTTP_X_REQUESTED_WITH='fetch')
+        self.assertContains(response, f'id="turno-{turno.pk}"')
+        self.assertContains(response, 'Pagado Total')
+        self.assertNotContains(response, '<html')
+
+        response = self.client.get(reverse('eventos_turnos'), HTTP_LAST_EVENT_ID=str(desde))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        contenido = b''.join(response.streaming_content).decode()
+        self.assertIn(f'"turno": {turno.pk}, "tipo": "PAGO"', contenido)
+        self.assertNotIn('"ALTA"', contenido)
+
+    @override_settings(EVENTOS_WSGI_SEGUNDOS=0)
+    def test_flujo_de_eventos_no_saltea_lo_que_pasa_del_tope(self):
+        """Si el navegador se perdió más eventos que los de una consulta, los recibe todos igual"""
+        from unittest import mock
+        from .. import eventos
+
+        desde = eventos.ultimo_id()
+        turnos = [self.turno(hora=datetime.time(9 + i, 0)) for i in range(5)]
+        with mock.patch.object(eventos, 'MAXIMO_POR_CONSULTA', 2):
+            response = self.client.get(reverse('eventos_turnos'), HTTP_LAST_EVENT_ID=str(desde))
+            contenido = b''.join(response.streaming_content).decode()
+        for turno in turnos:
+            self.assertIn(f'"turno": {turno.pk}, "tipo": "ALTA"', contenido)
+
+    # ==========================================
+    # 3. RIESGO DE AUSENCIA
+    # ==========================================
+
+    def test_riesgo_de_ausencia_se_actualiza_y_se_ve_en_la_agenda(self):
+        """Las ausencias suben el riesgo del paciente y la agenda lo marca sin consultas por fila"""
+        from unittest import mock
+        from django.core.management import call_command
+        from ..models import ResumenAsistencia
+
+        hoy = timezone.localdate()
+        pasados = [
+            self.turno(fecha=hoy - datetime.timedelta(days=d))
+            for d in (10, 20)
+        ]
+        # Dos turnos PENDIENTE con la fecha pasada: dos ausencias
+        resumen = ResumenAsistencia.objects.get(paciente=self.paciente)
+        self.assertEqual((resumen.turnos, resumen.ausentes, resumen.nivel), (2, 2, 'ALTO'))
+
+        self.turno(fecha=hoy)
+        response = self.client.get(reverse('lista_turnos'), {'fecha': hoy.isoformat()})
+        self.assertContains(response, 'Riesgo alto de ausencia')
+
+        # Si en realidad vino, el riesgo baja
+        for turno in pasados:
+            turno.estado = 'FINALIZADO'
+            turno.save()
+        self.assertEqual(ResumenAsistencia.objects.get(paciente=self.paciente).riesgo, 0)
+
+        # El turno de hoy pasa a ser ausencia al día siguiente: lo toma el comando nocturno
+        with mock.patch('django.utils.timezone.localdate', return_value=hoy + datetime.timedelta(days=1)):
+            call_command('actualizar_asistencia', stdout=io.StringIO())
+        self.assertEqual(ResumenAsistencia.objects.get(paciente=self.paciente).ausentes, 1)
+
+    # ==========================================
+    # 4. CIERRE DE PENDIENTES VENCIDOS
+    # ==========================================
+
+    def test_cierre_de_pendientes_vencidos_y_deshacer(self):
+        """El comando cierra los pendientes viejos en bloque y desde la pantalla se deshace"""
+        from django.core.management import call_command
+        from ..models import EventoTurno, LoteCierre, RegistroAuditoria, ResumenAsistencia
+
+        hoy = timezone.localdate()
+        vino = self.turno(fecha=hoy - datetime.timedelta(days=5), monto_paciente=5000, monto_pagado=2000)
+        falto = self.turno(hora=datetime.time(10,0), fecha=hoy - datetime.timedelta(days=5))
+        reciente = self.turno(fecha=hoy - datetime.timedelta(days=1))
+
+        salida = io.StringIO()
+        call_command('cerrar_turnos_pendientes', '--simular', stdout=salida)
+        self.assertIn('Se cerrarían 2 turnos', salida.getvalue())
+        self.assertEqual(Turno.objects.filter(estado='PENDIENTE').count(), 3)
+
+        eventos_antes = EventoTurno.objects.count()
+        call_command('cerrar_turnos_pendientes', stdout=io.StringIO())
+        estados = dict(Turno.objects.values_list('pk', 'estado'))
+        self.assertEqual(
+            (estados[vino.pk], estados[falto.pk], estados[reciente.pk]),
+            ('FINALIZADO', 'AUSENTE', 'PENDIENTE'),
+        )
+        lote = LoteCierre.objects.get()
+        self.assertTrue(lote.automatico)
+        self.assertEqual(lote.cantidad, 2)
+        # Lo que harían las señales: auditoría, eventos de la agenda y asistencia
+        self.assertEqual(RegistroAuditoria.objects.filter(objeto_id=falto.pk, accion='MODIFICACION').last().cambios,
+                         {'estado': ['PENDIENTE', 'AUSENTE']})
+        self.assertEqual(EventoTurno.objects.count() - eventos_antes, 2)
+        self.assertEqual(ResumenAsistencia.objects.get(paciente=self.paciente).ausentes, 2)  # AUSENTE + el reciente
+
+        response = self.client.get(reverse('lista_cierres'))
+        self.assertContains(response, 'No asistió')
+
+        # Deshacer solo el que no vino
+        self.client.post(reverse('revisar_cierre', args=[lote.pk]), {'accion': 'deshacer', 'turnos': [falto.pk]})
+        falto.refresh_from_db()
+        lote.refresh_from_db()
+        self.assertEqual(falto.estado, 'PENDIENTE')
+        self.assertEqual(lote.estado, 'APLICADO')
+
+        # Si alguien lo cambió a mano después, deshacer no lo pisa y el lote sigue para revisar
+        vino.estado = 'CANCELADO'
+        vino.save()
+        self.client.post(reverse('revisar_cierre', args=[lote.pk]), {'accion': 'deshacer_todo'})
+        vino.refresh_from_db()
+        lote.refresh_from_db()
+        self.assertEqual(vino.estado, 'CANCELADO')
+        self.assertEqual(lote.estado, 'APLICADO')
+        self.assertFalse(lote.cierres.get(turno_id=vino.pk).deshecho)
+
+        # Cuando vuelve al estado del cierre se puede deshacer y ahí sí queda todo deshecho
+        vino.estado = 'FINALIZADO'
+        vino.save()
+        self.client.post(reverse('revisar_cierre', args=[lote.pk]), {'accion': 'deshacer_todo'})
+        vino.refresh_from_db()
+        lote.refresh_from_db()
+        self.assertEqual(vino.estado, 'PENDIENTE')
+        self.assertEqual(lote.estado, 'DESHECHO')
+
+    # ==========================================
+    # 5. ACCIONES MASIVAS EN LA AGENDA
+    # ==========================================
+
+    def test_acciones_masivas_respetan_los_pagos(self):
+        """Varios turnos atendidos y pagados en un POST, con el mismo saldo que deja save()"""
+        from ..models import EventoTurno, RegistroAuditoria
+
+        hoy = timezone.localdate()
+        parcial = self.turno(fecha=hoy, monto_paciente=5000, monto_pagado=1000)
+        impago = self.turno(fecha=hoy, hora=datetime.time(10,0))  # Copago del arancel: 10000
+        cancelado = self.turno(fecha=hoy, hora=datetime.time(11,0), estado='CANCELADO')
+
+        response = self.client.get(reverse('lista_turnos'))
+        self.assertContains(response, 'Atendidos y pagados')
+
+        eventos_antes = EventoTurno.objects.count()
+        # Las mismas consultas sean 3 turnos o 300: nada se guarda fila por fila
+        with self.assertNumQueries(16):
+            response = self.client.post(
+                reverse('acciones_turnos'),
+                {'accion': 'atendido_pagado', 'turnos': [parcial.pk, impago.pk, cancelado.pk]},
+                HTTP_X_REQUESTED_WITH='fetch',
+            )
+        self.assertEqual(sorted(response.json()['actualizados']), [parcial.pk, impago.pk])
+
+        for turno in (parcial, impago, cancelado):
+            turno.refresh_from_db()
+        self.assertEqual((parcial.estado, parcial.pagado, parcial.monto_pagado, parcial.saldo), ('FINALIZADO', True, 5000, 0))
+        self.assertEqual((impago.monto_pagado, impago.saldo), (10000, 0))
+        self.assertEqual((cancelado.estado, cancelado.pagado), ('CANCELADO', False))  # Los cancelados no se tocan
+        self.assertEqual(EventoTurno.objects.count() - eventos_antes, 2)
+        auditoria = RegistroAuditoria.objects.filter(objeto_id=parcial.pk, accion='MODIFICACION').last()
+        self.assertEqual(auditoria.usuario, self.user)
+        self.assertEqual(auditoria.cambios['saldo'], ['4000.00', '0.00'])
+
+        # Sin JavaScript: vuelve a la agenda con los mismos filtros
+        response = self.client.post(reverse('acciones_turnos'), {
+            'accion': 'cancelar', 'turnos': [impago.pk], 'filtros': f'fecha={hoy.isoformat()}',
+        })
+        self.assertRedirects(response, f"{reverse('lista_turnos')}?fecha={hoy.isoformat()}", fetch_redirect_response=False)
+        impago.refresh_from_db()
+        self.assertEqual(impago.estado, 'FINALIZADO')  # Ya estaba atendido: cancelar no aplica
+
+    # ==========================================
+    # 6. CALENDARIO
+    # ==========================================
+
+    def test_calendario_pide_solo_el_rango_visible(self):
+        """El endpoint devuelve filas compactas del rango y responde 304 si no cambió nada"""
+        lunes = datetime.date(2026, 3, 2)
+        for dias in (0, 3, 6, 7):
+            self.turno(fecha=lunes + datetime.timedelta(days=dias), hora=datetime.time(9,30))
+
+        response = self.client.get(reverse('calendario'), {'vista': 'mes', 'fecha': '2026-03-15'})
+        self.assertContains(response, 'data-vista="mes"')
+
+        url = reverse('turnos_rango')
+        semana = {'desde': lunes.isoformat(), 'hasta': (lunes + datetime.timedelta(days=6)).isoformat(), 'profesional': ''}
+        with self.assertNumQueries(3):  # Sesión, usuario y los turnos
+            response = self.client.get(url, semana)
+        turnos = response.json()['turnos']
+        self.assertEqual(len(turnos), 3)  # El del lunes siguiente queda afuera
+        self.assertEqual(turnos[0][1:], ['2026-03-02', '09:30', 'Messi, L.', 'Conducto', 'PENDIENTE'])
+
+        # Sin cambios, el navegador usa lo que ya tiene
+        response = self.client.get(url, semana, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(self.client.get(url, {'desde': '2026-03-09', 'hasta': '2026-03-02'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'desde': '2026-01-01', 'hasta': '2026-12-31'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'desde': 'ayer'}).status_code, 400)
@@ -0,0 +1,290 @@
+"""Finanzas: balance, deudores, conciliación, análisis de gastos y estadísticas"""
+from django.urls import reverse
+from django.utils import timezone
+import datetime
+
+from ..models import Turno, Gasto, LiquidacionObraSocial, EstadisticaMensual, RegistroAuditoria
+from .base import PruebaConsultorio
+
+
+class FinanzasTest(PruebaConsultorio):
+
+    # ==========================================
+    # 1. PRUEBAS DE FINANZAS (BALANCE)
+    # ==========================================
+
+    def test_calculo_balance_general(self):
+        """
+        Prueba Integral:
+        + Ingreso Consultorio: $5.000
+        + Ingreso Banco (OS): $20.000
+        - Gasto Luz: $1.000
+        -----------------------------
+        RESULTADO ESPERADO: $24.000
+        """
+        # 1. Turno cobrado
+        self.turno(monto_paciente=5000, monto_pagado=5000, pagado=True, fecha=timezone.now())
+        # 2. Liquidación Banco
+        LiquidacionObraSocial.objects.create(
+            obra_social=self.osde, periodo="Enero", monto_total=20000,
+            fecha_ingreso=timezone.now()
+        )
+        # 3. Gasto
+        Gasto.objects.create(
+            categoria=self.categoria_luz, monto=1000, fecha=timezone.now()
+        )
+
+        # Hacemos la petición a la vista de balance
+        response = self.client.get(reverse('balance'))
+        
+        # Verificamos el contexto (lo que le llega al HTML)
+        self.assertEqual(response.context['ingresos_turnos'], 5000)
+        self.assertEqual(response.context['ingresos_os'], 20000)
+        self.assertEqual(response.context['egresos'], 1000)
+        self.assertEqual(response.context['resultado'], 24000)
+
+    # ==========================================
+    # 2. PRUEBAS DE DEUDORES Y PAGOS PARCIALES
+    # ==========================================
+
+    def test_reporte_deudores_filtra_correctamente(self):
+        """El reporte solo debe mostrar gente que debe plata Y ya fue atendida"""
+        # Caso 1: Debe plata y está finalizado (DEBERÍA APARECER)
+        t1 = self.turno(monto_paciente=10000, monto_pagado=0, estado='FINALIZADO', pagado=False)
+        
+        # Caso 2: Debe plata pero es futuro/pendiente (NO DEBERÍA APARECER)
+        t2 = self.turno(hora=datetime.time(10,0), monto_paciente=10000, monto_pagado=0, estado='PENDIENTE', pagado=False)
+
+        response = self.client.get(reverse('reporte_deudores'))
+        
+        # Verificamos que t1 esté y t2 no
+        self.assertIn(t1, response.context['turnos'])
+        self.assertNotIn(t2, response.context['turnos'])
+
+    def test_registrar_pago_parcial(self):
+        """Probamos el botón de 'Registrar Pago' en la lista de deudores"""
+        # Turno que debe 10.000
+        turno = self.turno(monto_paciente=10000, monto_pagado=0, estado='FINALIZADO', pagado=False)
+
+        # Simulamos que el usuario escribe "4000" en el modal y guarda
+        url = reverse('registrar_pago_deuda', args=[turno.pk])
+        self.client.post(url, {'monto_abonado': '4000'})
+
+        # Recargamos el turno de la base de datos
+        turno.refresh_from_db()
+
+        # Ahora debe haber pagado 4000 y deber 6000
+        self.assertEqual(turno.monto_pagado, 4000)
+        self.assertEqual(turno.saldo_pendiente, 6000)
+        self.assertFalse(turno.pagado) # Sigue debiendo
+
+        # Pagamos el resto (6000)
+        self.client.post(url, {'monto_abonado': '6000'})
+        turno.refresh_from_db()
+        
+        # Ahora debe estar saldado
+        self.assertTrue(turno.pagado)
+        self.assertEqual(turno.saldo_pendiente, 0)
+
+    def test_saldo_se_guarda_y_la_base_rechaza_pagos_invalidos(self):
+        """El saldo queda en la base (el total sale de un SUM) y no se puede pagar de más"""
+        from django.db import IntegrityError, transaction
+
+        turno = self.turno(monto_paciente=10000, monto_pagado=2500, estado='FINALIZADO')
+        self.assertEqual(Turno.objects.get(pk=turno.pk).saldo, 7500)
+
+        # Pagar de más no se recorta en silencio: el formulario avisa...
+        datos = {
+            'fecha': turno.fecha, 'hora': '09:00', 'paciente': self.paciente.pk, 'tratamiento': self.trat_conducto.pk,
+            'obra_social_aplicada': self.osde.pk, 'monto_paciente': 10000, 'monto_obra_social': 0, 'monto_pagado': 12000,
+        }
+        response = self.client.post(reverse('editar_turno', args=[turno.pk]), datos)
+        self.assertContains(response, 'supera el precio del turno')
+        # ...también si se baja el precio por debajo de lo ya cobrado
+        response = self.client.post(reverse('editar_turno', args=[turno.pk]),
+                                    {**datos, 'monto_paciente': 2000, 'monto_pagado': 2500})
+        self.assertContains(response, 'supera el precio del turno')
+        turno.refresh_from_db()
+        self.assertEqual((turno.monto_paciente, turno.monto_pagado), (10000, 2500))
+        # En un turno nuevo con precio en 0 se compara contra el del arancel ($10.000)
+        response = self.client.post(reverse('crear_turno'),
+                                    {**datos, 'hora': '11:00', 'monto_paciente': 0, 'monto_pagado': 15000})
+        self.assertContains(response, 'supera el precio del turno')
+
+        # ...y desde el código o por fuera del modelo, la base no lo acepta
+        turno.monto_pagado = 12000
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            turno.save(update_fields=['monto_pagado'])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Turno.objects.filter(pk=turno.pk).update(monto_pagado=-1)
+
+        self.turno(hora=datetime.time(10,0), monto_paciente=3000, monto_pagado=1000, estado='FINALIZADO')
+        response = self.client.get(reverse('reporte_deudores'))
+        self.assertEqual(response.context['total_deuda'], 9500) # 7500 del primero + 2000
+        self.assertEqual(len(response.context['turnos']), 2)
+
+    # ==========================================
+    # 3. CONCILIACIÓN DE OBRAS SOCIALES
+    # ==========================================
+
+    def test_turno_toma_monto_obra_social_del_arancel(self):
+        """Al crear el turno se copia lo que paga la obra social según el Arancel"""
+        self.arancel.monto_obra_social = 25000
+        self.arancel.save()
+        turno = self.turno(hora=datetime.time(9,0))
+        self.assertEqual(turno.monto_paciente, 10000)
+        self.assertEqual(turno.monto_obra_social, 25000)
+
+    def test_conciliacion_detecta_faltante(self):
+        """2 turnos atendidos x $25.000 = $50.000 esperados. Si OSDE liquidó $30.000, faltan $20.000"""
+        self.arancel.monto_obra_social = 25000
+        self.arancel.save()
+        hoy = timezone.localdate()
+        for hora in (9, 10):
+            self.turno(hora=datetime.time(hora,0), fecha=hoy, estado='FINALIZADO')
+        # Un cancelado no suma
+        self.turno(hora=datetime.time(11,0), fecha=hoy, estado='CANCELADO')
+        LiquidacionObraSocial.objects.create(
+            obra_social=self.osde, periodo="Este mes", monto_total=30000,
+            periodo_mes=hoy.month, periodo_anio=hoy.year
+        )
+
+        response = self.client.get(reverse('conciliacion'), {'mes': hoy.month, 'anio': hoy.year})
+        fila = response.context['filas'][0]
+
+        self.assertEqual(fila['turnos'], 2)
+        self.assertEqual(fila['esperado'], 50000)
+        self.assertEqual(fila['liquidado'], 30000)
+        self.assertEqual(fila['diferencia'], 20000)
+        self.assertEqual(fila['estado'], 'FALTANTE')
+
+        # Si llega el resto, la caché se invalida sola y queda conciliado
+        LiquidacionObraSocial.objects.create(
+            obra_social=self.osde, periodo="Este mes (resto)", monto_total=20000,
+            periodo_mes=hoy.month, periodo_anio=hoy.year
+        )
+        response = self.client.get(reverse('conciliacion'), {'mes': hoy.month, 'anio': hoy.year})
+        self.assertEqual(response.context['filas'][0]['estado'], 'OK')
+
+    def test_conciliacion_de_turnos_sin_monto_de_obra_social(self):
+        """Al cargar el monto de la obra social en el arancel se completan los turnos que quedaron en 0"""
+        import importlib
+        from django.apps import apps
+        from ..estadisticas import estadisticas
+        from ..resumenes import documentos_obras_sociales
+        migracion = importlib.import_module('core.migrations.0020_completar_monto_obra_social')
+
+        hoy = timezone.localdate()
+        viejo = self.turno(fecha=hoy, estado='FINALIZADO') # El arancel todavía no tiene monto de la OS
+        self.assertEqual(viejo.monto_obra_social, 0)
+        facturado = lambda: estadisticas('OBRA_SOCIAL', hoy.year, hoy.month, cantidad=1)['filas'][0]['facturado_mes']
+        self.assertEqual(facturado(), viejo.monto_paciente)
+        self.arancel.monto_obra_social = 25000
+        self.arancel.save()
+        viejo.refresh_from_db()
+        self.assertEqual(viejo.monto_obra_social, 25000)
+        self.assertEqual(RegistroAuditoria.objects.filter(objeto_id=viejo.pk, accion='MODIFICACION').last().cambios,
+                         {'monto_obra_social': ['0.00', '25000.00']})
+
+        # Conciliación, planilla para la obra social y estadísticas cuentan lo mismo
+        LiquidacionObraSocial.objects.create(
+            obra_social=self.osde, periodo="Este mes", monto_total=25000, periodo_mes=hoy.month, periodo_anio=hoy.year
+        )
+        fila = self.client.get(reverse('conciliacion'), {'mes': hoy.month, 'anio': hoy.year}).context['filas'][0]
+        self.assertEqual((fila['esperado'], fila['estado']), (25000, 'OK'))
+        self.assertEqual(documentos_obras_sociales(hoy.year, hoy.month)[0]['contexto']['total'], 25000)
+        self.assertEqual(facturado(), viejo.monto_paciente + 25000)
+
+        # La migración hace lo mismo con los aranceles que ya tenían monto
+        Turno.objects.filter(pk=viejo.pk).update(monto_obra_social=0)
+        migracion.completar_monto_obra_social(apps, None)
+        viejo.refresh_from_db()
+        self.assertEqual(viejo.monto_obra_social, 25000)
+
+    # ==========================================
+    # 4. ANÁLISIS DE GASTOS
+    # ==========================================
+
+    def test_analisis_de_gastos_por_categoria_y_presupuesto(self):
+        """Totales por mes, promedio móvil y presupuesto; los meses cerrados salen de la caché"""
+        from ..analisis_gastos import analizar, meses_hasta
+
+        hoy = timezone.localdate()
+        (a1, m1), (a2, m2), (a3, m3) = meses_hasta(hoy.year, hoy.month, 3)
+        self.categoria_luz.presupuesto_mensual = 1000
+        self.categoria_luz.save()
+        viejo = Gasto.objects.create(categoria=self.categoria_luz, monto=600, fecha=datetime.date(a1, m1, 5))
+        Gasto.objects.create(categoria=self.categoria_luz, monto=900, fecha=datetime.date(a2, m2, 5))
+        Gasto.objects.create(categoria=self.categoria_luz, monto=1200, fecha=datetime.date(a3, m3, 5))
+        Gasto.objects.create(categoria=self.categoria_luz, monto=300, fecha=datetime.date(a3, m3, 6))
+
+        analisis = analizar(hoy.year, hoy.month, cantidad=2, ventana=2)
+        fila = analisis['filas'][0]
+        self.assertEqual(fila['meses'], [(900, 750), (1500, 1200)])
+        self.assertEqual((fila['actual'], fila['excedido'], fila['uso']), (1500, 500, 150))
+
+        # Solo se consulta el mes en curso
+        with self.assertNumQueries(1):
+            analizar(hoy.year, hoy.month, cantidad=2, ventana=2)
+
+        # Corregir un gasto de un mes cerrado invalida ese mes
+        viejo.monto = 100
+        viejo.save()
+        fila = analizar(hoy.year, hoy.month, cantidad=2, ventana=2)['filas'][0]
+        self.assertEqual(fila['meses'][0], (900, 500))
+
+        response = self.client.get(reverse('analisis_gastos'), {'meses': 6})
+        self.assertContains(response, 'Excedido en $500')
+
+    # ==========================================
+    # 5. ESTADÍSTICAS POR TRATAMIENTO / OBRA SOCIAL
+    # ==========================================
+
+    def test_estadisticas_se_materializan_por_mes(self):
+        """Facturado, cancelación y ticket por obra social; solo se recalcula el mes que cambió"""
+        from ..analisis_gastos import meses_hasta
+        from ..estadisticas import estadisticas, materializar
+
+        hoy = timezone.localdate()
+        (a1, m1), (a2, m2) = meses_hasta(hoy.year, hoy.month, 2)
+        montos = dict(monto_paciente=1000, monto_obra_social=3000)
+        self.turno(fecha=datetime.date(a1, m1, 3), estado='FINALIZADO', **montos)
+        self.turno(fecha=datetime.date(a2, m2, 3), estado='FINALIZADO', **montos)
+        self.turno(hora=datetime.time(10,0), fecha=datetime.date(a2, m2, 3), estado='FINALIZADO', **montos)
+        cancelado = self.turno(hora=datetime.time(11,0), fecha=datetime.date(a2, m2, 3), estado='CANCELADO', **montos)
+
+        fila = estadisticas('OBRA_SOCIAL', hoy.year, hoy.month, cantidad=2)['filas'][0]
+        self.assertEqual((fila['turnos'], fila['atendidos'], fila['cancelacion']), (4, 3, 25))
+        self.assertEqual((fila['facturado'], fila['ticket']), (12000, 4000))
+        self.assertEqual((fila['facturado_mes'], fila['variacion'], fila['participacion']), (8000, 100, 100))
+        self.assertEqual(EstadisticaMensual.objects.filter(dimension='TRATAMIENTO').count(), 2)
+
+        self.assertEqual(materializar(meses_hasta(hoy.year, hoy.month, 2)), []) # Nada cambió
+        cancelado.estado = 'FINALIZADO'
+        cancelado.save()
+        self.assertEqual(materializar(meses_hasta(hoy.year, hoy.month, 2)), [(a2, m2)])
+
+        response = self.client.get(reverse('estadisticas'), {'por': 'TRATAMIENTO', 'meses': 6})
+        self.assertContains(response, 'Conducto')
+        self.assertEqual(response.context['filas'][0]['facturado'], 16000)
+
+    def test_estadisticas_comparan_con_el_mes_calendario_anterior(self):
+        """Si el mes anterior no tuvo turnos no hay variación; el mes vacío queda calculado y la caché evita consultas"""
+        from ..analisis_gastos import meses_hasta
+        from ..estadisticas import estadisticas, materializar
+
+        hoy = timezone.localdate()
+        meses = meses_hasta(hoy.year, hoy.month, 3)
+        (a0, m0), (a1, m1), (a2, m2) = meses
+        montos = dict(monto_paciente=1000, monto_obra_social=3000, estado='FINALIZADO')
+        self.turno(fecha=datetime.date(a0, m0, 3), **montos)
+        self.turno(fecha=datetime.date(a2, m2, 3), **montos) # En el mes del medio, nada
+
+        fila = estadisticas('OBRA_SOCIAL', hoy.year, hoy.month, cantidad=3)['filas'][0]
+        self.assertEqual(fila['por_mes'], [4000, 0, 4000])
+        self.assertIsNone(fila['variacion']) # No es "0%" contra dos meses atrás
+
+        self.assertEqual(EstadisticaMensual.objects.get(dimension='MES', anio=a1, mes=m1).turnos, 0)
+        self.assertEqual(materializar(meses), []) # El mes vacío también está al día
+        with self.assertNumQueries(0):
+            estadisticas('OBRA_SOCIAL', hoy.year, hoy.month, cantidad=3)
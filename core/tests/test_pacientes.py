@@ -0,0 +1,83 @@
+"""Pacientes: búsqueda de duplicados y fusión"""
+from django.urls import reverse
+from django.utils import timezone
+import datetime
+
+from ..models import Paciente, Turno, TurnoArchivado, RegistroAuditoria, EventoTurno, ResumenAsistencia
+from ..duplicados import buscar_duplicados, _distancia
+from ..archivo import archivar_turnos
+from . import fabricas
+from .base import PruebaConsultorio
+
+
+class PacientesTest(PruebaConsultorio):
+
+    # ==========================================
+    # 1. DUPLICADOS
+    # ==========================================
+
+    def test_busca_duplicados_por_bloques(self):
+        """Encuentra el DNI con dos dígitos invertidos y el nombre mal tipeado, no a los hermanos"""
+        self.assertEqual(_distancia('101010', '100110'), 1) # Dos dígitos invertidos
+        mal_dni = fabricas.crear_paciente(nombre="Lionel", apellido="Messí", dni="100110")
+        hermano = fabricas.crear_paciente(nombre="Matías", apellido="Messi", dni="25123456")
+        perez = fabricas.crear_paciente(nombre="Juan Carlos", apellido="Pérez", dni="30111222", telefono="011 4555-1234")
+        mal_nombre = fabricas.crear_paciente(nombre="Jaun", apellido="Peres", dni="30.111.222", telefono="4555-1234")
+        fabricas.crear_paciente(nombre="Lionel", apellido="Scaloni", dni="16000000")
+
+        candidatos = buscar_duplicados()
+
+        pares = {(c.paciente_id, c.otro_id) for c in candidatos}
+        self.assertEqual(pares, {(self.paciente.pk, mal_dni.pk), (perez.pk, mal_nombre.pk)})
+        self.assertNotIn(hermano.pk, {pk for par in pares for pk in par})
+        self.assertEqual(candidatos, sorted(candidatos, key=lambda c: -c.puntaje))
+
+        response = self.client.get(reverse('pacientes_duplicados'))
+        self.assertEqual(len(response.context['pares']), 2)
+        self.assertContains(response, 'Messí')
+
+    def test_fusionar_pasa_turnos_y_deudas(self):
+        """Los turnos (activos, borrados y archivados) pasan al que se conserva y el duplicado se borra"""
+        duplicado = fabricas.crear_paciente(nombre="Lionel", apellido="Mesi", dni="101011",
+                                            telefono="3414000000", observaciones="Alérgico a la penicilina")
+        hoy = timezone.localdate()
+        debe = self.turno(paciente=duplicado, fecha=hoy - datetime.timedelta(days=3),
+                          monto_paciente=5000, monto_pagado=1000, estado='FINALIZADO')
+        borrado = self.turno(paciente=duplicado, fecha=hoy, hora=datetime.time(11, 0), borrado=True)
+        viejo = self.turno(paciente=duplicado, fecha=hoy - datetime.timedelta(days=900),
+                           monto_paciente=3000, monto_pagado=3000, estado='FINALIZADO')
+        archivar_turnos()
+        propio = self.turno(fecha=hoy - datetime.timedelta(days=10), estado='FINALIZADO',
+                            monto_paciente=2000, monto_pagado=2000)
+
+        response = self.client.post(reverse('fusionar_pacientes'),
+                                    {'conservar': self.paciente.pk, 'duplicado': duplicado.pk})
+
+        self.assertRedirects(response, reverse('pacientes_duplicados'))
+        self.assertFalse(Paciente.objects.filter(pk=duplicado.pk).exists())
+        self.assertEqual(set(Turno.todos.filter(paciente=self.paciente).values_list('pk', flat=True)),
+                         {debe.pk, borrado.pk, propio.pk})
+        self.assertEqual(TurnoArchivado.objects.get().paciente, self.paciente)
+        self.assertEqual(TurnoArchivado.objects.get().id_original, viejo.pk)
+
+        self.paciente.refresh_from_db()
+        self.assertEqual(self.paciente.telefono, "3414000000") # Completa lo que le faltaba
+        self.assertIn("Alérgico a la penicilina", self.paciente.observaciones)
+        self.assertIn("DNI 101011", self.paciente.observaciones)
+
+        # La deuda ahora es del que se conserva y su historial suma lo del duplicado
+        deudores = self.client.get(reverse('reporte_deudores'))
+        self.assertEqual(deudores.context['total_deuda'], 4000)
+        self.assertEqual(ResumenAsistencia.objects.get(paciente=self.paciente).turnos, 3)
+
+        # Queda registrado: el paciente borrado y cada turno que cambió de paciente
+        baja = RegistroAuditoria.objects.get(modelo='paciente')
+        self.assertEqual(baja.cambios['fusionado_con'], [duplicado.pk, self.paciente.pk])
+        self.assertEqual(RegistroAuditoria.objects.filter(modelo='turno', accion='MODIFICACION').count(), 2)
+        self.assertTrue(EventoTurno.objects.filter(turno_id=debe.pk, tipo='CAMBIO').exists())
+
+    def test_no_se_fusiona_consigo_mismo(self):
+        response = self.client.post(reverse('fusionar_pacientes'),
+                                    {'conservar': self.paciente.pk, 'duplicado': self.paciente.pk}, follow=True)
+        self.assertContains(response, 'consigo mismo')
+        self.assertTrue(Paciente.objects.filter(pk=self.paciente.pk).exists())
@@ -0,0 +1,230 @@
+"""Procesos fuera de los pedidos: tareas, recordatorios, copia para reportes y respaldos"""
+from django.core import mail
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+import datetime
+import shutil
+import tempfile
+import time
+
+from ..models import Arancel, ObraSocial, Paciente, Turno, Tarea, RecordatorioTurno
+from .. import tareas
+from ..recordatorios import enviar_recordatorios
+from .base import PruebaConsultorio
+
+
+class TareasTest(PruebaConsultorio):
+
+    # ==========================================
+    # 1. TAREAS EN SEGUNDO PLANO
+    # ==========================================
+
+    def test_encolar_y_ejecutar_exportacion(self):
+        """La vista solo encola; el worker genera el CSV en MEDIA_ROOT"""
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+
+        self.turno(hora=datetime.time(9,0), fecha=datetime.date(2025, 5, 10))
+        self.client.post(reverse('encolar_tarea'), {'tipo': 'exportar_turnos', 'anio': '2025'})
+
+        tarea = Tarea.objects.get()
+        self.assertEqual(tarea.estado, 'PENDIENTE')
+
+        with override_settings(MEDIA_ROOT=media):
+            tomada = tareas.tomar_siguiente()
+            self.assertEqual(tomada.pk, tarea.pk)
+            self.assertIsNone(tareas.tomar_siguiente()) # Nadie más la puede tomar
+            tareas.ejecutar(tarea.pk)
+
+            tarea.refresh_from_db()
+            self.assertEqual(tarea.estado, 'FINALIZADA')
+            self.assertEqual(tarea.progreso, 100)
+            contenido = tarea.resultado.read().decode('utf-8')
+        self.assertIn('Messi', contenido)
+
+    def test_tarea_fallida_se_reintenta(self):
+        """Si una tarea falla vuelve a la cola hasta agotar los intentos"""
+        tarea = tareas.encolar('exportar_turnos', anio='no-es-un-año')
+        tarea.max_intentos = 2
+        tarea.save()
+
+        tareas.tomar_siguiente()
+        self.assertEqual(tareas.ejecutar(tarea.pk), 'PENDIENTE')
+        tareas.tomar_siguiente()
+        self.assertEqual(tareas.ejecutar(tarea.pk), 'ERROR')
+
+        # El botón "Reintentar" le da una oportunidad más
+        self.client.post(reverse('reintentar_tarea', args=[tarea.pk]))
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, 'PENDIENTE')
+
+    @override_settings(TAREAS_ABANDONO_SEGUNDOS=60)
+    def test_solo_vuelven_a_la_cola_las_tareas_abandonadas(self):
+        """Al arrancar un worker no le saca las tareas a otro que sigue vivo"""
+        viva = tareas.encolar('exportar_turnos', anio=2025)
+        abandonada = tareas.encolar('exportar_turnos', anio=2024)
+        tareas.tomar_siguiente()
+        tareas.tomar_siguiente()
+        Tarea.objects.filter(pk=abandonada.pk).update(latido=timezone.now() - datetime.timedelta(minutes=5))
+
+        self.assertEqual(tareas.recuperar_abandonadas(), 1)
+        estados = dict(Tarea.objects.values_list('pk', 'estado'))
+        self.assertEqual((estados[viva.pk], estados[abandonada.pk]), ('EN_CURSO', 'PENDIENTE'))
+
+    @override_settings(TAREAS_PROCESOS=1)
+    def test_resumenes_mensuales_en_zip_y_en_cache(self):
+        """Una planilla por obra social y un resumen por paciente; al regenerar solo cambia lo que cambió"""
+        import zipfile
+        from ..resumenes import generar_resumenes
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.arancel.monto_obra_social = 25000
+        self.arancel.save()
+        turno = self.turno(hora=datetime.time(9,0), fecha=datetime.date(2025, 5, 10), estado='FINALIZADO', monto_pagado=1000)
+        # Otra obra social cuyo nombre da el mismo slug: no se pisan
+        otra = ObraSocial.objects.create(nombre="O.S.D.E.")
+        Arancel.objects.create(obra_social=otra, tratamiento=self.trat_conducto, copago_sugerido=0, monto_obra_social=30000)
+        self.turno(hora=datetime.time(10,0), fecha=datetime.date(2025, 5, 10), estado='FINALIZADO', obra_social_aplicada=otra)
+        self.client.post(reverse('encolar_tarea'), {'tipo': 'resumenes_mensuales', 'anio': '2025', 'mes': '5'})
+        tarea = Tarea.objects.get()
+        self.assertEqual(tarea.parametros, {'anio': 2025, 'mes': 5})
+
+        with override_settings(MEDIA_ROOT=media):
+            tareas.tomar_siguiente()
+            self.assertEqual(tareas.ejecutar(tarea.pk), 'FINALIZADA')
+            tarea.refresh_from_db()
+            with zipfile.ZipFile(tarea.resultado.open()) as archivo:
+                nombres = archivo.namelist()
+                planilla = archivo.read(f'obras_sociales/osde-{self.osde.pk}.html').decode('utf-8')
+                otra_planilla = archivo.read(f'obras_sociales/osde-{otra.pk}.html').decode('utf-8')
+        self.assertEqual(len(nombres), 4) # Índice + OSDE + O.S.D.E. + el paciente
+        self.assertIn('$25000,00', planilla)
+        self.assertIn('$30000,00', otra_planilla)
+        self.assertIn('Mayo 2025', planilla)
+
+        self.assertEqual(generar_resumenes(2025, 5)['renderizados'], 0) # Todo igual: sale de la caché
+        turno.monto_pagado = turno.monto_paciente
+        turno.save()
+        self.assertEqual(generar_resumenes(2025, 5)['renderizados'], 1) # Solo el del paciente
+
+    # ==========================================
+    # 2. RECORDATORIOS POR EMAIL
+    # ==========================================
+
+    def test_recordatorios_se_mandan_una_sola_vez(self):
+        """Manda solo los pendientes de mañana, y si se corre dos veces no duplica"""
+        manana = timezone.localdate() + datetime.timedelta(days=1)
+        self.paciente.email = 'messi@example.com'
+        self.paciente.save()
+        sin_mail = Paciente.objects.create(nombre="Sin", apellido="Mail", dni="202020")
+
+        t1 = self.turno(hora=datetime.time(9,0), fecha=manana)
+        t2 = Turno.objects.create(
+            paciente=sin_mail, tratamiento=self.trat_conducto, obra_social_aplicada=self.osde,
+            hora=datetime.time(10,0), fecha=manana
+        )
+        # Cancelado: no se recuerda
+        self.turno(hora=datetime.time(11,0), fecha=manana, estado='CANCELADO')
+
+        resumen = enviar_recordatorios(tamano_lote=1)
+        self.assertEqual(resumen['enviados'], 1)
+        self.assertEqual(resumen['sin_email'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['messi@example.com'])
+        self.assertIn('09:00', mail.outbox[0].subject)
+
+        self.assertEqual(RecordatorioTurno.objects.get(turno=t1).estado, 'ENVIADO')
+        self.assertEqual(RecordatorioTurno.objects.get(turno=t2).estado, 'SIN_EMAIL')
+
+        # Segunda corrida: no vuelve a mandar el que ya salió
+        resumen = enviar_recordatorios()
+        self.assertEqual(resumen['enviados'], 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(RecordatorioTurno.objects.get(turno=t2).intentos, 2)
+
+    # ==========================================
+    # 3. COPIA PARA REPORTES
+    # ==========================================
+
+    def test_reportes_leen_de_la_copia_solo_si_sirve(self):
+        """Los reportes van a 'reportes' si la copia es reciente y posterior a lo último que guardó el usuario"""
+        from unittest import mock
+        from .. import routers
+
+        router = routers.RouterReportes()
+        self.assertIsNone(router.db_for_read(Turno)) # Fuera de un reporte: principal
+        self.assertEqual(router.db_for_write(Turno), 'default')
+
+        with mock.patch.object(routers, 'edad_copia', return_value=60):
+            with routers.leer_de_reportes():
+                self.assertEqual(router.db_for_read(Turno), 'reportes')
+            # El usuario guardó algo hace 10 segundos: la copia todavía no lo tiene
+            with routers.leer_de_reportes(desde=time.time() - 10):
+                self.assertIsNone(router.db_for_read(Turno))
+
+        with mock.patch.object(routers, 'edad_copia', return_value=60 * 60): # Demasiado vieja
+            with routers.leer_de_reportes():
+                self.assertIsNone(router.db_for_read(Turno))
+
+        # Guardar algo deja la marca en la sesión
+        self.client.post(reverse('crear_gasto'), {'fecha': '2026-03-01', 'categoria': self.categoria_luz.pk, 'monto': 100})
+        self.assertIn('ultima_escritura', self.client.session)
+
+    # ==========================================
+    # 4. RESPALDOS
+    # ==========================================
+
+    def test_respaldo_incremental_verificado_y_restaurado(self):
+        """La base se comprime y verifica, la media se copia una sola vez y se puede restaurar"""
+        import gzip
+        import os
+        import sqlite3
+        from unittest import mock
+        from .. import respaldos
+
+        carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, carpeta, ignore_errors=True)
+        base = os.path.join(carpeta, 'base.sqlite3')
+        destino = os.path.join(carpeta, 'respaldos')
+        media = os.path.join(carpeta, 'media')
+        os.makedirs(os.path.join(media, 'logos'))
+        with open(os.path.join(media, 'logos', 'logo.png'), 'wb') as archivo:
+            archivo.write(b'logo')
+
+        conexion = sqlite3.connect(base)
+        conexion.execute('CREATE TABLE turnos (id INTEGER PRIMARY KEY, paciente TEXT)')
+        conexion.execute("INSERT INTO turnos (paciente) VALUES ('Pérez')")
+        conexion.commit()
+
+        with mock.patch.object(respaldos, 'ruta_base', return_value=base), override_settings(MEDIA_ROOT=media):
+            primero = respaldos.crear_respaldo(destino)
+            self.assertTrue(primero['base_nueva'])
+            self.assertEqual(primero['media_copiados'], 1)
+
+            segundo = respaldos.crear_respaldo(destino, conservar=1) # En el mismo segundo: no pisa el manifiesto
+            self.assertNotEqual(segundo['ruta'], primero['ruta'])
+            self.assertFalse(segundo['base_nueva']) # Misma base: se reutiliza
+            self.assertEqual(segundo['media_copiados'], 0)
+            self.assertEqual(segundo['borrados'], 1)
+            self.assertEqual(len(respaldos.listar_respaldos(destino)), 1)
+
+            # Cambios después del respaldo...
+            conexion.execute('DELETE FROM turnos')
+            conexion.commit()
+            conexion.close()
+            os.remove(os.path.join(media, 'logos', 'logo.png'))
+
+            # ...se deshacen al restaurar
+            respaldos.restaurar_respaldo(segundo['ruta'])
+            conexion = sqlite3.connect(base)
+            self.assertEqual(conexion.execute('SELECT paciente FROM turnos').fetchall(), [('Pérez',)])
+            conexion.close()
+            self.assertTrue(os.path.exists(os.path.join(media, 'logos', 'logo.png')))
+
+        # Un respaldo dañado no pasa la verificación
+        with gzip.open(os.path.join(destino, segundo['base']), 'wb') as archivo:
+            archivo.write(b'basura')
+        with self.assertRaises(ValueError):
+            respaldos.verificar_respaldo(segundo['ruta'])
@@ -0,0 +1,163 @@
+"""Turnos: precios y pagos automáticos, botones, borrado y profesionales"""
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+import datetime
+
+from ..models import Turno, TurnoArchivado, Profesional, RecordatorioTurno, LoteCierre, CierreTurno, RegistroAuditoria
+from ..archivo import archivar_turnos, purgar_borrados
+from .base import PruebaConsultorio
+
+
+class TurnosTest(PruebaConsultorio):
+
+    # ==========================================
+    # 1. PRUEBAS DE LÓGICA AUTOMÁTICA (MODELOS)
+    # ==========================================
+
+    def test_turno_toma_precio_arancel_automaticamente(self):
+        """Si creo un turno con precio 0, debe tomar el precio del Arancel ($10.000)"""
+        turno = self.turno(hora=datetime.time(10, 0),
+            monto_paciente=0 # Lo dejo en 0 adrede
+        )
+        # Verificamos que se haya actualizado solo
+        self.assertEqual(turno.monto_paciente, 10000)
+
+    def test_calculo_saldo_pendiente(self):
+        """Si sale 10.000 y paga 3.000, debe deber 7.000"""
+        turno = self.turno(hora=datetime.time(10, 0),
+            monto_paciente=10000,
+            monto_pagado=3000
+        )
+        self.assertEqual(turno.saldo_pendiente, 7000)
+        self.assertFalse(turno.pagado) # No debería estar pagado
+
+    def test_se_marca_pagado_automaticamente(self):
+        """Si pago el total, el check de 'pagado' debe ponerse True solo"""
+        turno = self.turno(hora=datetime.time(10, 0),
+            monto_paciente=10000,
+            monto_pagado=10000 # Pago total
+        )
+        self.assertTrue(turno.pagado)
+
+    # ==========================================
+    # 2. PRUEBAS DE BOTONES MÁGICOS (TOGGLES)
+    # ==========================================
+
+    def test_toggle_pagado_funciona(self):
+        """El botón mágico '$' debe poner el pago completo automáticamente"""
+        turno = self.turno(hora=datetime.time(9,0), monto_paciente=5000, monto_pagado=0, pagado=False
+        )
+
+        # Clic en el botón
+        self.client.get(reverse('toggle_pagado', args=[turno.pk]))
+        
+        turno.refresh_from_db()
+        self.assertTrue(turno.pagado)
+        self.assertEqual(turno.monto_pagado, 5000) # Se autocompletó
+
+        # Clic de nuevo (Deshacer)
+        self.client.get(reverse('toggle_pagado', args=[turno.pk]))
+        
+        turno.refresh_from_db()
+        self.assertFalse(turno.pagado)
+        self.assertEqual(turno.monto_pagado, 0) # Volvió a 0
+
+    # ==========================================
+    # 3. BORRADO LÓGICO Y ARCHIVO
+    # ==========================================
+
+    def test_borrar_turno_es_logico(self):
+        """Borrar un turno lo esconde de la agenda pero no lo elimina de la base"""
+        turno = self.turno(hora=datetime.time(9,0)
+        )
+        self.client.post(reverse('borrar_turno', args=[turno.pk]))
+
+        self.assertFalse(Turno.objects.filter(pk=turno.pk).exists())
+        self.assertTrue(Turno.todos.get(pk=turno.pk).borrado)
+        response = self.client.get(reverse('lista_turnos'))
+        self.assertNotIn(turno, response.context['turnos'])
+
+    @override_settings(TURNOS_DIAS_ARCHIVO=30)
+    def test_archivar_mantiene_el_balance(self):
+        """Los turnos viejos pasan al archivo y el balance del mes sigue dando lo mismo"""
+        fecha_vieja = timezone.localdate() - datetime.timedelta(days=60)
+        viejo = self.turno(hora=datetime.time(9,0), fecha=fecha_vieja, monto_paciente=5000, monto_pagado=5000,
+            estado='FINALIZADO'
+        )
+        # Viejo pero impago: se queda (todavía puede cobrarse)
+        self.turno(hora=datetime.time(10,0), fecha=fecha_vieja, monto_paciente=5000, monto_pagado=1000,
+            estado='FINALIZADO'
+        )
+        # Sin copago (lo cubre toda la obra social): no queda "pagado" pero tampoco debe nada
+        self.arancel.copago_sugerido = 0
+        self.arancel.save()
+        sin_copago = self.turno(hora=datetime.time(11,0), fecha=fecha_vieja, monto_paciente=0, estado='FINALIZADO')
+        self.assertFalse(sin_copago.pagado)
+        params = {'mes': fecha_vieja.month, 'anio': fecha_vieja.year}
+        antes = self.client.get(reverse('balance'), params).context['ingresos_turnos']
+
+        self.assertEqual(archivar_turnos(), 2)
+
+        self.assertFalse(Turno.todos.filter(pk=viejo.pk).exists())
+        self.assertEqual(set(TurnoArchivado.objects.values_list('id_original', flat=True)), {viejo.pk, sin_copago.pk})
+        self.assertEqual(Turno.objects.count(), 1)
+
+        response = self.client.get(reverse('balance'), params)
+        self.assertEqual(response.context['ingresos_turnos'], antes)
+        self.assertEqual(len(response.context['movimientos_turnos']), 2)
+
+    @override_settings(TURNOS_DIAS_ARCHIVO=30)
+    def test_archivar_conserva_el_historial_y_purga_los_borrados(self):
+        """Recordatorios y cierres pasan al archivado, un cierre en revisión frena y los borrados se purgan"""
+        fecha_vieja = timezone.localdate() - datetime.timedelta(days=60)
+        pagado = dict(fecha=fecha_vieja, monto_paciente=5000, monto_pagado=5000, estado='FINALIZADO')
+        viejo = self.turno(hora=datetime.time(9,0), **pagado)
+        en_revision = self.turno(hora=datetime.time(10,0), **pagado)
+        borrado = self.turno(hora=datetime.time(11,0), borrado=True, **pagado)
+        recordatorio = RecordatorioTurno.objects.create(turno=viejo, estado='ENVIADO')
+        confirmado = LoteCierre.objects.create(estado='CONFIRMADO')
+        cierre = CierreTurno.objects.create(lote=confirmado, turno=viejo, regla='con_pago', estado_nuevo='FINALIZADO')
+        abierto = LoteCierre.objects.create()
+        CierreTurno.objects.create(lote=abierto, turno=en_revision, regla='con_pago', estado_nuevo='FINALIZADO')
+        CierreTurno.objects.create(lote=confirmado, turno=borrado, regla='con_pago', estado_nuevo='FINALIZADO')
+
+        self.assertEqual(archivar_turnos(), 1)
+        archivado = TurnoArchivado.objects.get()
+        self.assertEqual(archivado.id_original, viejo.pk)
+        recordatorio.refresh_from_db()
+        cierre.refresh_from_db()
+        self.assertEqual((recordatorio.turno_id, recordatorio.turno_archivado), (None, archivado))
+        self.assertEqual((cierre.turno_id, cierre.turno_archivado), (None, archivado))
+        self.assertTrue(Turno.objects.filter(pk=en_revision.pk).exists()) # Su lote todavía se puede deshacer
+
+        self.assertEqual(purgar_borrados(), 1)
+        self.assertFalse(Turno.todos.filter(pk=borrado.pk).exists())
+        self.assertTrue(RegistroAuditoria.objects.filter(modelo='turno', objeto_id=borrado.pk, accion='BAJA').exists())
+        self.assertEqual(confirmado.cierres.count(), 2) # El historial del lote sigue completo
+
+    # ==========================================
+    # 4. VARIOS PROFESIONALES
+    # ==========================================
+
+    def test_disponibilidad_es_por_profesional(self):
+        """Dos profesionales pueden atender a la misma hora; el mismo profesional no"""
+        perez = Profesional.objects.create(nombre="Ana", apellido="Pérez")
+        gomez = Profesional.objects.create(nombre="Luis", apellido="Gómez", usuario=self.user)
+        self.turno(profesional=perez, fecha=datetime.date(2026, 3, 10), hora="10:00")
+        datos = {
+            'fecha': '2026-03-10', 'hora': '10:00', 'paciente': self.paciente.pk, 'tratamiento': self.trat_conducto.pk,
+            'obra_social_aplicada': self.osde.pk, 'monto_paciente': 0, 'monto_obra_social': 0, 'monto_pagado': 0,
+        }
+
+        response = self.client.post(reverse('crear_turno'), {**datos, 'profesional': perez.pk})
+        self.assertContains(response, 'Ya existe un turno activo')
+
+        self.client.post(reverse('crear_turno'), {**datos, 'profesional': gomez.pk})
+        self.assertEqual(Turno.objects.filter(fecha=datetime.date(2026, 3, 10)).count(), 2)
+
+        # El usuario de Gómez ve su agenda; con "Todos" ve las dos
+        response = self.client.get(reverse('lista_turnos'))
+        self.assertEqual([t.profesional for t in response.context['turnos']], [gomez])
+        response = self.client.get(reverse('lista_turnos'), {'profesional': ''})
+        self.assertEqual(len(response.context['turnos']), 2)
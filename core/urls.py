@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 from django.contrib.auth import views as auth_views
 from .views import (
@@ -8,7 +8,7 @@ from .views import (
     reporte_deudores, registrar_pago_deuda
 )
 from django.conf import settings
-from django.conf.urls.static import static
+from django.views.static import serve
 
 urlpatterns = [
     path('', views.lista_turnos, name='lista_turnos'), # Home por defecto
@@ -17,6 +17,8 @@ urlpatterns = [
     path('pacientes/nuevo/', views.PacienteCreateView.as_view(), name='crear_paciente'),
     path('pacientes/editar/<int:pk>/', views.PacienteUpdateView.as_view(), name='editar_paciente'),
     path('pacientes/borrar/<int:pk>/', views.PacienteDeleteView.as_view(), name='borrar_paciente'),
+    path('pacientes/duplicados/', views.pacientes_duplicados, name='pacientes_duplicados'),
+    path('pacientes/fusionar/', views.fusionar_pacientes, name='fusionar_pacientes'),
     # OBRAS SOCIALES
     path('config/obras-sociales/', views.ObraSocialListView.as_view(), name='lista_obras_sociales'),
     path('config/obras-sociales/nueva/', views.ObraSocialCreateView.as_view(), name='crear_os'),
@@ -45,6 +47,7 @@ urlpatterns = [
     # CATEGORIAS
     path('config/categorias/', views.CategoriaListView.as_view(), name='lista_categorias'),
     path('config/categorias/nuevo/', views.CategoriaCreateView.as_view(), name='crear_categoria'),
+    path('config/categorias/editar/<int:pk>/', views.CategoriaUpdateView.as_view(), name='editar_categoria'),
     path('config/categorias/borrar/<int:pk>/', views.CategoriaDeleteView.as_view(), name='borrar_categoria'),
 
     # GASTOS
@@ -60,13 +63,40 @@ urlpatterns = [
 
     path('turno/toggle-atendido/<int:pk>/', toggle_atendido, name='toggle_atendido'),
     path('turno/toggle-pagado/<int:pk>/', toggle_pagado, name='toggle_pagado'),
+    path('turnos/acciones/', views.acciones_turnos, name='acciones_turnos'),
+    path('turnos/calendario/', views.calendario, name='calendario'),
+    path('turnos/rango/', views.turnos_rango, name='turnos_rango'),
+
+    # AGENDA EN VIVO
+    path('eventos/turnos/', views.eventos_turnos, name='eventos_turnos'),
+    path('turno/fila/<int:pk>/', views.fila_turno, name='fila_turno'),
 
     path('finanzas/deudores/', reporte_deudores, name='reporte_deudores'),
 
     path('finanzas/pagar-deuda/<int:pk>/', registrar_pago_deuda, name='registrar_pago_deuda'),
 
+    path('finanzas/gastos/analisis/', views.analisis_gastos, name='analisis_gastos'),
+
+    path('finanzas/estadisticas/', views.estadisticas_productividad, name='estadisticas'),
+
+    path('finanzas/conciliacion/', views.conciliacion_obras_sociales, name='conciliacion'),
+
+    # CIERRE DE PENDIENTES VENCIDOS
+    path('cierres/', views.lista_cierres, name='lista_cierres'),
+    path('cierres/cerrar/', views.cerrar_pendientes, name='cerrar_pendientes'),
+    path('cierres/<int:pk>/', views.revisar_cierre, name='revisar_cierre'),
+
+    path('tareas/', views.lista_tareas, name='lista_tareas'),
+    path('tareas/encolar/', views.encolar_tarea, name='encolar_tarea'),
+    path('tareas/reintentar/<int:pk>/', views.reintentar_tarea, name='reintentar_tarea'),
+
+    path('auditoria/', views.lista_auditoria, name='lista_auditoria'),
+
     path('config/actualizar-logo/', views.actualizar_logo, name='actualizar_logo'),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# `static()` no hace nada sin DEBUG: en el consultorio no hay otro servidor para el logo
+if settings.DEBUG or settings.SERVIR_MEDIA:
+    urlpatterns += [
+        re_path(rf'^{settings.MEDIA_URL.strip("/")}/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    ]
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Versiones de datos guardadas en la caché.
+
+Cada "tabla" lógica (turnos, liquidaciones, etc.) tiene un número que sube cada
+vez que algo cambia. Las claves de caché incluyen esa versión, así que cuando los
+datos cambian las entradas viejas simplemente dejan de usarse.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _clave(nombre):
+    return f'version:{nombre}'
+
+
+def _ahora_ms():
+    return int(time.time() * 1000)
+
+
+def version(nombre):
+    """Devuelve la versión actual. Si no existe (o se perdió la caché) arranca con la hora actual."""
+    valor = cache.get(_clave(nombre))
+    if valor is None:
+        # Usamos la hora y no 1 para no chocar con claves viejas que sigan en la caché
+        cache.add(_clave(nombre), _ahora_ms(), None)
+        valor = cache.get(_clave(nombre), _ahora_ms())
+    return valor
+
+
+def incrementar(*nombres):
+    """Marca que los datos cambiaron. La versión nueva siempre es mayor que la anterior."""
+    ahora = _ahora_ms()
+    for nombre in nombres:
+        anterior = cache.get(_clave(nombre)) or 0
+        cache.set(_clave(nombre), max(ahora, anterior + 1), None)
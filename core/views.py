@@ -1,32 +1,94 @@
 from django.shortcuts import render
-from django.db.models import Sum, Q
+from django.conf import settings
+from django.db.models import Count, Sum, Q, Prefetch
 from django.utils import timezone
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin # Para las clases
-from django.contrib.auth.decorators import login_required # Para las funciones (def)
+from django.contrib.auth.decorators import login_required, permission_required # Para las funciones (def)
+from django.contrib.auth.models import User
+from django.contrib import messages
+from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect
-from decimal import Decimal
+from django.http import HttpResponse, JsonResponse
+from decimal import Decimal, InvalidOperation
+import datetime
+import logging
+
+from .catalogos import obtener, version_catalogos
+from .condicional import etag_por_version
+from .routers import tolera_desfase
+from .conciliacion import conciliar_periodo
+from .analisis_gastos import analizar
+from .estadisticas import estadisticas
+from . import cierre
+from . import operaciones
+from . import eventos
+from . import tareas
+from . import registro
+from . import duplicados
+from .imagenes import abrir_imagen, generar_variantes_logo
 
 # Importamos todos los modelos y formularios
 from .models import (
     Turno, Gasto, LiquidacionObraSocial, Paciente, ObraSocial, 
-    TipoTratamiento, Arancel, CategoriaGasto, Configuracion
+    TipoTratamiento, Arancel, CategoriaGasto, Configuracion, Tarea, RegistroAuditoria, EstadisticaMensual,
+    TurnoArchivado, Profesional, LoteCierre, CierreTurno
 )
 from .forms import (
     PacienteForm, ObraSocialForm, TipoTratamientoForm, TurnoForm, 
     GastoForm, LiquidacionForm, ArancelForm, CategoriaGastoForm
 )
 
+MESES_NOMBRE = {
+    1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril', 5: 'Mayo', 6: 'Junio',
+    7: 'Julio', 8: 'Agosto', 9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
+}
+
+# Si nada de esto cambió, la agenda y los deudores responden 304 sin consultar nada
+DATOS_AGENDA = ('turnos', 'pacientes', 'recordatorios', 'asistencia', 'obras_sociales', 'tratamientos', 'profesionales', 'configuracion')
+
 # --- VISTA 1: AGENDA DE TURNOS ---
 @login_required # <--- CANDADO AGREGADO
+@etag_por_version(*DATOS_AGENDA)
 def lista_turnos(request):
-    turnos = Turno.objects.all().order_by('-fecha', 'hora')
-    
-    # Filtros
-    fecha_filtro = request.GET.get('fecha')       # Filtro Día exacto
-    mes_filtro = request.GET.get('mes')           # Filtro Mes entero
-    paciente_filtro = request.GET.get('paciente') # Filtro Apellido
+    profesional = profesional_de_agenda(request)
+    turnos = filtrar_turnos(turnos_agenda(), request.GET, profesional)
+
+    # Calculamos el total de lo que se ve en pantalla
+    total_filtrado = sum(t.monto_paciente for t in turnos if t.pagado)
+
+    context = {
+        'turnos': turnos,
+        'total': total_filtrado,
+        'ultimo_evento': eventos.ultimo_id(), # La agenda en vivo sigue desde acá
+        'profesionales': obtener('profesionales'),
+        'profesional_actual': profesional,
+        'acciones': [(clave, accion[0]) for clave, accion in operaciones.ACCIONES.items()],
+    }
+    return render(request, 'core/lista_turnos.html', context)
+
+def turnos_agenda():
+    return Turno.objects.select_related(
+        'paciente__obra_social_default', 'paciente__asistencia', 'tratamiento', 'obra_social_aplicada',
+        'profesional', 'recordatorio'
+    ).order_by('-fecha', 'hora')
+
+def profesional_de_agenda(request):
+    """El profesional elegido en el filtro. Si no eligió nada y el usuario es un profesional, el suyo."""
+    if 'profesional' in request.GET:
+        try:
+            return int(request.GET['profesional'])
+        except ValueError:
+            return None # "Todos"
+    return Profesional.objects.filter(usuario_id=request.user.pk).values_list('pk', flat=True).first()
+
+def filtrar_turnos(turnos, parametros, profesional=None):
+    """Filtros de la agenda (los usa también la agenda en vivo para saber si mostrar una fila)"""
+    turnos = turnos.del_profesional(profesional) # Primero: los índices empiezan por profesional
+    fecha_filtro = parametros.get('fecha')       # Filtro Día exacto
+    mes_filtro = parametros.get('mes')           # Filtro Mes entero
+    paciente_filtro = parametros.get('paciente') # Filtro Apellido
 
     if fecha_filtro:
         turnos = turnos.filter(fecha=fecha_filtro)
@@ -39,17 +101,79 @@ def lista_turnos(request):
     if paciente_filtro:
         turnos = turnos.filter(paciente__apellido__icontains=paciente_filtro)
 
-    # Calculamos el total de lo que se ve en pantalla
-    total_filtrado = sum(t.monto_paciente for t in turnos if t.pagado)
+    return turnos
 
+# --- AGENDA EN VIVO ---
+@login_required
+def eventos_turnos(request):
+    """Server-Sent Events con los cambios de turnos (ver core.eventos)"""
+    desde = request.headers.get('Last-Event-ID') or request.GET.get('desde')
+    try:
+        desde = int(desde)
+    except (TypeError, ValueError):
+        desde = None
+    return eventos.flujo_eventos(request, desde)
+
+@login_required
+def fila_turno(request, pk):
+    """Una sola fila de la agenda. 204 si el turno ya no está o no entra en los filtros de esa agenda."""
+    turno = filtrar_turnos(turnos_agenda(), request.GET, profesional_de_agenda(request)).filter(pk=pk).first()
+    if turno is None:
+        return HttpResponse(status=204)
+    return render(request, 'core/turnos/_fila.html', {'turno': turno})
+
+# --- CALENDARIO ---
+MAXIMO_DIAS_CALENDARIO = 42 # Un mes visto en semanas completas
+
+@login_required
+def calendario(request):
+    """La página solo trae el esqueleto: los turnos los pide el navegador por rango (turnos_rango)"""
+    vista = request.GET.get('vista')
     context = {
-        'turnos': turnos,
-        'total': total_filtrado,
+        'vista': vista if vista in ('dia', 'semana', 'mes') else 'semana',
+        'fecha': request.GET.get('fecha') or timezone.localdate().isoformat(),
+        'ultimo_evento': eventos.ultimo_id(),
+        'profesionales': obtener('profesionales'),
+        'profesional_actual': profesional_de_agenda(request),
     }
-    return render(request, 'core/lista_turnos.html', context)
+    return render(request, 'core/calendario.html', context)
+
+@login_required
+@etag_por_version('turnos', 'pacientes', 'tratamientos')
+def turnos_rango(request):
+    """Turnos de un rango de fechas en filas compactas: [id, fecha, hora, paciente, tratamiento, estado]"""
+    try:
+        desde = datetime.date.fromisoformat(request.GET['desde'])
+        hasta = datetime.date.fromisoformat(request.GET['hasta'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Fechas inválidas (desde/hasta AAAA-MM-DD)'}, status=400)
+    if not 0 <= (hasta - desde).days < MAXIMO_DIAS_CALENDARIO:
+        return JsonResponse({'error': f'El rango tiene que ser de 1 a {MAXIMO_DIAS_CALENDARIO} días'}, status=400)
+
+    filas = (
+        Turno.objects.del_profesional(profesional_de_agenda(request))
+        .filter(fecha__range=(desde, hasta)) # Índice (fecha, hora) o (profesional, fecha, hora)
+        .order_by('fecha', 'hora')
+        .values('id', 'fecha', 'hora', 'paciente__apellido', 'paciente__nombre', 'tratamiento__nombre', 'estado')
+    )
+    turnos = [
+        [
+            f['id'], f['fecha'].isoformat(), f['hora'].strftime('%H:%M'),
+            f"{f['paciente__apellido']}, {f['paciente__nombre'][:1]}.", f['tratamiento__nombre'], f['estado'],
+        ]
+        for f in filas
+    ]
+    return JsonResponse({'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'turnos': turnos})
+
+def _respuesta_toggle(request, turno):
+    # Desde la agenda (fetch) devolvemos solo la fila; sin JavaScript, como siempre
+    if request.headers.get('X-Requested-With') == 'fetch':
+        return render(request, 'core/turnos/_fila.html', {'turno': turnos_agenda().get(pk=turno.pk)})
+    return redirect('lista_turnos')
 
 # --- VISTA 2: BALANCE GENERAL ---
 @login_required # <--- CANDADO AGREGADO
+@tolera_desfase # Lee de la copia de reportes (puede tener unos minutos de atraso)
 def balance_financiero(request):
     hoy = timezone.now()
     
@@ -57,6 +181,7 @@ def balance_financiero(request):
     mes = request.GET.get('mes', hoy.month)
     anio = request.GET.get('anio', hoy.year)
     os_id = request.GET.get('obra_social', '')
+    prof_id = request.GET.get('profesional', '')
 
     try:
         mes = int(mes)
@@ -71,26 +196,35 @@ def balance_financiero(request):
         fecha__year=anio
     ).exclude(estado='CANCELADO')
 
+    # Los turnos viejos pueden estar en el archivo (siempre atendidos y pagados)
+    archivados = TurnoArchivado.objects.filter(fecha__month=mes, fecha__year=anio)
+
     liquidaciones = LiquidacionObraSocial.objects.filter(fecha_ingreso__month=mes, fecha_ingreso__year=anio)
     gastos = Gasto.objects.filter(fecha__month=mes, fecha__year=anio)
 
     # 3. FILTRO POR OBRA SOCIAL
     if os_id:
         turnos = turnos.filter(obra_social_aplicada_id=os_id)
+        archivados = archivados.filter(obra_social_aplicada_id=os_id)
         liquidaciones = liquidaciones.filter(obra_social_id=os_id)
 
+    # 3b. FILTRO POR PROFESIONAL (los gastos generales del consultorio no entran)
+    if prof_id.isdigit():
+        turnos = turnos.del_profesional(prof_id)
+        archivados = archivados.del_profesional(prof_id)
+        liquidaciones = liquidaciones.del_profesional(prof_id)
+        gastos = gastos.del_profesional(prof_id)
+
     # 4. SUMAR
-    total_turnos = turnos.aggregate(Sum('monto_pagado'))['monto_pagado__sum'] or 0
+    total_turnos = (
+        (turnos.aggregate(Sum('monto_pagado'))['monto_pagado__sum'] or 0)
+        + (archivados.aggregate(Sum('monto_pagado'))['monto_pagado__sum'] or 0)
+    )
     total_os = liquidaciones.aggregate(Sum('monto_total'))['monto_total__sum'] or 0
     total_gastos = gastos.aggregate(Sum('monto'))['monto__sum'] or 0
 
     resultado = (total_turnos + total_os) - total_gastos
 
-    meses_nombre = {
-        1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril', 5: 'Mayo', 6: 'Junio',
-        7: 'Julio', 8: 'Agosto', 9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
-    }
-
     context = {
         'ingresos_turnos': total_turnos,
         'ingresos_os': total_os,
@@ -99,16 +233,116 @@ def balance_financiero(request):
         'mes_actual': mes,
         'anio_actual': anio,
         'os_actual': int(os_id) if os_id else '',
-        'nombre_mes': meses_nombre.get(mes),
-        'lista_meses': meses_nombre.items(),
+        'nombre_mes': MESES_NOMBRE.get(mes),
+        'lista_meses': MESES_NOMBRE.items(),
         'lista_anios': range(2024, 2030),
-        'obras_sociales': ObraSocial.objects.all(),
-        'movimientos_turnos': turnos.filter(monto_pagado__gt=0).order_by('-fecha', '-hora'),
+        'obras_sociales': obtener('obras_sociales'),
+        'profesionales': obtener('profesionales'),
+        'prof_actual': int(prof_id) if prof_id.isdigit() else '',
+        'movimientos_turnos': sorted(
+            list(turnos.filter(monto_pagado__gt=0).select_related('paciente__obra_social_default', 'tratamiento'))
+            + list(archivados.filter(monto_pagado__gt=0).select_related('paciente__obra_social_default', 'tratamiento')),
+            key=lambda t: (t.fecha, t.hora), reverse=True
+        ),
         'movimientos_gastos': gastos.order_by('-fecha'),
         'movimientos_os': liquidaciones.order_by('-fecha_ingreso'),
     }
     return render(request, 'core/balance.html', context)
 
+# --- ANÁLISIS DE GASTOS ---
+OPCIONES_MESES_ANALISIS = (6, 12, 24)
+
+@login_required
+def analisis_gastos(request):
+    """Gastos por categoría: últimos meses, promedio móvil y presupuesto vs. gastado"""
+    hoy = timezone.now()
+    try:
+        mes = int(request.GET.get('mes', hoy.month))
+        anio = int(request.GET.get('anio', hoy.year))
+        cantidad = int(request.GET.get('meses', 12))
+    except ValueError:
+        mes, anio, cantidad = hoy.month, hoy.year, 12
+    if not 1 <= mes <= 12:
+        mes = hoy.month
+    cantidad = cantidad if cantidad in OPCIONES_MESES_ANALISIS else 12
+
+    analisis = analizar(anio, mes, cantidad)
+    context = {
+        'analisis': analisis,
+        'etiquetas_meses': [f"{MESES_NOMBRE[m][:3]} {str(a)[2:]}" for a, m in analisis['meses']],
+        'mes_actual': mes,
+        'anio_actual': anio,
+        'meses_actual': cantidad,
+        'opciones_meses': OPCIONES_MESES_ANALISIS,
+        'nombre_mes': MESES_NOMBRE.get(mes),
+        'lista_meses': MESES_NOMBRE.items(),
+        'lista_anios': range(2024, 2030),
+    }
+    return render(request, 'core/analisis_gastos.html', context)
+
+# --- ESTADÍSTICAS POR TRATAMIENTO / OBRA SOCIAL ---
+@login_required
+def estadisticas_productividad(request):
+    """Volumen, cancelaciones, facturado y ticket promedio por tratamiento u obra social"""
+    hoy = timezone.now()
+    try:
+        mes = int(request.GET.get('mes', hoy.month))
+        anio = int(request.GET.get('anio', hoy.year))
+        cantidad = int(request.GET.get('meses', 12))
+    except ValueError:
+        mes, anio, cantidad = hoy.month, hoy.year, 12
+    if not 1 <= mes <= 12:
+        mes = hoy.month
+    cantidad = cantidad if cantidad in OPCIONES_MESES_ANALISIS else 12
+    dimension = request.GET.get('por', 'OBRA_SOCIAL')
+    if dimension not in dict(EstadisticaMensual.DIMENSIONES):
+        dimension = 'OBRA_SOCIAL'
+
+    resultado = estadisticas(dimension, anio, mes, cantidad)
+    context = {
+        'filas': resultado['filas'],
+        'etiquetas_meses': [f"{MESES_NOMBRE[m][:3]} {str(a)[2:]}" for a, m in resultado['meses']],
+        'dimensiones': EstadisticaMensual.DIMENSIONES,
+        'dimension_actual': dimension,
+        'nombre_dimension': dict(EstadisticaMensual.DIMENSIONES)[dimension],
+        'mes_actual': mes,
+        'anio_actual': anio,
+        'meses_actual': cantidad,
+        'opciones_meses': OPCIONES_MESES_ANALISIS,
+        'nombre_mes': MESES_NOMBRE.get(mes),
+        'lista_meses': MESES_NOMBRE.items(),
+        'lista_anios': range(2024, 2030),
+    }
+    return render(request, 'core/estadisticas.html', context)
+
+# --- VISTA 3: CONCILIACIÓN DE OBRAS SOCIALES ---
+@login_required
+@tolera_desfase
+def conciliacion_obras_sociales(request):
+    """Compara lo que cada obra social debería pagar por los turnos atendidos contra lo liquidado"""
+    hoy = timezone.now()
+    try:
+        mes = int(request.GET.get('mes', hoy.month))
+        anio = int(request.GET.get('anio', hoy.year))
+    except ValueError:
+        mes = hoy.month
+        anio = hoy.year
+
+    filas = conciliar_periodo(anio, mes)
+
+    context = {
+        'filas': filas,
+        'total_esperado': sum(f['esperado'] for f in filas),
+        'total_liquidado': sum(f['liquidado'] for f in filas),
+        'total_diferencia': sum(f['diferencia'] for f in filas),
+        'mes_actual': mes,
+        'anio_actual': anio,
+        'nombre_mes': MESES_NOMBRE.get(mes),
+        'lista_meses': MESES_NOMBRE.items(),
+        'lista_anios': range(2024, 2030),
+    }
+    return render(request, 'core/conciliacion.html', context)
+
 # --- ABM PACIENTES ---
 class PacienteListView(LoginRequiredMixin, ListView): # <--- CANDADO AGREGADO
     model = Paciente
@@ -138,9 +372,64 @@ class PacienteDeleteView(LoginRequiredMixin, DeleteView): # <--- CANDADO AGREGAD
     template_name = 'core/pacientes/confirmar_borrar.html'
     success_url = reverse_lazy('lista_pacientes')
 
+# --- PACIENTES DUPLICADOS ---
+DUPLICADOS_EN_PANTALLA = 50
+
+@login_required
+def pacientes_duplicados(request):
+    """Pares de pacientes que parecen el mismo (ver core.duplicados), para fusionarlos"""
+    candidatos = duplicados.duplicados_cacheados()
+    mostrados = candidatos[:DUPLICADOS_EN_PANTALLA]
+    activos = Q(turno__borrado=False)
+    pacientes = Paciente.objects.select_related('obra_social_default').annotate(
+        cantidad_turnos=Count('turno', filter=activos),
+        deuda=Sum('turno__saldo', filter=activos & Q(turno__estado='FINALIZADO')),
+    ).in_bulk({pk for c in mostrados for pk in (c.paciente_id, c.otro_id)})
+    context = {
+        'pares': [(c.puntaje, pacientes[c.paciente_id], pacientes[c.otro_id]) for c in mostrados],
+        'total': len(candidatos),
+    }
+    return render(request, 'core/pacientes/duplicados.html', context)
+
+@login_required
+def fusionar_pacientes(request):
+    conservar_id, duplicado_id = request.POST.get('conservar', ''), request.POST.get('duplicado', '')
+    if request.method == 'POST' and conservar_id.isdigit() and duplicado_id.isdigit():
+        conservar = get_object_or_404(Paciente, pk=conservar_id)
+        duplicado = get_object_or_404(Paciente, pk=duplicado_id)
+        try:
+            movidos = duplicados.fusionar(conservar, duplicado, usuario=request.user)
+        except ValueError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f"{duplicado.apellido}, {duplicado.nombre} quedó unido a "
+                                      f"{conservar.apellido}, {conservar.nombre} ({movidos} turnos pasados).")
+    return redirect('pacientes_duplicados')
+
+# --- LISTAS DE CATÁLOGOS (cacheadas) ---
+class CatalogoCacheadoMixin:
+    """
+    La lista sale de la caché (core.catalogos) y la página responde 304 si
+    ninguno de los catálogos cambió. El primero de `catalogos` es el que se lista.
+    """
+    catalogos = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        vista = etag_por_version(*self.catalogos, 'configuracion')(super().dispatch)
+        return vista(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return obtener(self.catalogos[0])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['version_catalogo'] = version_catalogos(*self.catalogos) # Para los {% cache %}
+        return context
+
 # --- ABM OBRAS SOCIALES ---
-class ObraSocialListView(LoginRequiredMixin, ListView): # <--- CANDADO AGREGADO
+class ObraSocialListView(LoginRequiredMixin, CatalogoCacheadoMixin, ListView): # <--- CANDADO AGREGADO
     model = ObraSocial
+    catalogos = ('obras_sociales',)
     template_name = 'core/config/lista_os.html'
     context_object_name = 'obras_sociales'
 
@@ -162,8 +451,9 @@ class ObraSocialDeleteView(LoginRequiredMixin, DeleteView): # <--- CANDADO AGREG
     success_url = reverse_lazy('lista_obras_sociales')
 
 # --- ABM TRATAMIENTOS ---
-class TratamientoListView(LoginRequiredMixin, ListView): # <--- CANDADO AGREGADO
+class TratamientoListView(LoginRequiredMixin, CatalogoCacheadoMixin, ListView): # <--- CANDADO AGREGADO
     model = TipoTratamiento
+    catalogos = ('tratamientos',)
     template_name = 'core/config/lista_tratamientos.html'
     context_object_name = 'tratamientos'
 
@@ -191,6 +481,12 @@ class TurnoCreateView(LoginRequiredMixin, CreateView): # <--- CANDADO AGREGADO
     template_name = 'core/turnos/form.html'
     success_url = reverse_lazy('lista_turnos')
 
+    def get_initial(self):
+        initial = super().get_initial()
+        # Si el que carga es un profesional, el turno es suyo salvo que elija otro
+        initial['profesional'] = Profesional.objects.filter(usuario_id=self.request.user.pk).first()
+        return initial
+
 class TurnoUpdateView(LoginRequiredMixin, UpdateView): # <--- CANDADO AGREGADO
     model = Turno
     form_class = TurnoForm
@@ -202,6 +498,12 @@ class TurnoDeleteView(LoginRequiredMixin, DeleteView): # <--- CANDADO AGREGADO
     template_name = 'core/config/confirmar_borrar.html'
     success_url = reverse_lazy('lista_turnos')
 
+    def form_valid(self, form):
+        # Borrado lógico: el turno deja de verse pero queda en la base (y en la auditoría)
+        self.object.borrado = True
+        self.object.save(update_fields=['borrado'])
+        return redirect(self.get_success_url())
+
 # --- ABM GASTOS ---
 class GastoCreateView(LoginRequiredMixin, CreateView): # <--- CANDADO AGREGADO
     model = Gasto
@@ -239,22 +541,30 @@ class LiquidacionDeleteView(LoginRequiredMixin, DeleteView): # <--- CANDADO AGRE
     success_url = reverse_lazy('balance')
 
 # --- ABM ARANCELES ---
-class ArancelListView(LoginRequiredMixin, ListView): # <--- CANDADO AGREGADO
+class ArancelListView(LoginRequiredMixin, CatalogoCacheadoMixin, ListView): # <--- CANDADO AGREGADO
     model = Arancel
+    catalogos = ('aranceles', 'obras_sociales')
     template_name = 'core/config/lista_aranceles.html'
     context_object_name = 'aranceles'
 
+    def get_os_seleccionada(self):
+        try:
+            return int(self.request.GET.get('obra_social'))
+        except (TypeError, ValueError):
+            return None
+
     def get_queryset(self):
-        queryset = super().get_queryset()
-        os_id = self.request.GET.get('obra_social')
+        aranceles = super().get_queryset()
+        os_id = self.get_os_seleccionada()
         if os_id:
-            queryset = queryset.filter(obra_social_id=os_id)
-        return queryset
+            # Son pocos: filtramos la lista cacheada en vez de ir a la base
+            aranceles = [a for a in aranceles if a.obra_social_id == os_id]
+        return aranceles
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['obras_sociales'] = ObraSocial.objects.all()
-        context['os_seleccionada'] = int(self.request.GET.get('obra_social')) if self.request.GET.get('obra_social') else None
+        context['obras_sociales'] = obtener('obras_sociales')
+        context['os_seleccionada'] = self.get_os_seleccionada()
         return context
 
 class ArancelCreateView(LoginRequiredMixin, CreateView): # <--- CANDADO AGREGADO
@@ -275,8 +585,9 @@ class ArancelDeleteView(LoginRequiredMixin, DeleteView): # <--- CANDADO AGREGADO
     success_url = reverse_lazy('lista_aranceles')
 
 # --- ABM CATEGORIAS DE GASTOS ---
-class CategoriaListView(LoginRequiredMixin, ListView): # <--- CANDADO AGREGADO
+class CategoriaListView(LoginRequiredMixin, CatalogoCacheadoMixin, ListView): # <--- CANDADO AGREGADO
     model = CategoriaGasto
+    catalogos = ('categorias',)
     template_name = 'core/config/lista_categorias.html'
     context_object_name = 'categorias'
 
@@ -286,6 +597,12 @@ class CategoriaCreateView(LoginRequiredMixin, CreateView): # <--- CANDADO AGREGA
     template_name = 'core/config/form_generico.html'
     success_url = reverse_lazy('lista_categorias')
 
+class CategoriaUpdateView(LoginRequiredMixin, UpdateView): # <--- CANDADO AGREGADO
+    model = CategoriaGasto
+    form_class = CategoriaGastoForm
+    template_name = 'core/config/form_generico.html'
+    success_url = reverse_lazy('lista_categorias')
+
 class CategoriaDeleteView(LoginRequiredMixin, DeleteView): # <--- CANDADO AGREGADO
     model = CategoriaGasto
     template_name = 'core/config/confirmar_borrar.html'
@@ -303,7 +620,7 @@ def toggle_atendido(request, pk):
     
     turno.save()
     # Redirigimos a la misma página donde estaba (la lista)
-    return redirect('lista_turnos')
+    return _respuesta_toggle(request, turno)
 
 @login_required
 def toggle_pagado(request, pk):
@@ -321,16 +638,38 @@ def toggle_pagado(request, pk):
         turno.monto_pagado = turno.monto_paciente 
         
     turno.save()
-    return redirect('lista_turnos')
+    registro.evento('pago_registrado' if turno.pagado else 'pago_anulado', turno=turno.pk,
+                    monto=turno.monto_pagado, usuario=request.user.get_username())
+    return _respuesta_toggle(request, turno)
+
+@login_required
+def acciones_turnos(request):
+    """Atendido / pagado / cancelado para todos los turnos tildados en la agenda, en un solo POST"""
+    if request.method != 'POST':
+        return redirect('lista_turnos')
+    accion = request.POST.get('accion')
+    ids = [int(pk) for pk in request.POST.getlist('turnos') if pk.isdigit()]
+    actualizados = []
+    if accion in operaciones.ACCIONES and ids:
+        actualizados = operaciones.aplicar_accion(accion, ids, usuario=request.user)
+
+    # Desde la agenda (fetch) alcanza con los IDs: cada fila se vuelve a pedir sola
+    if request.headers.get('X-Requested-With') == 'fetch':
+        return JsonResponse({'actualizados': actualizados})
+    if ids:
+        messages.success(request, f"{len(actualizados)} de {len(ids)} turnos actualizados.")
+    filtros = request.POST.get('filtros', '')
+    return redirect(f"{reverse('lista_turnos')}?{filtros}" if filtros else 'lista_turnos')
 
 # --- NUEVA VISTA: REPORTE DE DEUDORES ---
 @login_required
+@etag_por_version(*DATOS_AGENDA)
 def reporte_deudores(request):
     # 1. Filtro base: Solo atendidos que deben plata
     turnos_deudores = Turno.objects.filter(
-        pagado=False,
-        estado='FINALIZADO'
-    ).order_by('paciente__apellido', 'fecha')
+        estado='FINALIZADO',
+        saldo__gt=0
+    ).select_related('paciente__obra_social_default', 'tratamiento').order_by('paciente__apellido', 'fecha')
     
     # 2. Lógica del Buscador
     busqueda = request.GET.get('q') # Capturamos lo que escribió en la cajita
@@ -343,7 +682,7 @@ def reporte_deudores(request):
         )
     
     # 3. Calculamos el total (después de filtrar, para saber cuánto deben LOS QUE BUSQUÉ)
-    total_deuda = sum(t.saldo_pendiente for t in turnos_deudores)
+    total_deuda = turnos_deudores.aggregate(total=Sum('saldo'))['total'] or 0
 
     context = {
         'turnos': turnos_deudores,
@@ -360,9 +699,15 @@ def registrar_pago_deuda(request, pk):
         # Recibimos el monto que escribió en la cajita
         monto_recibido = request.POST.get('monto_abonado')
 
-        if monto_recibido:
-            monto_recibido = Decimal(monto_recibido)
-
+        try:
+            monto_recibido = Decimal(monto_recibido or 0)
+        except InvalidOperation:
+            monto_recibido = None
+        if monto_recibido is None or not monto_recibido.is_finite() or monto_recibido < 0:
+            registro.evento('pago_rechazado', logging.WARNING, turno=turno.pk,
+                            monto=request.POST.get('monto_abonado'), usuario=request.user.get_username())
+            messages.error(request, "El monto ingresado no es válido.")
+        elif monto_recibido:
             # Sumamos al pago existente
             turno.monto_pagado += monto_recibido
 
@@ -373,6 +718,8 @@ def registrar_pago_deuda(request, pk):
                 turno.estado = 'FINALIZADO' # Aseguramos
 
             turno.save()
+            registro.evento('pago_registrado', turno=turno.pk, monto=monto_recibido, saldo=turno.saldo,
+                            usuario=request.user.get_username())
 
     return redirect('reporte_deudores')
 
@@ -380,14 +727,147 @@ def registrar_pago_deuda(request, pk):
 def actualizar_logo(request):
     """Recibe una imagen por POST y actualiza el logo de la configuración"""
     if request.method == 'POST' and request.FILES.get('logo'):
+        try:
+            abrir_imagen(request.FILES['logo'])
+        except ValueError as e:
+            registro.evento('logo_rechazado', logging.WARNING, archivo=request.FILES['logo'].name,
+                            motivo=str(e), usuario=request.user.get_username())
+            messages.error(request, str(e))
+            return redirect(request.META.get('HTTP_REFERER', 'lista_turnos'))
+
         # Buscamos la config existente o creamos una si no existe
         config = Configuracion.objects.first()
         if not config:
             config = Configuracion.objects.create()
         
-        # Guardamos la nueva foto
+        # Guardamos la nueva foto y generamos las versiones chicas (favicon, avatar, banner)
         config.logo = request.FILES['logo']
         config.save()
+        generar_variantes_logo(config)
+        registro.evento('logo_actualizado', archivo=config.logo.name, usuario=request.user.get_username())
         
     # Volvemos a la misma página donde estaba el usuario
-    return redirect(request.META.get('HTTP_REFERER', 'lista_turnos'))
\ No newline at end of file
+    return redirect(request.META.get('HTTP_REFERER', 'lista_turnos'))
+
+# --- TAREAS EN SEGUNDO PLANO (Exportaciones) ---
+@login_required
+def lista_tareas(request):
+    ultimas = list(Tarea.objects.select_related('usuario')[:50])
+    context = {
+        'tareas': ultimas,
+        'hay_en_curso': any(t.estado in ('PENDIENTE', 'EN_CURSO') for t in ultimas),
+        'tipos': [(tipo, t.descripcion) for tipo, t in tareas.REGISTRO.items()],
+        'lista_anios': range(2024, 2030),
+        'anio_actual': timezone.now().year,
+        'lista_meses': MESES_NOMBRE.items(),
+        'mes_actual': timezone.now().month,
+    }
+    return render(request, 'core/tareas/lista.html', context)
+
+@login_required
+def encolar_tarea(request):
+    """Encola una exportación; el worker la procesa sin bloquear la página"""
+    if request.method == 'POST':
+        tipo = request.POST.get('tipo')
+        try:
+            anio = int(request.POST.get('anio', timezone.now().year))
+            mes = int(request.POST.get('mes', timezone.now().month))
+        except ValueError:
+            anio, mes = timezone.now().year, timezone.now().month
+
+        if tipo in tareas.REGISTRO:
+            parametros = {'anio': anio}
+            if tareas.REGISTRO[tipo].mensual and 1 <= mes <= 12:
+                parametros['mes'] = mes
+            tareas.encolar(tipo, usuario=request.user, **parametros)
+
+    return redirect('lista_tareas')
+
+@login_required
+def reintentar_tarea(request, pk):
+    if request.method == 'POST':
+        tareas.reintentar(get_object_or_404(Tarea, pk=pk))
+    return redirect('lista_tareas')
+
+# --- AUDITORÍA DE CAMBIOS ---
+def _fecha_o_nada(texto):
+    try:
+        return datetime.date.fromisoformat(texto)
+    except (TypeError, ValueError):
+        return None
+
+@login_required
+@permission_required('core.view_registroauditoria', raise_exception=True)
+def lista_auditoria(request):
+    """Historial de cambios de montos, filtrable por fecha, usuario y objeto"""
+    registros = RegistroAuditoria.objects.all()
+
+    desde = _fecha_o_nada(request.GET.get('desde'))
+    hasta = _fecha_o_nada(request.GET.get('hasta'))
+    usuario_id = request.GET.get('usuario', '')
+    modelo = request.GET.get('modelo')
+    objeto_id = request.GET.get('objeto')
+
+    # Los valores que no se pueden leer se ignoran (un link viejo o tocado a mano no da error)
+    if desde:
+        registros = registros.filter(fecha__date__gte=desde)
+    if hasta:
+        registros = registros.filter(fecha__date__lte=hasta)
+    if usuario_id.isdigit():
+        registros = registros.filter(usuario_id=usuario_id)
+    if modelo:
+        registros = registros.filter(modelo=modelo)
+        if objeto_id and objeto_id.isdigit():
+            registros = registros.filter(objeto_id=objeto_id)
+
+    pagina = Paginator(registros, 50).get_page(request.GET.get('page'))
+
+    context = {
+        'pagina': pagina,
+        'usuarios': User.objects.order_by('username'),
+        'modelos': [('turno', 'Turnos'), ('gasto', 'Gastos'), ('liquidacionobrasocial', 'Liquidaciones')],
+        'filtros': request.GET,
+    }
+    return render(request, 'core/auditoria.html', context)
+
+
+# --- CIERRE DE PENDIENTES VENCIDOS ---
+@login_required
+def lista_cierres(request):
+    """Lotes de turnos cerrados automáticamente, para confirmarlos o deshacerlos"""
+    context = {
+        'por_revisar': LoteCierre.objects.filter(estado='APLICADO').prefetch_related(
+            Prefetch('cierres', queryset=CierreTurno.objects.select_related('turno__paciente', 'turno__tratamiento'))
+        ),
+        'historial': LoteCierre.objects.exclude(estado='APLICADO').select_related('usuario', 'revisado_por')[:20],
+        'vista_previa': cierre.vista_previa(),
+        'dias': getattr(settings, 'CIERRE_PENDIENTES_DIAS', 2),
+    }
+    return render(request, 'core/cierres.html', context)
+
+@login_required
+def cerrar_pendientes(request):
+    if request.method == 'POST':
+        lote = cierre.cerrar_pendientes(usuario=request.user)
+        if lote:
+            messages.success(request, f"Se cerraron {lote.cantidad} turnos pendientes. Revisalos abajo.")
+        else:
+            messages.info(request, "No hay turnos pendientes vencidos.")
+    return redirect('lista_cierres')
+
+@login_required
+def revisar_cierre(request, pk):
+    """Confirma el lote, o deshace todo o solo los turnos tildados"""
+    lote = get_object_or_404(LoteCierre, pk=pk)
+    if request.method == 'POST':
+        accion = request.POST.get('accion')
+        if accion == 'confirmar':
+            cierre.confirmar(lote, usuario=request.user)
+            messages.success(request, "Cierre confirmado.")
+        elif accion in ('deshacer', 'deshacer_todo'):
+            seleccion = None
+            if accion == 'deshacer':
+                seleccion = [int(pk) for pk in request.POST.getlist('turnos') if pk.isdigit()]
+            vueltos = cierre.deshacer(lote, turno_ids=seleccion, usuario=request.user)
+            messages.success(request, f"{vueltos} turnos volvieron a Pendiente.")
+    return redirect('lista_cierres')